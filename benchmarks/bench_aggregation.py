@@ -0,0 +1,42 @@
+"""
+Benchmark adding a row/column with `add_agg` through the NumPy fast path against the generic `DataFrame.agg` path.
+
+Run from the repository root with `python -m benchmarks.bench_aggregation`.
+"""
+import timeit
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import flatbread.agg.aggregation as agg
+
+
+def make_table(nrows: int, ncols: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.random((nrows, ncols))
+    values[rng.random((nrows, ncols)) < 0.05] = np.nan
+    return pd.DataFrame(values)
+
+
+def time_add_agg(df: pd.DataFrame, aggfunc: str, axis: int) -> float:
+    return timeit.timeit(
+        lambda: agg.add_agg(df, aggfunc, axis=axis), number=5
+    ) / 5
+
+
+def main():
+    print(f"{'shape':>12} {'aggfunc':>8} {'axis':>5} {'generic (s)':>12} {'fast (s)':>10}")
+    for nrows in [100, 10_000, 100_000]:
+        df = make_table(nrows, 100)
+        shape = f"{nrows}x{df.shape[1]}"
+        for aggfunc in agg.FAST_AGGFUNCS:
+            for axis in [0, 1]:
+                fast = time_add_agg(df, aggfunc, axis)
+                with mock.patch.object(agg, 'reduce_block', return_value=None):
+                    generic = time_add_agg(df, aggfunc, axis)
+                print(f"{shape:>12} {aggfunc:>8} {axis:>5} {generic:>12.4f} {fast:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark `chaining.get_data_mask` against the previous row-wise label scan.
+
+Run from the repository root with `python -m benchmarks.bench_chaining`.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import flatbread.chaining as chaining
+
+
+IGNORE_KEYS = {'Totals', 'Subtotals'}
+
+
+def rowwise_data_mask(index, ignore_keys):
+    """Reference implementation calling `should_keep` on every element."""
+    def should_keep(value):
+        if value in ignore_keys:
+            return False
+        if isinstance(value, str):
+            for key in ignore_keys:
+                if isinstance(key, str) and value.startswith(key):
+                    return False
+        return True
+
+    if isinstance(index, pd.MultiIndex):
+        result = [all(should_keep(el) for el in idx) for idx in index]
+    else:
+        result = [should_keep(idx) for idx in index]
+    return pd.Series(result, index=index)
+
+
+def make_index(nrows: int, nlabels: int = 100) -> pd.MultiIndex:
+    rng = np.random.default_rng(0)
+    labels = [f"label {i}" for i in range(nlabels)] + ['Subtotals']
+    return pd.MultiIndex.from_arrays([
+        rng.choice(labels, nrows),
+        rng.choice(labels, nrows),
+        rng.integers(0, nlabels, nrows),
+    ])
+
+
+def main():
+    print(f"{'rows':>10} {'row-wise (s)':>14} {'per-label (s)':>14} {'speedup':>8}")
+    for nrows in [10_000, 100_000, 1_000_000]:
+        index = make_index(nrows)
+        number = 1 if nrows >= 1_000_000 else 3
+        rowwise = timeit.timeit(
+            lambda: rowwise_data_mask(index, IGNORE_KEYS), number=number
+        ) / number
+        vectorized = timeit.timeit(
+            lambda: chaining.get_data_mask(index, IGNORE_KEYS), number=number
+        ) / number
+        print(f"{nrows:>10} {rowwise:>14.4f} {vectorized:>14.4f} {rowwise / vectorized:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark apportioned rounding of a whole block against the pandas version.
+
+Run from the repository root with `python -m benchmarks.bench_percentages`.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import flatbread.percentages as pct
+
+
+def round_apportioned_pandas(s: pd.Series, *, ndigits: int = -1) -> pd.Series:
+    """Previous implementation built from pandas operations."""
+    cumsum = s.fillna(0).cumsum().round(ndigits)
+    prev_baseline = cumsum.shift(1).fillna(0)
+    rounded = cumsum - prev_baseline
+    return rounded.mask(s.isna())
+
+
+def make_table(nrows: int, ncols: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.random((nrows, ncols))
+    values[rng.random((nrows, ncols)) < 0.05] = np.nan
+    return pd.DataFrame(values / np.nansum(values, axis=0))
+
+
+def main():
+    print(f"{'shape':>12} {'per column (s)':>15} {'frame (s)':>10} {'block (s)':>10}")
+    for nrows in [100, 1_000, 10_000]:
+        df = make_table(nrows, 1_000)
+        per_column = timeit.timeit(
+            lambda: df.apply(round_apportioned_pandas, ndigits=3), number=3
+        ) / 3
+        frame = timeit.timeit(
+            lambda: round_apportioned_pandas(df, ndigits=3), number=3 # type: ignore
+        ) / 3
+        block = timeit.timeit(
+            lambda: pct.round_apportioned(df, ndigits=3), number=3
+        ) / 3
+        shape = f"{nrows}x{df.shape[1]}"
+        print(f"{shape:>12} {per_column:>15.4f} {frame:>10.4f} {block:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark encoding a table specification as JSON.
+
+Run from the repository root with `python -m benchmarks.bench_tablespec`.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from flatbread.render.tablespec import TableSpecBuilder
+
+
+def spec_as_json_nested(df: pd.DataFrame) -> str:
+    """Previous implementation that dumped the nested list of values."""
+    builder = TableSpecBuilder(df)
+    values = [
+        [None if pd.isna(i) else i for i in row]
+        for row in df.values.tolist()
+    ]
+    spec = {**builder.build_spec(), "values": values}
+    return builder._serialize_to_json(spec)
+
+
+def make_table(nrows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(np.round(rng.random((nrows, 10)) * 100, 1))
+    df[1] = rng.integers(0, 1_000, nrows)
+    df[2] = pd.Categorical(rng.choice(list('abc'), nrows))
+    df[3] = pd.date_range('2000', periods=nrows, freq='h')
+    df[df.columns[4:]] = df[df.columns[4:]].mask(rng.random((nrows, 6)) < 0.05)
+    return df
+
+
+def main():
+    print(f"{'cells':>10} {'nested (s)':>11} {'streamed (s)':>13}")
+    for nrows in [1_000, 10_000, 100_000]:
+        df = make_table(nrows)
+        nested = timeit.timeit(lambda: spec_as_json_nested(df), number=3) / 3
+        streamed = timeit.timeit(
+            lambda: TableSpecBuilder(df).get_spec_as_json(), number=3
+        ) / 3
+        print(f"{df.size:>10} {nested:>11.4f} {streamed:>13.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+from concurrent.futures import Executor
 from typing import Any, Callable, Hashable, Literal, TypeAlias
 from pathlib import Path
 
@@ -6,7 +7,10 @@ import pandas as pd
 import flatbread.percentages as pct
 import flatbread.agg.aggregation as agg
 import flatbread.agg.totals as totals
+import flatbread.agg.crosstab as crosstab
+import flatbread.agg.partials as partials
 import flatbread.axes as axes
+import flatbread.chaining as chaining
 from flatbread.types import Axis, Level
 from flatbread.render.display import PitaDisplayMixin
 
@@ -19,10 +23,10 @@ class PitaFrame(PitaDisplayMixin):
     #region aggregation
     def add_agg(
         self,
-        aggfunc: str|Callable,
+        aggfunc: str|Callable|list[str|Callable]|dict[str, str|Callable],
         *args,
         axis: Axis = 0,
-        label: str|None = None,
+        label: str|list[str]|None = None,
         ignore_keys: str|list[str]|None = None,
         _fill: str = '',
         **kwargs,
@@ -32,12 +36,12 @@ class PitaFrame(PitaDisplayMixin):
 
         Parameters
         ----------
-        aggfunc (str|Callable):
-            Function to use for aggregating the data.
+        aggfunc (str|Callable|list|dict):
+            Function to use for aggregating the data. Pass a list of functions, or a dict mapping labels to functions, to add several aggregations in one go.
         axis (int | Literal["index", "columns", "both"]):
             Axis to aggregate. Default 0.
-        label (str|None):
-            Label for the aggregation row/column. Default None.
+        label (str|list[str]|None):
+            Label for the aggregation row/column, or a label per function if aggfunc is a list. Default None.
         ignore_keys (str|list[str]|None):
             Keys of rows to ignore when aggregating.
         *args:
@@ -63,13 +67,15 @@ class PitaFrame(PitaDisplayMixin):
 
     def add_subagg(
         self,
-        aggfunc: str|Callable,
+        aggfunc: str|Callable|list[str|Callable]|dict[str, str|Callable],
         axis: Axis = 0,
         level: int|str|list[int|str] = 0,
-        label: str|None = None,
+        label: str|list[str]|None = None,
         include_level_name: bool = False,
         ignore_keys: str|list[str]|None = None,
         skip_single_rows: bool = True,
+        n_jobs: int|None = None,
+        executor: Executor|None = None,
         _fill: str = '',
     ) -> pd.DataFrame:
         """
@@ -77,20 +83,24 @@ class PitaFrame(PitaDisplayMixin):
 
         Parameters
         ----------
-        aggfunc (str|Callable):
-            Function to use for aggregating the data.
+        aggfunc (str|Callable|list|dict):
+            Function to use for aggregating the data. Pass a list of functions, or a dict mapping labels to functions, to add several aggregations per group in one go.
         axis (int | Literal["index", "columns", "both"]):
             Axis to aggregate. Default 0.
         levels (int|str|list[int|str]):
             Levels to aggregate. Default 0.
-        label (str|None):
-            Label for the aggregation row/column. Default None.
+        label (str|list[str]|None):
+            Label for the aggregation row/column, or a label per function if aggfunc is a list. Default None.
         include_level_name (bool):
             Whether to add level name to subtotal label.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Totals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
         skip_single_rows (bool):
             Whether to skip single rows when aggregating. Default True.
+        n_jobs (int|None):
+            Number of blocks of groups to aggregate in parallel, in a pool of as many processes unless an executor is given. Aggfuncs that cannot be pickled (e.g. lambdas) run in a thread pool instead, which only speeds up aggfuncs that release the GIL. Default None.
+        executor (Executor|None):
+            Executor to aggregate blocks of groups on, e.g. a thread pool, which only speeds up aggfuncs that release the GIL (such as the numeric string aggfuncs). Default None.
         *args:
             Positional arguments to pass to func.
         **kwargs:
@@ -101,7 +111,7 @@ class PitaFrame(PitaDisplayMixin):
         pd.DataFrame:
             Table with aggregated rows/columns added.
         """
-        return agg.add_agg(
+        return agg.add_subagg(
             self._obj,
             aggfunc,
             axis = axis,
@@ -110,6 +120,8 @@ class PitaFrame(PitaDisplayMixin):
             include_level_name = include_level_name,
             ignore_keys = ignore_keys,
             skip_single_rows = skip_single_rows,
+            n_jobs = n_jobs,
+            executor = executor,
             _fill = _fill,
         )
 
@@ -121,7 +133,7 @@ class PitaFrame(PitaDisplayMixin):
         ignore_keys: str|list[str]|None = None,
         ndigits: int|None = None,
         base: int = 1,
-        apportioned_rounding: bool = True,
+        apportioned_rounding: bool|Literal['groups'] = True,
     ) -> pd.DataFrame:
         """
         Transform data to percentages based on specified axis.
@@ -139,11 +151,13 @@ class PitaFrame(PitaDisplayMixin):
         label_totals (str|None):
             Label of the totals column/row. If no label is supplied then totals will be assumed to be either the last row, last column or last row/column field. Default is None.
         ignore_keys (str|list[str]|None):
-            Keys of rows/columns to ignore when calculating percentages.
+            Keys of rows/columns to ignore when calculating percentages, matched against the labels. Percentages added by flatbread are always ignored.
         ndigits (int):
             Number of decimal places to round the percentages. Default is -1 (no rounding).
         base (int):
             The whole quantity against which to calculate the fraction.
+        apportioned_rounding (bool|Literal['groups']):
+            Round percentages so that they add up to their total. If 'groups' then the percentages within every subtotal group also add up to their subtotal. Default is True.
 
         Returns
         -------
@@ -172,7 +186,7 @@ class PitaFrame(PitaDisplayMixin):
         ignore_keys: str|list[str]|None = None,
         ndigits: int|None = None,
         base: int = 1,
-        apportioned_rounding: bool = True,
+        apportioned_rounding: bool|Literal['groups'] = True,
         interleaf: bool = False,
     ) -> pd.DataFrame:
         """
@@ -195,11 +209,13 @@ class PitaFrame(PitaDisplayMixin):
         label_totals (str|None):
             Label of the totals column/row. If no label is supplied then totals will be assumed to be either the last row, last column or last row/column field. Default is None.
         ignore_keys (str|list[str]|None):
-            Keys of rows/columns to ignore when calculating percentages.
+            Keys of rows/columns to ignore when calculating percentages, matched against the labels. Percentages added by flatbread are always ignored.
         ndigits (int):
             Number of decimal places to round the percentages. Default is -1 (no rounding).
         base (int):
             The whole quantity against which to calculate the fraction.
+        apportioned_rounding (bool|Literal['groups']):
+            Round percentages so that they add up to their total. If 'groups' then the percentages within every subtotal group also add up to their subtotal. Default is True.
         interleaf (bool):
             If `interleaf` is True then percentages columns will be placed next to count columns. If set to False the percentages columns will have their own separate block in the table. Default is False.
 
@@ -242,7 +258,7 @@ class PitaFrame(PitaDisplayMixin):
         label (str|None):
             Label for the totals row/column. Default 'Totals'.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Subtotals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
 
         Returns
         -------
@@ -265,6 +281,8 @@ class PitaFrame(PitaDisplayMixin):
         include_level_name: bool = False,
         ignore_keys: str|list[str]|None = None,
         skip_single_rows: bool = True,
+        n_jobs: int|None = None,
+        executor: Executor|None = None,
         _fill: str = '',
     ) -> pd.DataFrame:
         """
@@ -281,9 +299,13 @@ class PitaFrame(PitaDisplayMixin):
         include_level_name (bool):
             Whether to add level name to subtotal label.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Totals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
         skip_single_rows (bool):
             Whether to skip single rows when aggregating. Default True.
+        n_jobs (int|None):
+            Number of blocks of groups to aggregate in parallel, in a pool of as many processes unless an executor is given. Aggfuncs that cannot be pickled (e.g. lambdas) run in a thread pool instead, which only speeds up aggfuncs that release the GIL. Default None.
+        executor (Executor|None):
+            Executor to aggregate blocks of groups on, e.g. a thread pool, which only speeds up aggfuncs that release the GIL (such as the numeric string aggfuncs). Default None.
 
         Returns
         -------
@@ -298,9 +320,116 @@ class PitaFrame(PitaDisplayMixin):
             include_level_name = include_level_name,
             ignore_keys = ignore_keys,
             skip_single_rows = skip_single_rows,
+            n_jobs = n_jobs,
+            executor = executor,
             _fill = _fill,
         )
 
+    def crosstab(
+        self,
+        index: str|list[str],
+        columns: str|list[str]|None = None,
+        values: str|None = None,
+        aggfunc: Literal['size', 'count', 'sum'] = 'size',
+        axis: Axis = 2,
+        totals: bool = True,
+        subtotals: bool = False,
+        level: int|str|list[int|str] = 0,
+        percentages: bool = False,
+        ndigits: int = -1,
+    ) -> pd.DataFrame:
+        """
+        Tabulate the records in df with totals, subtotals and percentages, scanning the records once.
+
+        Parameters
+        ----------
+        index (str|list[str]):
+            Column(s) to use as row keys.
+        columns (str|list[str]|None):
+            Column(s) to use as column keys. Default None.
+        values (str|None):
+            Column to aggregate. Required unless aggfunc is 'size'.
+        aggfunc (Literal['size', 'count', 'sum']):
+            Reduction to compute the cells with. Default 'size'.
+        axis (int | Literal["index", "columns", "both"]):
+            Axis to add the margins to. Default 2.
+        totals (bool):
+            Whether to add totals. Default True.
+        subtotals (bool):
+            Whether to add subtotals for `level`. Default False.
+        level (int|str|list[int|str]):
+            Level(s) to add subtotals for. Default 0.
+        percentages (bool):
+            Whether to add percentages. Default False.
+        ndigits (int):
+            Number of digits to round percentages to. Default is -1 (no rounding).
+
+        Returns
+        -------
+        pd.DataFrame:
+            Table with cells and margins.
+        """
+        return crosstab.crosstab(
+            self._obj,
+            index,
+            columns,
+            values = values,
+            aggfunc = aggfunc,
+            axis = axis,
+            totals = totals,
+            subtotals = subtotals,
+            level = level,
+            percentages = percentages,
+            ndigits = ndigits,
+        )
+
+    def reduce_partials(
+        self,
+        index: str|list[str],
+        columns: str|list[str]|None = None,
+        values: str|None = None,
+    ) -> pd.DataFrame:
+        """
+        Reduce the records in df to mergeable aggregate states (count, sum, mean, M2, min and max) per combination of keys. Partials of several shards can be combined with `flatbread.agg.partials.merge_partials` and laid out with `finalize_partials`.
+
+        Parameters
+        ----------
+        index (str|list[str]):
+            Column(s) to use as row keys.
+        columns (str|list[str]|None):
+            Column(s) to use as column keys. Default None.
+        values (str|None):
+            Column to aggregate.
+
+        Returns
+        -------
+        pd.DataFrame:
+            Partial table with a column per state.
+        """
+        return partials.reduce_partials(self._obj, index, columns, values)
+
+    def take(
+        self,
+        indices: list[int],
+        axis: Axis = 0,
+    ) -> pd.DataFrame:
+        """
+        Select rows/columns by position, keeping track of the totals.
+
+        Parameters
+        ----------
+        indices (list[int]):
+            Positions of the rows/columns to keep, in order.
+        axis (int | Literal["index", "columns"]):
+            Axis to select from. Default 0.
+
+        Returns
+        -------
+        pd.DataFrame:
+            Table with the selected rows/columns.
+        """
+        return chaining.take(self._obj, indices, axis=axes.resolve_axis(axis))
+
     def sort_totals(
         self,
         axis: Axis = 0,
@@ -347,9 +476,86 @@ class PitaFrame(PitaDisplayMixin):
         )
 
     def drop_totals(
-        self
-    ):
-        return totals.drop_totals(self._obj)
+        self,
+        axis: Axis = 0,
+        ignore_keys: str|list[str]|None = None,
+    ) -> pd.DataFrame:
+        """
+        Drop totals and subtotals from the df.
+
+        Parameters
+        ----------
+        axis (int | Literal["index", "columns", "both"]):
+            Axis to drop the totals from. Default 0.
+        ignore_keys (str|list[str]|None):
+            Keys of the totals rows/columns, matched against the labels. Default None (use the margins recorded by the totals operations).
+
+        Returns
+        -------
+        pd.DataFrame:
+            Table without totals.
+        """
+        return totals.drop_totals(
+            self._obj,
+            axis = axis,
+            ignore_keys = ignore_keys,
+        )
+
+    def drop_percentages(
+        self,
+        axis: Axis = 1,
+        ignore_keys: str|list[str]|None = None,
+    ) -> pd.DataFrame:
+        """
+        Drop percentages from the df.
+
+        Parameters
+        ----------
+        axis (int | Literal["index", "columns", "both"]):
+            Axis to drop the percentages from. Default 1.
+        ignore_keys (str|list[str]|None):
+            Keys of the percentages, matched against the labels. Default None (use the percentages recorded by `add_percentages`).
+
+        Returns
+        -------
+        pd.DataFrame:
+            Table without percentages.
+        """
+        return pct.drop_percentages(
+            self._obj,
+            axis = axis,
+            ignore_keys = ignore_keys,
+        )
+
+    def append_rows(
+        self,
+        rows: pd.DataFrame,
+        ignore_keys: str|list[str]|None = None,
+        skip_single_rows: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Append data rows to a table with totals and/or subtotals, updating the totals from the new rows only.
+
+        Parameters
+        ----------
+        rows (pd.DataFrame):
+            New data rows with the same index levels as the df. New rows are placed at the end of the group they belong to.
+        ignore_keys (str|list[str]|None):
+            Keys of the totals rows/columns, matched against the labels. Default None (use the margins recorded by the totals operations).
+        skip_single_rows (bool):
+            Whether the subtotals were added with `skip_single_rows`, which allows appending a new group of a single row. Default True.
+
+        Returns
+        -------
+        pd.DataFrame:
+            Table with the new rows added and the totals updated.
+        """
+        return totals.append_rows(
+            self._obj,
+            rows,
+            ignore_keys = ignore_keys,
+            skip_single_rows = skip_single_rows,
+        )
 
     # region io
     def export_excel(
@@ -1,3 +1,4 @@
+from concurrent.futures import Executor
 from typing import Any, Callable, Hashable, Literal, TypeAlias
 from pathlib import Path
 
@@ -7,6 +8,7 @@ import flatbread.percentages as pct
 import flatbread.agg.aggregation as agg
 import flatbread.agg.totals as totals
 import flatbread.axes as axes
+import flatbread.chaining as chaining
 from flatbread.types import Axis, Level
 from flatbread.render.display import PitaDisplayMixin
 
@@ -19,9 +21,9 @@ class PitaSeries(PitaDisplayMixin):
     #region aggregation
     def add_agg(
         self,
-        aggfunc: str|Callable,
+        aggfunc: str|Callable|list[str|Callable]|dict[str, str|Callable],
         *args,
-        label: str|None = None,
+        label: str|list[str]|None = None,
         ignore_keys: str|list[str]|None = None,
         _fill: str = '',
         **kwargs,
@@ -31,10 +33,10 @@ class PitaSeries(PitaDisplayMixin):
 
         Parameters
         ----------
-        aggfunc (str|Callable):
-            Function to use for aggregating the data.
-        label (str|None):
-            Label for the aggregated row. Default None.
+        aggfunc (str|Callable|list|dict):
+            Function to use for aggregating the data. Pass a list of functions, or a dict mapping labels to functions, to add several aggregations in one go.
+        label (str|list[str]|None):
+            Label for the aggregated row, or a label per function if aggfunc is a list. Default None.
         ignore_keys (str|list[str]|None):
             Keys of rows to ignore when aggregating.
         *args:
@@ -59,12 +61,14 @@ class PitaSeries(PitaDisplayMixin):
 
     def add_subagg(
         self,
-        aggfunc: str|Callable,
+        aggfunc: str|Callable|list[str|Callable]|dict[str, str|Callable],
         level: Level|list[Level] = 0,
-        label: str|None = None,
+        label: str|list[str]|None = None,
         include_level_name: bool = False,
         ignore_keys: str|list[str]|None = None,
         skip_single_rows: bool = True,
+        n_jobs: int|None = None,
+        executor: Executor|None = None,
         _fill: str = '',
     ) -> pd.Series:
         """
@@ -72,18 +76,22 @@ class PitaSeries(PitaDisplayMixin):
 
         Parameters
         ----------
-        aggfunc (str|Callable):
-            Function to use for aggregating the data.
+        aggfunc (str|Callable|list|dict):
+            Function to use for aggregating the data. Pass a list of functions, or a dict mapping labels to functions, to add several aggregations per group in one go.
         level (int|str|list[int|str]):
             Level(s) to aggregate with func. Default 0.
-        label (str|None):
-            Label for the aggregated rows. Default None.
+        label (str|list[str]|None):
+            Label for the aggregated rows, or a label per function if aggfunc is a list. Default None.
         include_level_name (bool):
             Whether to add level name to subtotal label.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Totals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
         skip_single_rows (bool):
             Whether to skip single rows when aggregating. Default True.
+        n_jobs (int|None):
+            Number of blocks of groups to aggregate in parallel, in a pool of as many processes unless an executor is given. Aggfuncs that cannot be pickled (e.g. lambdas) run in a thread pool instead, which only speeds up aggfuncs that release the GIL. Default None.
+        executor (Executor|None):
+            Executor to aggregate blocks of groups on, e.g. a thread pool, which only speeds up aggfuncs that release the GIL (such as the numeric string aggfuncs). Default None.
         *args:
             Positional arguments to pass to func.
         **kwargs:
@@ -94,7 +102,7 @@ class PitaSeries(PitaDisplayMixin):
         pd.Series:
             Table with aggregated rows added.
         """
-        return agg.add_agg(
+        return agg.add_subagg(
             self._obj,
             aggfunc,
             level = level,
@@ -102,6 +110,8 @@ class PitaSeries(PitaDisplayMixin):
             include_level_name = include_level_name,
             ignore_keys = ignore_keys,
             skip_single_rows = skip_single_rows,
+            n_jobs = n_jobs,
+            executor = executor,
             _fill = _fill,
         )
 
@@ -248,7 +258,7 @@ class PitaSeries(PitaDisplayMixin):
         label (str|None):
             Label for the totals row. Default 'Totals'.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Subtotals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
 
         Returns
         -------
@@ -269,6 +279,8 @@ class PitaSeries(PitaDisplayMixin):
         include_level_name: bool = False,
         ignore_keys: str|list[str]|None = None,
         skip_single_rows: bool = True,
+        n_jobs: int|None = None,
+        executor: Executor|None = None,
         _fill: str = '',
     ) -> pd.Series:
         """
@@ -283,9 +295,13 @@ class PitaSeries(PitaDisplayMixin):
         include_level_name (bool):
             Whether to add level name to subtotal label.
         ignore_keys (str|list[str]|None):
-            Keys of rows to ignore when aggregating. Default 'Totals'
+            Keys of rows to ignore when aggregating, matched against the labels. Margins added by flatbread are always ignored. Default None.
         skip_single_rows (bool):
             Whether to skip single rows when aggregating. Default True.
+        n_jobs (int|None):
+            Number of blocks of groups to aggregate in parallel, in a pool of as many processes unless an executor is given. Aggfuncs that cannot be pickled (e.g. lambdas) run in a thread pool instead, which only speeds up aggfuncs that release the GIL. Default None.
+        executor (Executor|None):
+            Executor to aggregate blocks of groups on, e.g. a thread pool, which only speeds up aggfuncs that release the GIL (such as the numeric string aggfuncs). Default None.
 
         Returns
         -------
@@ -299,9 +315,30 @@ class PitaSeries(PitaDisplayMixin):
             include_level_name = include_level_name,
             ignore_keys = ignore_keys,
             skip_single_rows = skip_single_rows,
+            n_jobs = n_jobs,
+            executor = executor,
             _fill = _fill,
         )
 
+    def take(
+        self,
+        indices: list[int],
+    ) -> pd.Series:
+        """
+        Select rows by position, keeping track of the totals.
+
+        Parameters
+        ----------
+        indices (list[int]):
+            Positions of the rows to keep, in order.
+
+        Returns
+        -------
+        pd.Series:
+            Series with the selected rows.
+        """
+        return chaining.take(self._obj, indices)
+
     def sort_totals(
         self,
         axis: Axis = 0,
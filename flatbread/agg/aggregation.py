@@ -1,9 +1,15 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+import os
 from functools import singledispatch
+import pickle
 from typing import Any, Callable
 import warnings
 
+import numpy as np
 import pandas as pd
 
+import flatbread.axes as axes
 import flatbread.chaining as chaining
 import flatbread.tooling as tooling
 from flatbread.types import Axis, Level
@@ -19,6 +25,45 @@ warnings.filterwarnings(
 
 
 # region helpers
+AggFunc = str|Callable
+AggFuncs = AggFunc|list[AggFunc]|dict[str, AggFunc]
+
+
+def get_aggfuncs(
+    aggfunc: AggFuncs,
+    label: str|list[str]|None = None,
+) -> dict[str, AggFunc]|None:
+    """
+    Map labels to aggfuncs when several aggfuncs are given, None for a single aggfunc.
+
+    A dict is taken to map labels to aggfuncs. The labels for a list of aggfuncs are taken from `label` if it is a list, else they are derived from the aggfuncs.
+    """
+    if isinstance(aggfunc, dict):
+        return dict(aggfunc)
+    if not isinstance(aggfunc, (list, tuple)):
+        return None
+
+    labels = label if isinstance(label, (list, tuple)) else [None] * len(aggfunc)
+    if len(labels) != len(aggfunc):
+        raise ValueError(
+            f"Number of labels ({len(labels)}) must match "
+            f"number of aggfuncs ({len(aggfunc)})"
+        )
+    aggfuncs = {get_label(lbl, func): func for lbl, func in zip(labels, aggfunc)}
+    if len(aggfuncs) != len(aggfunc):
+        raise ValueError(f"Labels for aggfuncs must be unique, got {list(labels)}")
+    return aggfuncs
+
+
+def is_picklable(*objs) -> bool:
+    """Check if `objs` can be sent to another process, which fails for e.g. lambdas."""
+    try:
+        pickle.dumps(objs)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
 def get_label(label, aggfunc):
     if label is not None:
         return label
@@ -79,6 +124,25 @@ def validate_index_key(
         raise ValueError(f"Aggregation row with key {key} already exists")
 
 
+def create_agg_index(
+    label: str|list[str],
+    original_index: pd.Index|pd.MultiIndex,
+    _fill: str = '',
+) -> pd.Index:
+    """Create an index holding the keys of one or more aggregation rows/columns."""
+    labels = label if isinstance(label, list) else [label]
+    if isinstance(original_index, pd.MultiIndex):
+        keys = []
+        for label in labels:
+            key = build_multiindex_key(label, original_index, _fill, None)
+            validate_index_key(original_index, key)
+            keys.append(key if isinstance(key, tuple) else (key,))
+        return pd.MultiIndex.from_tuples(keys, names=original_index.names)
+    for label in labels:
+        validate_index_key(original_index, label)
+    return pd.Index(labels, name=original_index.name)
+
+
 def create_multiindex_row(
     agged_data: pd.Series,
     key: tuple,
@@ -99,56 +163,185 @@ def create_single_index_row(
     return pd.DataFrame([agged_data], index=idx)
 
 
+# region fast path
+FAST_AGGFUNCS = ('sum', 'mean', 'count', 'min', 'max')
+FAST_DTYPES = (np.dtype('int64'), np.dtype('float64'))
+
+
+def reduce_block(
+    df: pd.DataFrame,
+    aggfunc: AggFunc,
+    axis: int,
+    mask: np.ndarray,
+) -> pd.Series|None:
+    """
+    Reduce the masked rows (axis 0) or columns (axis 1) of `df` with a single NumPy reduction, or return None if `aggfunc` and the data do not qualify.
+
+    Only the common string aggfuncs are reduced and only if the selected data is one homogeneous int64 or float64 block; the other rows/columns (e.g. ignored keys) are left untouched. The block is reduced along the same axis of the same layout as pandas does, with NaN skipped the same way, so values and dtypes match `DataFrame.agg`.
+    """
+    if not isinstance(aggfunc, str) or aggfunc not in FAST_AGGFUNCS:
+        return None
+    dtypes = df.dtypes if axis == 0 else df.dtypes[mask]
+    if len(dtypes) == 0 or not mask.any():
+        return None
+    dtype = dtypes.iloc[0]
+    if dtype not in FAST_DTYPES or not (dtypes == dtype).all():
+        return None
+
+    # only convert the selected block, the other rows/columns may hold anything
+    block = pd.DataFrame(df)
+    if not mask.all():
+        block = block.iloc[mask] if axis == 0 else block.iloc[:, mask]
+    # pandas keeps a block as (columns, rows), reduce along the same axis
+    values = np.ascontiguousarray(block.to_numpy(dtype=dtype).T)
+    labels = df.columns if axis == 0 else df.index
+    reduce_axis = 1 - axis
+
+    if dtype.kind == 'f':
+        missing = np.isnan(values)
+        counts = values.shape[reduce_axis] - missing.sum(axis=reduce_axis)
+    else:
+        missing = None
+        counts = np.full(values.shape[1 - reduce_axis], values.shape[reduce_axis])
+
+    if aggfunc == 'count':
+        result = counts.astype(np.int64)
+    elif aggfunc in ('sum', 'mean'):
+        filled = values if missing is None else np.where(missing, 0, values)
+        if aggfunc == 'sum':
+            result = filled.sum(axis=reduce_axis)
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = filled.sum(axis=reduce_axis, dtype=np.float64) / counts
+    else:
+        if missing is None:
+            result = getattr(values, aggfunc)(axis=reduce_axis)
+        else:
+            fill = np.inf if aggfunc == 'min' else -np.inf
+            result = getattr(np.where(missing, fill, values), aggfunc)(axis=reduce_axis)
+            result[counts == 0] = np.nan
+    return pd.Series(result, index=labels)
+
+
 # region aggregation
 @tooling.handle_series_as_dataframe
-@tooling.handle_axis_rotation
 def add_agg(
     df: pd.DataFrame,
-    aggfunc: str|Callable,
+    aggfunc: AggFuncs,
     *args,
-    label: str|None = None,
+    axis: Axis = 0,
+    label: str|list[str]|None = None,
     ignore_keys: str|list[str]|None = None,
     _fill: str|None = '',
     **kwargs,
 ) -> pd.DataFrame:
-    data = df.copy()
+    axis = axes.resolve_axis(axis)
+    if (aggfuncs := get_aggfuncs(aggfunc, label)) is not None:
+        return add_aggs(
+            df,
+            aggfuncs,
+            *args,
+            axis = axis,
+            ignore_keys = ignore_keys,
+            _fill = _fill,
+            **kwargs,
+        )
     label = get_label(label, aggfunc)
-    rows = chaining.get_data_mask(data.index, ignore_keys)
+    margins = chaining.get_margins(df, axis, ignore_keys)
 
-    agged = data.loc[rows].agg(aggfunc, *args, **kwargs)
-    new_row = create_agg_row(
-        agged,
-        label = label,
-        original_index = data.index,
-        _fill = _fill,
-    )
-    return pd.concat([data, new_row], names=data.index.names)
+    agged = None
+    if not args and not kwargs:
+        agged = reduce_block(df, aggfunc, axis, margins < 0)
+
+    if axis == 1:
+        if agged is None:
+            agged = df.loc[:, margins < 0].agg(aggfunc, *args, axis=1, **kwargs)
+        new_column = agged.to_frame().set_axis(
+            create_agg_index(label, df.columns, _fill),
+            axis = 1,
+        )
+        output = pd.concat([df, new_column], axis=1)
+    else:
+        if agged is None:
+            agged = df.loc[margins < 0].agg(aggfunc, *args, **kwargs)
+        new_row = create_agg_row(
+            agged,
+            label = label,
+            original_index = df.index,
+            _fill = _fill,
+        )
+        output = pd.concat([df, new_row], names=df.index.names)
+    return with_margins(output, df, axis, np.append(margins, 0))
+
+
+def add_aggs(
+    df: pd.DataFrame,
+    aggfuncs: dict[str, AggFunc],
+    *args,
+    axis: int = 0,
+    ignore_keys: str|list[str]|None = None,
+    _fill: str|None = '',
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Add a row/column per aggfunc, computed in one `agg` call over the data and appended with one concat.
+    """
+    keys = create_agg_index(list(aggfuncs), df.columns if axis == 1 else df.index, _fill)
+    margins = chaining.get_margins(df, axis, ignore_keys)
+
+    if axis == 1:
+        agged = df.loc[:, margins < 0].agg(list(aggfuncs.values()), *args, axis=1, **kwargs)
+        output = pd.concat([df, agged.set_axis(keys, axis=1)], axis=1)
+    else:
+        agged = df.loc[margins < 0].agg(list(aggfuncs.values()), *args, **kwargs)
+        output = pd.concat([df, agged.set_axis(keys, axis=0)], names=df.index.names)
+    margins = np.concatenate([margins, np.zeros(len(keys), dtype=np.intp)])
+    return with_margins(output, df, axis, margins)
+
+
+def with_margins(
+    output: pd.DataFrame,
+    data: pd.DataFrame,
+    axis: int,
+    margins: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Record the margins along `axis` on `output` and carry over the margins of `data` along the other axis if it is unchanged.
+    """
+    chaining.record_margins(output, axis, margins)
+    chaining.carry_margins(data, output)
+    return output
 
 
 # region subagg
 @tooling.handle_series_as_dataframe
-@tooling.handle_axis_rotation
 def add_subagg(
     df: pd.DataFrame,
-    aggfunc: str|Callable,
+    aggfunc: AggFuncs,
     *args,
+    axis: Axis = 0,
     level: Level = 0,
-    label: str|None = None,
+    label: str|list[str]|None = None,
     include_level_name: bool = False,
     ignore_keys: str|list[str]|None = None,
     skip_single_rows: bool = True,
+    n_jobs: int|None = None,
+    executor: Executor|None = None,
     _fill = '',
     **kwargs,
 ):
     return _subagg_implementation(
-        df.copy(),
+        df,
         aggfunc,
         *args,
+        axis=axes.resolve_axis(axis),
         level=level,
         label=label,
         include_level_name=include_level_name,
         ignore_keys=ignore_keys,
         skip_single_rows=skip_single_rows,
+        n_jobs=n_jobs,
+        executor=executor,
         _fill=_fill,
         **kwargs,
     )
@@ -156,54 +349,309 @@ def add_subagg(
 
 def _subagg_implementation(
     data: pd.DataFrame,
-    aggfunc: str|Callable,
+    aggfunc: AggFuncs,
     *args,
+    axis: int = 0,
     level: Level = 0,
-    label: str|None = None,
+    label: str|list[str]|None = None,
     include_level_name: bool = False,
     ignore_keys: str|list[str]|None = None,
     skip_single_rows: bool = True,
+    n_jobs: int|None = None,
+    executor: Executor|None = None,
     _fill = '',
     **kwargs,
 ):
-    names = data.index.names
-    label = get_label(label, aggfunc)
+    target = data.columns if axis == 1 else data.index
+    names = target.names
+    aggfuncs = get_aggfuncs(aggfunc, label)
+    if aggfuncs is None:
+        aggfuncs = {get_label(label, aggfunc): aggfunc}
     levels = get_levels(level, names)
 
     # checks
     msg = 'Flatbread cannot perform subaggregation if axis is not MultiIndex'
-    assert isinstance(data.index, pd.MultiIndex), msg
-    nlevels = data.index.nlevels
+    assert isinstance(target, pd.MultiIndex), msg
+    nlevels = target.nlevels
     for level in levels:
         assert level < nlevels - 1, f'Level must be smaller than {nlevels - 1}'
 
-    def process_groups(groups):
-        processed = []
-        for levels, group in groups:
-            levels = (levels,) if pd.api.types.is_scalar(levels) else levels
-            level_value = levels[-1] if isinstance(levels, tuple) else levels
-
-            subtotal_label = label
-            if include_level_name:
-                subtotal_label = f"{label} {level_value}"
-
-            rows = chaining.get_data_mask(group.index, ignore_keys)
-            if sum(rows) > (1 if skip_single_rows else 0):
-                subagged = group.loc[rows].agg(aggfunc, *args, **kwargs)
-                new_row = create_agg_row(
-                    subagged,
-                    subtotal_label,
-                    original_index = data.index,
-                    _fill = _fill,
-                    group_levels = levels,
-                )
-                group = pd.concat([group, new_row])
-
-            processed.append(group)
-        return pd.concat(processed)
-
     output = data
-    for level in sorted(levels, reverse=True):
-        grouper = 0 if level == 0 else list(range(level + 1))
-        output = output.groupby(level=grouper, sort=False).pipe(process_groups)
+    with ExitStack() as stack:
+        # python-level aggfuncs hold the GIL, so only processes run them in parallel
+        # but lambdas and local functions can only run in threads
+        if executor is None and n_jobs is not None and n_jobs > 1:
+            pool = ProcessPoolExecutor if is_picklable(aggfuncs, args, kwargs) else ThreadPoolExecutor
+            executor = stack.enter_context(pool(n_jobs))
+        for level in sorted(levels, reverse=True):
+            output = add_level_subaggs(
+                output,
+                aggfuncs,
+                *args,
+                axis = axis,
+                level = level,
+                include_level_name = include_level_name,
+                ignore_keys = ignore_keys,
+                skip_single_rows = skip_single_rows,
+                original_index = target,
+                n_jobs = n_jobs,
+                executor = executor,
+                _fill = _fill,
+                **kwargs,
+            )
     return output
+
+
+def add_level_subaggs(
+    data: pd.DataFrame,
+    aggfuncs: dict[str, AggFunc],
+    *args,
+    axis: int,
+    level: int,
+    include_level_name: bool,
+    ignore_keys: str|list[str]|None,
+    skip_single_rows: bool,
+    original_index: pd.MultiIndex,
+    n_jobs: int|None = None,
+    executor: Executor|None = None,
+    _fill = '',
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Add subaggregation rows/columns for every group of `level` in a single pass.
+
+    Rows are aggregated for all groups and aggfuncs in one grouped `agg` call, columns are aggregated per group with `agg(axis=1)`. With an `executor` the groups are split into `n_jobs` blocks (default: one per CPU) that are aggregated in parallel. The results are then placed after their groups, one per aggfunc in the order given, with one positional take. Groups appear in order of first appearance, rows/columns without a group (missing keys) are dropped, mirroring `groupby(sort=False)`.
+    """
+    target = data.columns if axis == 1 else data.index
+    group_ids, ngroups = get_group_ids(target, level)
+    margins = chaining.get_margins(data, axis, ignore_keys)
+    mask = (margins < 0) & (group_ids >= 0)
+
+    counts = np.bincount(group_ids[mask], minlength=ngroups)
+    threshold = 1 if skip_single_rows else 0
+    selected = np.flatnonzero(counts > threshold)
+
+    if executor is not None and len(selected) > 1:
+        agged = aggregate_groups_parallel(
+            data,
+            aggfuncs,
+            *args,
+            axis = axis,
+            group_ids = group_ids,
+            mask = mask,
+            counts = counts,
+            selected = selected,
+            n_jobs = n_jobs,
+            executor = executor,
+            **kwargs,
+        )
+    elif axis == 1:
+        agged = aggregate_column_groups(
+            data,
+            aggfuncs,
+            *args,
+            group_ids = group_ids,
+            mask = mask,
+            counts = counts,
+            selected = selected,
+            **kwargs,
+        )
+    else:
+        agged = aggregate_row_groups(
+            data,
+            aggfuncs,
+            *args,
+            group_ids = group_ids,
+            mask = mask,
+            selected = selected,
+            **kwargs,
+        )
+
+    keys = build_subagg_keys(
+        target,
+        group_ids,
+        selected,
+        level = level,
+        label = list(aggfuncs),
+        include_level_name = include_level_name,
+        _fill = _fill,
+    )
+    validate_index_keys(original_index, keys)
+    new_items = agged.set_axis(keys, axis=axis)
+
+    # sort by group keeping the original order, subaggregations go last
+    n_stats = len(aggfuncs)
+    positions = np.flatnonzero(group_ids >= 0)
+    sort_keys = np.concatenate([
+        group_ids[positions] * 2,
+        np.repeat(selected * 2 + 1, n_stats),
+    ])
+    positions = np.concatenate([
+        positions,
+        np.arange(len(selected) * n_stats) + len(target),
+    ])
+    order = positions[np.argsort(sort_keys, kind='stable')]
+    output = pd.concat([data, new_items], axis=axis).take(order, axis=axis)
+    margins = np.concatenate([margins, np.full(len(keys), level + 1)])
+    return with_margins(output, data, axis, margins[order])
+
+
+def aggregate_groups_parallel(
+    data: pd.DataFrame,
+    aggfuncs: dict[str, AggFunc],
+    *args,
+    axis: int,
+    group_ids: np.ndarray,
+    mask: np.ndarray,
+    counts: np.ndarray,
+    selected: np.ndarray,
+    n_jobs: int|None,
+    executor: Executor,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Aggregate the selected groups in contiguous blocks on `executor` and stitch the results together in the original order.
+
+    The groups are split into `n_jobs` blocks, or one block per CPU if not given. Every task gets only the rows/columns of its own block, so a process pool only has to pickle its share of the data. Aggfuncs must be picklable when using a process pool.
+    """
+    n_blocks = n_jobs or os.cpu_count() or 1
+    blocks = np.array_split(selected, min(n_blocks, len(selected)))
+
+    futures = []
+    for block in blocks:
+        in_block = np.zeros(len(counts), dtype=bool)
+        in_block[block] = True
+        positions = np.flatnonzero(mask & in_block[np.maximum(group_ids, 0)])
+        part = data.iloc[:, positions] if axis == 1 else data.iloc[positions]
+        if axis == 1:
+            futures.append(executor.submit(
+                aggregate_column_groups,
+                part,
+                aggfuncs,
+                *args,
+                group_ids = group_ids[positions],
+                mask = np.ones(len(positions), dtype=bool),
+                counts = np.where(in_block, counts, 0),
+                selected = block,
+                **kwargs,
+            ))
+        else:
+            futures.append(executor.submit(
+                aggregate_row_groups,
+                part,
+                aggfuncs,
+                *args,
+                group_ids = group_ids[positions],
+                mask = np.ones(len(positions), dtype=bool),
+                selected = block,
+                **kwargs,
+            ))
+    return pd.concat([future.result() for future in futures], axis=axis)
+
+
+def aggregate_row_groups(
+    data: pd.DataFrame,
+    aggfuncs: dict[str, AggFunc],
+    *args,
+    group_ids: np.ndarray,
+    mask: np.ndarray,
+    selected: np.ndarray,
+    **kwargs,
+) -> pd.DataFrame:
+    """Aggregate the masked rows of each selected group, one row per group and aggfunc."""
+    grouped = data.loc[mask].groupby(group_ids[mask])
+    funcs = list(aggfuncs.values())
+    if len(funcs) == 1:
+        return grouped.agg(funcs[0], *args, **kwargs).loc[selected]
+
+    # columns come out as (column, aggfunc) pairs, split them per aggfunc
+    n_stats = len(funcs)
+    agged = grouped.agg(funcs, *args, **kwargs).loc[selected]
+    stats = [
+        agged.iloc[:, i::n_stats].set_axis(data.columns, axis=1)
+        for i in range(n_stats)
+    ]
+    order = np.arange(len(selected) * n_stats).reshape(n_stats, -1).T.ravel()
+    return pd.concat(stats).take(order)
+
+
+def aggregate_column_groups(
+    data: pd.DataFrame,
+    aggfuncs: dict[str, AggFunc],
+    *args,
+    group_ids: np.ndarray,
+    mask: np.ndarray,
+    counts: np.ndarray,
+    selected: np.ndarray,
+    **kwargs,
+) -> pd.DataFrame:
+    """Aggregate the masked columns of each selected group along the rows, one column per group and aggfunc."""
+    funcs = list(aggfuncs.values())
+    aggfunc = funcs[0] if len(funcs) == 1 else funcs
+    positions = np.flatnonzero(mask)
+    positions = positions[np.argsort(group_ids[positions], kind='stable')]
+    ends = np.cumsum(counts)
+    starts = np.concatenate([[0], ends[:-1]])
+
+    columns = [
+        data
+        .iloc[:, positions[starts[group]:ends[group]]]
+        .agg(aggfunc, *args, axis=1, **kwargs)
+        for group in selected
+    ]
+    if not columns:
+        return pd.DataFrame(index=data.index)
+    return pd.concat(columns, axis=1)
+
+
+def get_group_ids(
+    index: pd.MultiIndex,
+    level: int,
+) -> tuple[np.ndarray, int]:
+    """
+    Number the groups formed by levels 0 up to and including `level` in order of first appearance. Rows with a missing key get -1.
+    """
+    grouper = 0 if level == 0 else list(range(level + 1))
+    groups = pd.Series(0, index=index).groupby(level=grouper, sort=False)
+    group_ids = groups.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    return group_ids, groups.ngroups
+
+
+def build_subagg_keys(
+    index: pd.MultiIndex,
+    group_ids: np.ndarray,
+    selected: np.ndarray,
+    level: int,
+    label: str|list[str],
+    include_level_name: bool,
+    _fill: str,
+) -> pd.MultiIndex:
+    """Build the keys of the subaggregation rows for the `selected` groups, one per label for every group."""
+    label = label if isinstance(label, list) else [label]
+    first_positions = np.unique(group_ids, return_index=True)[1]
+    if len(group_ids) and group_ids.min() < 0:
+        first_positions = first_positions[1:]
+    positions = np.repeat(first_positions[selected], len(label))
+
+    arrays = [
+        index.levels[i].take(index.codes[i][positions])
+        for i in range(level + 1)
+    ]
+    labels = label * len(selected)
+    if include_level_name:
+        labels = [f"{lbl} {value}" for lbl, value in zip(labels, arrays[-1])]
+    arrays.append(labels)
+    for _ in range(index.nlevels - level - 2):
+        arrays.append([_fill] * len(positions))
+    return pd.MultiIndex.from_arrays(arrays, names=index.names)
+
+
+def validate_index_keys(
+    original_index: pd.Index|pd.MultiIndex,
+    keys: pd.Index|pd.MultiIndex,
+) -> None:
+    """Validate that none of the keys already exist."""
+    exists = keys.isin(original_index)
+    if exists.any():
+        key = keys[exists.argmax()]
+        raise ValueError(f"Aggregation row with key {key} already exists")
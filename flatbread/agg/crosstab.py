@@ -0,0 +1,244 @@
+from collections.abc import Iterable
+from typing import Literal
+
+import pandas as pd
+
+from flatbread.agg.totals import add_subtotals, add_totals
+from flatbread.types import Axis, Level
+import flatbread.axes as axes
+import flatbread.percentages as pct
+
+
+AggFunc = Literal['size', 'count', 'sum']
+ADDITIVE_AGGFUNCS = ('size', 'count', 'sum')
+
+
+def crosstab(
+    data: pd.DataFrame,
+    index: str|list[str],
+    columns: str|list[str]|None = None,
+    values: str|None = None,
+    aggfunc: AggFunc = 'size',
+    *,
+    axis: Axis = 2,
+    totals: bool = True,
+    subtotals: bool = False,
+    level: Level|list[Level] = 0,
+    percentages: bool = False,
+    ndigits: int = -1,
+) -> pd.DataFrame:
+    """
+    Tabulate long-format records into a flatbread table with margins.
+
+    The records are scanned once: a single grouped reduction over the row and column keys yields the cells. The table is laid out from the cells and the margins are computed from the cells, which is exact because the supported aggfuncs are additive. The margins follow the semantics of `add_subtotals`, `add_totals` and `add_percentages`.
+
+    Parameters
+    ----------
+    data (pd.DataFrame):
+        Long-format records.
+    index (str|list[str]):
+        Column(s) of `data` to use as row keys.
+    columns (str|list[str]|None):
+        Column(s) of `data` to use as column keys. Default None (a single column of cells).
+    values (str|None):
+        Column of `data` to aggregate. Required unless aggfunc is 'size'.
+    aggfunc (Literal['size', 'count', 'sum']):
+        Reduction to compute the cells with. Default 'size'.
+    axis (int | Literal["index", "columns", "both"]):
+        Axis to add the margins to. Default 2 (rows only if there are no column keys).
+    totals (bool):
+        Whether to add totals. Default True.
+    subtotals (bool):
+        Whether to add subtotals for `level`. Only axes with more than one key are subtotaled when axis is 2. Default False.
+    level (int|str|list[int|str]):
+        Level(s) to add subtotals for. Default 0.
+    percentages (bool):
+        Whether to add percentages of the totals along `axis`. Default False.
+    ndigits (int):
+        Number of digits to round percentages to. Default is -1 (no rounding).
+
+    Returns
+    -------
+    pd.DataFrame:
+        Table with cells and margins.
+    """
+    index = as_list(index)
+    columns = as_list(columns)
+    cells = reduce_cells(data, [*index, *columns], values, aggfunc)
+    return build_table(
+        cells,
+        nlevels = len(index),
+        axis = axis,
+        totals = totals,
+        subtotals = subtotals,
+        level = level,
+        percentages = percentages,
+        ndigits = ndigits,
+    )
+
+
+def crosstab_chunks(
+    chunks: Iterable[pd.DataFrame],
+    index: str|list[str],
+    columns: str|list[str]|None = None,
+    values: str|None = None,
+    aggfunc: AggFunc = 'size',
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Tabulate records arriving in chunks, e.g. from `pd.read_csv(..., chunksize=n)` or the batches of a Parquet file, into a flatbread table with margins.
+
+    Every chunk is reduced to its cells and folded into a `CellAccumulator`, so memory depends on the number of groups rather than the number of records. The table is only laid out (and the margins added) at the end, the same way as `crosstab`.
+
+    Parameters
+    ----------
+    chunks (Iterable[pd.DataFrame]):
+        Long-format records in chunks.
+    index (str|list[str]):
+        Column(s) to use as row keys.
+    columns (str|list[str]|None):
+        Column(s) to use as column keys. Default None.
+    values (str|None):
+        Column to aggregate. Required unless aggfunc is 'size'.
+    aggfunc (Literal['size', 'count', 'sum']):
+        Reduction to compute the cells with. Default 'size'.
+    **kwargs:
+        Margins to add, see `crosstab`.
+
+    Returns
+    -------
+    pd.DataFrame:
+        Table with cells and margins.
+    """
+    accumulator = CellAccumulator(index, columns, values=values, aggfunc=aggfunc)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.to_table(**kwargs)
+
+
+class CellAccumulator:
+    """
+    Fold chunks of records into the cells of a table.
+
+    The cells of each chunk are added to the running cells, which is exact for the additive aggfuncs (for floats up to the order of summation).
+
+    Parameters
+    ----------
+    index (str|list[str]):
+        Column(s) to use as row keys.
+    columns (str|list[str]|None):
+        Column(s) to use as column keys. Default None.
+    values (str|None):
+        Column to aggregate. Required unless aggfunc is 'size'.
+    aggfunc (Literal['size', 'count', 'sum']):
+        Reduction to compute the cells with. Default 'size'.
+    """
+    def __init__(
+        self,
+        index: str|list[str],
+        columns: str|list[str]|None = None,
+        values: str|None = None,
+        aggfunc: AggFunc = 'size',
+    ):
+        self.index = as_list(index)
+        self.columns = as_list(columns)
+        self.values = values
+        self.aggfunc = aggfunc
+        self.cells: pd.Series|None = None
+
+    @property
+    def keys(self) -> list[str]:
+        return [*self.index, *self.columns]
+
+    def update(self, chunk: pd.DataFrame) -> "CellAccumulator":
+        """Add the cells of `chunk` to the running cells."""
+        cells = reduce_cells(chunk, self.keys, self.values, self.aggfunc)
+        if self.cells is not None:
+            cells = merge_cells([self.cells, cells])
+        self.cells = cells
+        return self
+
+    def merge(self, other: "CellAccumulator") -> "CellAccumulator":
+        """Add the running cells of another accumulator, e.g. of another part of the source."""
+        if other.cells is not None:
+            parts = [other.cells] if self.cells is None else [self.cells, other.cells]
+            self.cells = merge_cells(parts)
+        return self
+
+    def to_table(self, **kwargs) -> pd.DataFrame:
+        """
+        Lay out the cells as a table and add the margins, see `crosstab` for the keywords.
+        """
+        if self.cells is None:
+            raise ValueError('No records were added.')
+        return build_table(self.cells, nlevels=len(self.index), **kwargs)
+
+
+def merge_cells(parts: list[pd.Series]) -> pd.Series:
+    """Add up cells sharing the same keys."""
+    cells = pd.concat(parts)
+    levels = list(range(cells.index.nlevels))
+    return cells.groupby(level=levels, sort=True).sum()
+
+
+def reduce_cells(
+    data: pd.DataFrame,
+    keys: list[str],
+    values: str|None,
+    aggfunc: AggFunc,
+) -> pd.Series:
+    """
+    Reduce the records to one value per combination of `keys` in a single grouped reduction.
+    """
+    if aggfunc not in ADDITIVE_AGGFUNCS:
+        raise ValueError(
+            f'Cannot tabulate with {aggfunc!r}, use one of {ADDITIVE_AGGFUNCS}.'
+        )
+    grouped = data.groupby(keys, observed=True, sort=True)
+    if aggfunc == 'size':
+        return grouped.size().rename(values or aggfunc)
+    if values is None:
+        raise ValueError(f'Tabulating with {aggfunc!r} requires values.')
+    return grouped[values].agg(aggfunc)
+
+
+def build_table(
+    cells: pd.Series,
+    nlevels: int,
+    *,
+    axis: Axis = 2,
+    totals: bool = True,
+    subtotals: bool = False,
+    level: Level|list[Level] = 0,
+    percentages: bool = False,
+    ndigits: int = -1,
+) -> pd.DataFrame:
+    """
+    Lay out the cells as a table, with the first `nlevels` keys on the rows and the rest on the columns, and add the margins.
+    """
+    if cells.index.nlevels > nlevels:
+        column_levels = list(range(nlevels, cells.index.nlevels))
+        table = cells.unstack(column_levels, fill_value=0)
+    else:
+        table = cells.to_frame()
+        axis = 0
+    axis = axes.resolve_axis(axis)
+
+    if subtotals:
+        for target in [0, 1] if axis == 2 else [axis]:
+            target_index = table.columns if target == 1 else table.index
+            if axis == 2 and target_index.nlevels < 2:
+                continue
+            table = add_subtotals(table, axis=target, level=level)
+    if totals:
+        table = add_totals(table, axis=axis)
+    if percentages:
+        table = pct.add_percentages(table, axis=axis, ndigits=ndigits)
+    return table
+
+
+def as_list(keys: str|list[str]|None) -> list[str]:
+    """Put a single key in a list."""
+    if keys is None:
+        return []
+    return [keys] if isinstance(keys, str) else list(keys)
@@ -0,0 +1,342 @@
+from collections.abc import Iterable
+from copy import deepcopy
+from functools import partial
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from flatbread import DEFAULTS
+from flatbread.agg.crosstab import as_list
+from flatbread.types import Axis, Level
+import flatbread.agg.aggregation as agg
+import flatbread.axes as axes
+import flatbread.chaining as chaining
+import flatbread.percentages as pct
+
+
+Stat = Literal['count', 'sum', 'mean', 'var', 'std', 'min', 'max']
+
+# how each state is combined, both when merging partials and in the margins
+# the moments (mean and M2) are combined with `center_moments` instead
+STATES = {
+    'count': 'sum',
+    'sum': 'sum',
+    'min': 'min',
+    'max': 'max',
+}
+MOMENTS = ('mean', 'm2')
+
+
+def reduce_partials(
+    data: pd.DataFrame,
+    index: str|list[str],
+    columns: str|list[str]|None = None,
+    values: str|None = None,
+) -> pd.DataFrame:
+    """
+    Reduce records to mergeable aggregate states, one row per combination of keys.
+
+    The states (count, sum, mean, M2 (sum of squared deviations from the mean), min and max of `values`) of several shards can be combined with `merge_partials` and turned into a table with `finalize_partials`, without moving the records themselves.
+
+    Parameters
+    ----------
+    data (pd.DataFrame):
+        Long-format records.
+    index (str|list[str]):
+        Column(s) of `data` to use as row keys.
+    columns (str|list[str]|None):
+        Column(s) of `data` to use as column keys. Default None.
+    values (str|None):
+        Column of `data` to aggregate.
+
+    Returns
+    -------
+    pd.DataFrame:
+        Partial table with a column per state.
+    """
+    keys = [*as_list(index), *as_list(columns)]
+    records = data[keys].assign(value=data[values])
+    mean = records.groupby(keys, observed=True)['value'].transform('mean')
+    states = (
+        records
+        .assign(deviation=(records['value'] - mean) ** 2)
+        .groupby(keys, observed=True, sort=True)
+        .agg(
+            count = ('value', 'count'),
+            sum = ('value', 'sum'),
+            mean = ('value', 'mean'),
+            m2 = ('deviation', 'sum'),
+            min = ('value', 'min'),
+            max = ('value', 'max'),
+        )
+    )
+    states.attrs['flatbread'] = {'partials': {'nlevels': len(as_list(index))}}
+    return states
+
+
+def merge_partials(partials: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine partial tables into one. Merging is associative and commutative, so partials can be combined in any order or tree. The moments are combined with the parallel formula of Chan et al. (see `center_moments`), which does not lose precision when the values are far from zero.
+
+    Parameters
+    ----------
+    partials (Iterable[pd.DataFrame]):
+        Partial tables from `reduce_partials` or earlier merges.
+
+    Returns
+    -------
+    pd.DataFrame:
+        Partial table with the states combined per combination of keys.
+    """
+    partials = list(partials)
+    if not partials:
+        raise ValueError('No partials to merge.')
+    combined = pd.concat(partials)
+    levels = list(range(combined.index.nlevels))
+    grouped = combined.groupby(level=levels, sort=True)
+    merged = grouped.agg(STATES)
+
+    group_means, between = center_moments(
+        combined['count'].to_numpy(dtype=float),
+        combined['mean'].to_numpy(dtype=float),
+        grouped.ngroup().to_numpy(),
+    )
+    m2 = (combined['m2'] + between).groupby(level=levels, sort=True).sum()
+    merged = merged.assign(mean=group_means, m2=m2)[list(combined.columns)]
+    merged.attrs = deepcopy(partials[0].attrs)
+    return merged
+
+
+def finalize_partials(
+    partials: pd.DataFrame,
+    stat: Stat = 'sum',
+    *,
+    axis: Axis = 2,
+    totals: bool = True,
+    subtotals: bool = False,
+    level: Level|list[Level] = 0,
+    percentages: bool = False,
+    ndigits: int = -1,
+    ddof: int = 1,
+) -> pd.DataFrame:
+    """
+    Lay out a partial table as a flatbread table of `stat` with margins.
+
+    Every state is laid out and given its margins with `add_subagg`/`add_agg`, combining the states of the covered cells the same way as `merge_partials`. The statistic is only computed from the states at the end, so the margins hold the statistic over all records they cover (e.g. the mean of all records rather than the mean of the cell means).
+
+    Parameters
+    ----------
+    partials (pd.DataFrame):
+        Partial table from `reduce_partials` or `merge_partials`.
+    stat (Literal['count', 'sum', 'mean', 'var', 'std', 'min', 'max']):
+        Statistic to compute. Default 'sum'.
+    axis (int | Literal["index", "columns", "both"]):
+        Axis to add the margins to. Default 2 (rows only if there are no column keys).
+    totals (bool):
+        Whether to add totals. Default True.
+    subtotals (bool):
+        Whether to add subtotals for `level`. Only axes with more than one key are subtotaled when axis is 2. Default False.
+    level (int|str|list[int|str]):
+        Level(s) to add subtotals for. Default 0.
+    percentages (bool):
+        Whether to add percentages of the totals along `axis`. Default False.
+    ndigits (int):
+        Number of digits to round percentages to. Default is -1 (no rounding).
+    ddof (int):
+        Delta degrees of freedom for 'var' and 'std'. Default 1.
+
+    Returns
+    -------
+    pd.DataFrame:
+        Table with the statistic and margins.
+    """
+    nlevels = partials.attrs['flatbread']['partials']['nlevels']
+    if partials.index.nlevels == nlevels:
+        axis = 0
+    axis = axes.resolve_axis(axis)
+
+    states = {
+        state: layout_state(partials[state], nlevels, state, name=stat)
+        for state in [*STATES, *MOMENTS]
+    }
+    states = add_margins(
+        states,
+        axis = axis,
+        totals = totals,
+        subtotals = subtotals,
+        level = level,
+    )
+    table = compute_stat(states, stat, ddof=ddof)
+    table.attrs = deepcopy(states['count'].attrs)
+    if totals or subtotals:
+        ignore_keys = {DEFAULTS['totals']['label'], DEFAULTS['subtotals']['label']}
+        table.attrs['flatbread']['totals'] = {'ignore_keys': ignore_keys}
+    if percentages:
+        table = pct.add_percentages(table, axis=axis, ndigits=ndigits)
+    return table
+
+
+def layout_state(
+    cells: pd.Series,
+    nlevels: int,
+    state: str,
+    name: str,
+) -> pd.DataFrame:
+    """Put the row keys of a state on the rows and the column keys on the columns, or in a single column `name` if there are none."""
+    if cells.index.nlevels == nlevels:
+        return cells.to_frame(name=name)
+    fill_value = 0 if state == 'm2' or STATES.get(state) == 'sum' else None
+    column_levels = list(range(nlevels, cells.index.nlevels))
+    table = cells.unstack(column_levels, fill_value=fill_value)
+    table.columns.names = cells.index.names[nlevels:]
+    return table
+
+
+def add_margins(
+    states: dict[str, pd.DataFrame],
+    *,
+    axis: int,
+    totals: bool,
+    subtotals: bool,
+    level: Level|list[Level],
+) -> dict[str, pd.DataFrame]:
+    """
+    Add subtotals and totals to every state, in the same layout as `add_subtotals` and `add_totals`.
+    """
+    targets = [0, 1] if axis == 2 else [axis]
+    if subtotals:
+        for target in targets:
+            index = states['count'].columns if target == 1 else states['count'].index
+            if axis == 2 and index.nlevels < 2:
+                continue
+            # one level at a time, deepest first, like `add_subagg`
+            levels = agg.get_levels(level, list(index.names))
+            for level_ in sorted(levels, reverse=True):
+                states = add_margin(states, target, level_)
+    if totals:
+        for target in targets:
+            states = add_margin(states, target)
+    return states
+
+
+def add_margin(
+    states: dict[str, pd.DataFrame],
+    axis: int,
+    level: int|None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Add the subtotals of `level`, or the totals if `level` is None, along `axis` to every state.
+
+    The states in `STATES` are combined with their reducer. The moments are combined with `center_moments`: the mean of a margin is the weighted mean of the covered cells and its M2 the sum of their M2 and their weighted squared deviations from that mean.
+    """
+    if level is None:
+        add_step = partial(agg.add_agg, axis=axis, label=DEFAULTS['totals']['label'])
+    else:
+        add_step = partial(
+            agg.add_subagg,
+            axis = axis,
+            level = level,
+            label = DEFAULTS['subtotals']['label'],
+        )
+
+    count = states['count']
+    index = count.columns if axis == 1 else count.index
+    margins = chaining.get_margins(count, axis, None)
+    group_ids = np.zeros(len(index), dtype=np.intp)
+    if level is not None:
+        group_ids = agg.get_group_ids(index, level)[0]
+    group_ids = np.where(margins < 0, group_ids, -1)
+
+    counts, means = (table.to_numpy(dtype=float) for table in [count, states['mean']])
+    weighted = np.where(counts > 0, counts * means, 0)
+    # center_moments groups rows, so lay the target axis out on the rows
+    if axis == 1:
+        between = center_moments(counts.T, means.T, group_ids)[1].T
+    else:
+        between = center_moments(counts, means, group_ids)[1]
+
+    output = {state: add_step(states[state], reducer) for state, reducer in STATES.items()}
+    between, weighted = (
+        add_step(like_table(count, values), 'sum')
+        for values in [between, weighted]
+    )
+    m2 = add_step(states['m2'], 'sum')
+    mean = add_step(states['mean'], 'sum')
+
+    # only the new margins take the combined moments
+    new_index = output['count'].columns if axis == 1 else output['count'].index
+    is_new = ~new_index.isin(index)
+    is_new = np.broadcast_to(
+        is_new[None, :] if axis == 1 else is_new[:, None],
+        output['count'].shape,
+    )
+    margin_count = output['count'].where(output['count'] > 0)
+    output['mean'] = mean.mask(is_new, weighted / margin_count)
+    output['m2'] = m2 + between.where(is_new, 0)
+    return output
+
+
+def like_table(table: pd.DataFrame, values: np.ndarray) -> pd.DataFrame:
+    """Put `values` in a table with the labels and recorded margins of `table`."""
+    result = pd.DataFrame(values, index=table.index, columns=table.columns)
+    chaining.carry_margins(table, result)
+    return result
+
+
+def center_moments(
+    counts: np.ndarray,
+    means: np.ndarray,
+    group_ids: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the weighted mean of every group of rows and the weighted squared deviation of every row from the mean of its group: n_i * (mean_i - mean) ** 2.
+
+    Per the parallel formula of Chan et al., the M2 of a group is the sum of the M2 and the squared deviations of its rows. Taking the deviations from the means, rather than working from sums of squares, keeps the M2 accurate when the values are far from zero. Rows with a group id of -1 get a deviation of 0.
+
+    Parameters
+    ----------
+    counts (np.ndarray):
+        Counts of the rows, 1d or 2d with a column per statistic.
+    means (np.ndarray):
+        Means of the rows, in the same shape as `counts`.
+    group_ids (np.ndarray):
+        Group of each row, -1 if it is not in a group.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]:
+        The mean per group and the deviation per row.
+    """
+    in_group = group_ids >= 0
+    ngroups = group_ids.max() + 1 if in_group.any() else 0
+    ids = group_ids[in_group]
+    means = np.where(counts > 0, means, 0)
+
+    totals = np.zeros((ngroups, *counts.shape[1:]))
+    weighted = np.zeros((ngroups, *counts.shape[1:]))
+    np.add.at(totals, ids, counts[in_group])
+    np.add.at(weighted, ids, (counts * means)[in_group])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_means = weighted / totals
+
+    deviations = np.zeros(counts.shape)
+    deviations[in_group] = np.nan_to_num(
+        counts[in_group] * (means[in_group] - group_means[ids]) ** 2
+    )
+    return group_means, deviations
+
+
+def compute_stat(
+    states: dict[str, pd.DataFrame],
+    stat: Stat,
+    ddof: int = 1,
+) -> pd.DataFrame:
+    """Compute `stat` from the (laid out) states."""
+    if stat in ('count', 'sum', 'mean', 'min', 'max'):
+        return states[stat]
+    if stat in ('var', 'std'):
+        count = states['count']
+        var = states['m2'] / (count - ddof).where(count > ddof)
+        return var.pipe(np.sqrt) if stat == 'std' else var
+    raise ValueError(f'Unknown statistic {stat!r}.')
@@ -1,5 +1,7 @@
-from typing import Literal
+from concurrent.futures import Executor
+from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 
 from flatbread import DEFAULTS
@@ -11,13 +13,13 @@ import flatbread.chaining as chaining
 
 
 # region totals
-@tooling.inject_defaults(DEFAULTS['totals'])
+@tooling.inject_defaults(DEFAULTS.section('totals'))
 @chaining.persist_ignored('totals', 'label')
 def add_totals(
     data: pd.DataFrame|pd.Series,
     axis: Axis|Literal[2, 'both'] = 2,
     label: str|None = 'Totals',
-    ignore_keys: str|list[str]|None = 'Subtotals',
+    ignore_keys: str|list[str]|None = None,
     _fill: str|None = '',
 ) -> pd.DataFrame|pd.Series:
     axis = axes.resolve_axis(axis)
@@ -30,29 +32,118 @@ def add_totals(
             ignore_keys = ignore_keys,
             _fill = _fill
         )
+    elif isinstance(data, pd.Series):
+        # a series only has an index to add totals to
+        output = agg.add_agg(
+            data,
+            'sum',
+            label = label,
+            ignore_keys = ignore_keys,
+            _fill = _fill
+        )
     else:
-        output = (
-            data
-            .pipe(
-                add_totals,
-                axis = 0,
-                label = label,
-                ignore_keys = ignore_keys,
-                _fill = _fill,
-            )
-            .pipe(
-                add_totals,
-                axis = 1,
-                label = label,
-                ignore_keys = ignore_keys,
-                _fill = _fill,
-            )
+        output = _add_totals_both_axes(
+            data,
+            label = label,
+            ignore_keys = ignore_keys,
+            _fill = _fill,
         )
     return output
 
 
+def _add_totals_both_axes(
+    df: pd.DataFrame,
+    label: str,
+    ignore_keys: str|list[str]|None,
+    _fill: str|None = '',
+) -> pd.DataFrame:
+    """
+    Add a totals row and a totals column in one go.
+
+    Column totals, row totals and the grand total are each computed with one reduction over the original data and the output is built once. A frame holding a single numeric dtype is reduced as one block and written into one preallocated array. Other frames are extended column by column so every column keeps its dtype.
+    """
+    row_margins = chaining.get_margins(df, 0, ignore_keys)
+    col_margins = chaining.get_margins(df, 1, ignore_keys)
+    rows, cols = row_margins < 0, col_margins < 0
+
+    index = df.index.append(agg.create_agg_index(label, df.index, _fill))
+    columns = df.columns.append(agg.create_agg_index(label, df.columns, _fill))
+
+    if is_numeric_block(df):
+        output = pd.DataFrame(
+            add_block_totals(df.to_numpy(), rows, cols),
+            index = index,
+            columns = columns,
+        )
+    else:
+        # one reduction per dtype so the totals keep the dtype of their column
+        column_totals = np.empty(df.shape[1], dtype=object)
+        for dtype in df.dtypes.unique():
+            selected = (df.dtypes == dtype).to_numpy()
+            column_totals[selected] = list(df.loc[rows, selected].sum())
+        row_totals = df.loc[:, cols].sum(axis=1)
+        grand_total = column_totals[cols].sum()
+        arrays = {
+            i: append_value(df.iloc[:, i], total)
+            for i, total in enumerate(column_totals)
+        }
+        arrays[df.shape[1]] = append_value(row_totals, grand_total)
+        output = pd.DataFrame(arrays)
+        output.index = index
+        output.columns = columns
+    chaining.record_margins(output, 0, np.append(row_margins, 0))
+    chaining.record_margins(output, 1, np.append(col_margins, 0))
+    return output
+
+
+def is_numeric_block(df: pd.DataFrame) -> bool:
+    """Whether all columns of df share a single numeric NumPy dtype."""
+    dtypes = df.dtypes.unique()
+    return (
+        len(dtypes) == 1
+        and isinstance(dtypes[0], np.dtype)
+        and dtypes[0].kind in 'iuf'
+    )
+
+
+def add_block_totals(
+    values: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> np.ndarray:
+    """
+    Extend a 2-D block with a totals row and column, summing the data `rows` and `cols` and skipping NaN as pandas does.
+
+    The block is reduced and built as pandas holds it, (columns, rows), so the totals are summed in the same order as `DataFrame.sum`.
+    """
+    block = values.T
+    filled = np.where(np.isnan(block), 0, block) if block.dtype.kind == 'f' else block
+    data_rows = filled if rows.all() else filled.compress(rows, axis=1)
+    data_cols = filled if cols.all() else filled[cols]
+    column_totals = np.ascontiguousarray(data_rows).sum(axis=1)
+    row_totals = data_cols.sum(axis=0)
+
+    ncols, nrows = block.shape
+    output = np.empty((ncols + 1, nrows + 1), dtype=column_totals.dtype)
+    output[:ncols, :nrows] = block
+    output[:ncols, nrows] = column_totals
+    output[ncols, :nrows] = row_totals
+    output[ncols, nrows] = column_totals[cols].sum()
+    return output.T
+
+
+def append_value(s: pd.Series, value: Any) -> Any:
+    """Append a value to the values of a series, keeping its dtype where possible."""
+    if isinstance(s.dtype, np.dtype):
+        return np.append(s.to_numpy(), value)
+    return pd.concat(
+        [s.reset_index(drop=True), pd.Series([value])],
+        ignore_index = True,
+    )
+
+
 # region subtotals
-@tooling.inject_defaults(DEFAULTS['subtotals'])
+@tooling.inject_defaults(DEFAULTS.section('subtotals'))
 @chaining.persist_ignored('totals', 'label')
 def add_subtotals(
     data: pd.DataFrame|pd.Series,
@@ -60,8 +151,10 @@ def add_subtotals(
     level: Level = 0,
     label: str|None = 'Subtotals',
     include_level_name: bool = False,
-    ignore_keys: str|list[str]|None = 'Totals',
+    ignore_keys: str|list[str]|None = None,
     skip_single_rows: bool = True,
+    n_jobs: int|None = None,
+    executor: Executor|None = None,
     _fill: str = '',
 ) -> pd.DataFrame|pd.Series:
     axis = axes.resolve_axis(axis)
@@ -75,6 +168,8 @@ def add_subtotals(
             include_level_name = include_level_name,
             ignore_keys = ignore_keys,
             skip_single_rows = skip_single_rows,
+            n_jobs = n_jobs,
+            executor = executor,
             _fill = _fill,
         )
     else:
@@ -88,6 +183,8 @@ def add_subtotals(
                 include_level_name = include_level_name,
                 ignore_keys = ignore_keys,
                 skip_single_rows = skip_single_rows,
+                n_jobs = n_jobs,
+                executor = executor,
                 _fill = _fill,
             )
             .pipe(
@@ -98,6 +195,8 @@ def add_subtotals(
                 include_level_name = include_level_name,
                 ignore_keys = ignore_keys,
                 skip_single_rows = skip_single_rows,
+                n_jobs = n_jobs,
+                executor = executor,
                 _fill = _fill,
             )
         )
@@ -108,8 +207,234 @@ def add_subtotals(
 def drop_totals(
     data: pd.DataFrame|pd.Series,
     ignore_keys: str|list[str]|None = None,
+    *,
+    axis: Axis|Literal[2, 'both'] = 0,
 ) -> pd.DataFrame|pd.Series:
-    if ignore_keys is None:
-        ignore_keys = data.attrs['flatbread']['totals']['ignore_keys']
-    mask = chaining.get_data_mask(data.index, ignore_keys)
-    return data.loc[mask].copy()
+    """
+    Drop the totals and subtotals rows and/or columns.
+
+    The margins are taken from the margins recorded in `df.attrs`, rows/columns matching `ignore_keys` are dropped as well. A table without any recorded margins has its totals and subtotals found by their labels instead. The remaining rows and columns are selected in a single take.
+
+    Parameters
+    ----------
+    data (pd.DataFrame|pd.Series):
+        Table with totals and/or subtotals.
+    ignore_keys (str|list[str]|None):
+        Keys of the totals rows/columns, matched against the labels. Default None (use the margins recorded in `df.attrs`, or the keys from `get_totals_keys` if there are none).
+    axis (int | Literal["index", "columns", "both"]):
+        Axis to drop the totals from. Default 0.
+
+    Returns
+    -------
+    pd.DataFrame|pd.Series:
+        Table without totals.
+    """
+    axis = axes.resolve_axis(axis)
+    if isinstance(data, pd.Series) and axis != 0:
+        raise ValueError('A Series only has totals on the index.')
+
+    keys = ignore_keys
+    if keys is None and all(chaining.get_record(data, target) is None for target in [0, 1]):
+        keys = get_totals_keys(data)
+
+    positions = {}
+    for target in ([0, 1] if axis == 2 else [axis]):
+        margins = chaining.get_margins(data, target, keys)
+        positions[target] = get_data_positions(margins)
+    return chaining.take_positions(data, positions.get(0), positions.get(1))
+
+
+def get_totals_keys(data: pd.Series|pd.DataFrame) -> list[str]:
+    """Get the keys marking totals and subtotals from `data.attrs` or else from the defaults."""
+    keys = data.attrs.get('flatbread', {}).get('totals', {}).get('ignore_keys')
+    if keys:
+        return list(keys)
+    return [DEFAULTS['totals']['label'], DEFAULTS['subtotals']['label']]
+
+
+def get_data_positions(margins: np.ndarray) -> np.ndarray|None:
+    """Positions of the data rows/columns, or None if there are no margins."""
+    is_data = margins < 0
+    return None if is_data.all() else np.flatnonzero(is_data)
+
+
+# region append
+def append_rows(
+    data: pd.DataFrame,
+    rows: pd.DataFrame,
+    ignore_keys: str|list[str]|None = None,
+    skip_single_rows: bool = True,
+) -> pd.DataFrame:
+    """
+    Append data rows to a table with totals and/or subtotals, updating the totals instead of recomputing them.
+
+    Every new row is placed where rebuilding the table with the row would put it: before the subtotal of the deepest subtotaled group it belongs to, or before the totals if it starts a new group. The groups are found by looking up the keys of the new rows among the keys of the subtotals and the totals and subtotals rows are updated by adding the sums of the new rows per group, so the lookups and aggregation scale with the batch and the number of margins rather than the table, which is only copied once. Totals and subtotals columns of the new rows are computed from their data columns.
+
+    Parameters
+    ----------
+    data (pd.DataFrame):
+        Table with totals and/or subtotals (summed margins) added by flatbread.
+    rows (pd.DataFrame):
+        New data rows with the same index levels as `data` and at least its data columns.
+    ignore_keys (str|list[str]|None):
+        Keys of the totals rows/columns, matched against the labels. Default None (use the margins recorded in `df.attrs`).
+    skip_single_rows (bool):
+        Whether the subtotals were added with `skip_single_rows`, in which case a new group of a single row gets no subtotal and can be appended. Default True.
+
+    Returns
+    -------
+    pd.DataFrame:
+        Table with the new rows added and the totals updated.
+
+    Raises
+    ------
+    ValueError:
+        If the index levels do not match, if a new row would start a group that needs a subtotal of its own or if `data` contains percentages.
+    """
+    attrs = data.attrs.get('flatbread', {})
+    if 'percentages' in attrs:
+        raise ValueError('Flatbread cannot update percentages incrementally, append the rows before adding percentages.')
+    if rows.index.nlevels != data.index.nlevels:
+        raise ValueError(f'Rows have {rows.index.nlevels} index levels, expected {data.index.nlevels}.')
+
+    if isinstance(rows.index, pd.MultiIndex):
+        # a batch sliced from a larger frame keeps all levels of its index
+        rows = rows.set_axis(rows.index.remove_unused_levels())
+
+    row_margins = chaining.get_margins(data, 0, ignore_keys)
+    col_margins = chaining.get_margins(data, 1, ignore_keys)
+    rows = add_margin_columns(rows, data.columns, col_margins)
+    validate_groups(data.index, rows.index, row_margins, skip_single_rows)
+    insert_before = get_insert_positions(data.index, rows.index, row_margins)
+
+    # slice a view without attrs, pandas deep-copies the attrs on every slice
+    table = pd.DataFrame(data)
+
+    # place the new rows in one concat, keeping their order within a group
+    order = np.argsort(insert_before, kind='stable')
+    rows, insert_before = rows.iloc[order], insert_before[order]
+    pieces, start = [], 0
+    for position in np.unique(insert_before):
+        lo, hi = np.searchsorted(insert_before, [position, position + 1])
+        pieces.extend([table.iloc[start:position], rows.iloc[lo:hi]])
+        start = position
+    pieces.append(table.iloc[start:])
+    output = pd.concat(pieces)
+
+    # add the sums of the new rows per group to the affected margins
+    shift = np.searchsorted(insert_before, np.arange(len(data)), side='right')
+    for level in np.unique(row_margins[row_margins >= 0]):
+        positions = np.flatnonzero(row_margins == level)
+        if level == 0:
+            delta = rows.sum().to_frame().T
+            delta = delta.iloc[np.zeros(len(positions), dtype=np.intp)]
+        else:
+            delta = (
+                rows
+                .groupby(level=list(range(level)), sort=False)
+                .sum()
+                .reindex(get_prefixes(data.index[positions], level), fill_value=0)
+            )
+        for i in range(output.shape[1]):
+            output.iloc[positions + shift[positions], i] = (
+                table.iloc[positions, i].to_numpy() + delta.iloc[:, i].to_numpy()
+            )
+
+    output.attrs = data.attrs
+    margins = np.full(len(output), -1, dtype=np.intp)
+    margins[np.arange(len(data)) + shift] = row_margins
+    chaining.record_margins(output, 0, margins)
+    chaining.carry_margins(data, output)
+    return output
+
+
+def add_margin_columns(
+    rows: pd.DataFrame,
+    columns: pd.Index,
+    col_margins: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Select the data `columns` from `rows` and compute the totals and subtotals columns, given the margin level of each column. A margin column at level `n` sums the data columns sharing its first `n` keys.
+    """
+    block = rows.loc[:, columns[col_margins < 0]]
+    output = rows.reindex(columns=columns)
+    for i, position in enumerate(np.flatnonzero(col_margins < 0)):
+        output.isetitem(position, block.iloc[:, i].to_numpy())
+    for level in np.unique(col_margins[col_margins >= 0]):
+        positions = np.flatnonzero(col_margins == level)
+        if level == 0:
+            sums = block.sum(axis=1).to_frame()
+            sums = sums.iloc[:, np.zeros(len(positions), dtype=np.intp)]
+        else:
+            sums = (
+                block.T
+                .groupby(level=list(range(level)), sort=False)
+                .sum()
+                .reindex(get_prefixes(columns[positions], level), fill_value=0)
+                .T
+            )
+        for i, position in enumerate(positions):
+            output.isetitem(position, sums.iloc[:, i].to_numpy())
+    return output
+
+
+def validate_groups(
+    index: pd.Index,
+    new_index: pd.Index,
+    margins: np.ndarray,
+    skip_single_rows: bool = True,
+) -> None:
+    """
+    Check that every new row falls in a group that already has its subtotals. Only the keys of the new rows are looked up among the keys of the subtotals. With `skip_single_rows` a new row may also start a group of its own, which would not get a subtotal.
+    """
+    for level in np.unique(margins[margins > 0]):
+        missing = find_subtotals(index, new_index, margins, level) < 0
+        if skip_single_rows and missing.any():
+            prefixes = get_prefixes(new_index, level)
+            is_new = ~prefixes.isin(get_prefixes(index[margins < 0], level))
+            is_single = ~prefixes.duplicated(keep=False)
+            missing &= ~(is_new & is_single)
+        if missing.any():
+            keys = list(new_index[missing])
+            raise ValueError(
+                f'Rows {keys} have no subtotal at level {level - 1}, drop the totals and add them again.'
+            )
+
+
+def get_insert_positions(
+    index: pd.Index,
+    new_index: pd.Index,
+    margins: np.ndarray,
+) -> np.ndarray:
+    """
+    Find the position before which each new row goes: before the subtotal of the deepest subtotaled group it belongs to, or before the totals if it starts a new group. This is where the row ends up when the table is rebuilt with the new rows.
+    """
+    rows = np.flatnonzero(margins != 0)
+    last = rows[-1] + 1 if len(rows) else 0
+    output = np.full(len(new_index), last, dtype=np.intp)
+    unplaced = np.ones(len(new_index), dtype=bool)
+    for level in np.unique(margins[margins > 0])[::-1]:
+        positions = np.flatnonzero(margins == level)
+        found = find_subtotals(index, new_index, margins, level)
+        placed = unplaced & (found >= 0)
+        output[placed] = positions[found[placed]]
+        unplaced &= ~placed
+    return output
+
+
+def find_subtotals(
+    index: pd.Index,
+    new_index: pd.Index,
+    margins: np.ndarray,
+    level: int,
+) -> np.ndarray:
+    """
+    Find the subtotal at margin `level` of the group of each new row, as a position among the subtotals at that level (-1 if the group has none).
+    """
+    subtotals = get_prefixes(index[margins == level], level)
+    return subtotals.get_indexer(get_prefixes(new_index, level))
+
+
+def get_prefixes(index: pd.Index, level: int) -> pd.Index:
+    """Keep the first `level` levels of `index`."""
+    return index.droplevel(list(range(level, index.nlevels)))
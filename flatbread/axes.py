@@ -1,6 +1,7 @@
 from functools import singledispatch
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from flatbread import DEFAULTS
@@ -247,7 +248,7 @@ def _(
     pd.DataFrame:
         DataFrame with the new level added to the specified axis.
     """
-    data = data.copy()
+    data = data.copy(deep=False)
     target = data.index if axis in [0, 'index'] else data.columns
 
     if isinstance(value, list):
@@ -257,21 +258,7 @@ def _(
                 f"length of {'index' if axis in [0, 'index'] else 'columns'} ({len(target)})"
             )
 
-    if not isinstance(target, pd.MultiIndex):
-        original_name = target.name
-        target = pd.MultiIndex.from_arrays([target], names=[original_name])
-
-    new_keys = [
-        add_value_to_key(
-            key,
-            value[i] if isinstance(value, list) else value,
-            level
-        )
-        for i, key in enumerate(target)
-    ]
-    new_names = add_value_to_key(target.names, level_name, level)
-    new_index = pd.MultiIndex.from_tuples(new_keys, names=new_names)
-
+    new_index = insert_level(target, value, level, level_name)
     if axis in [0, 'index']:
         data.index = new_index
     else:
@@ -308,7 +295,7 @@ def _(
     pd.Series:
         Series with the new level added to the specified axis.
     """
-    data = data.copy()
+    data = data.copy(deep=False)
     target = data.index
 
     if isinstance(value, list):
@@ -318,24 +305,56 @@ def _(
                 f"length of index ({len(target)})"
             )
 
-    if not isinstance(target, pd.MultiIndex):
-        original_name = target.name
-        target = pd.MultiIndex.from_arrays([target], names=[original_name])
-
-    new_keys = [
-        add_value_to_key(
-            key,
-            value[i] if isinstance(value, list) else value,
-            level
-        )
-        for i, key in enumerate(target)
-    ]
-    new_names = add_value_to_key(target.names, level_name, level)
-    new_index = pd.MultiIndex.from_tuples(new_keys, names=new_names)
-    data.index = new_index
+    data.index = insert_level(target, value, level, level_name)
     return data
 
 
+def insert_level(
+    index: pd.Index,
+    value: Any|list[Any],
+    level: int = 0,
+    level_name: Any = None,
+) -> pd.MultiIndex:
+    """
+    Insert a level into an index without rebuilding the existing levels.
+
+    The new MultiIndex reuses the levels and codes of `index` and only
+    factorizes the inserted values.
+
+    Parameters
+    ----------
+    index (pd.Index):
+        Original index.
+    value (Any|list[Any]):
+        Either a single value to fill the level with, or a list of values with length matching the index.
+    level (int, optional):
+        Position to insert the new level, as in `add_value_to_key`. Defaults to 0.
+    level_name (Any, optional):
+        Name for the new level. Defaults to None.
+
+    Returns
+    -------
+    pd.MultiIndex:
+        Index with the new level inserted.
+    """
+    if not isinstance(index, pd.MultiIndex):
+        index = pd.MultiIndex.from_arrays([index], names=[index.name])
+
+    if isinstance(value, list):
+        new_level = pd.Categorical(value)
+        new_codes = new_level.codes
+    else:
+        new_level = pd.Categorical([value])
+        new_codes = np.full(len(index), new_level.codes[0], dtype=new_level.codes.dtype)
+
+    return pd.MultiIndex(
+        levels = add_value_to_key(index.levels, new_level.categories, level),
+        codes = add_value_to_key(index.codes, new_codes, level),
+        names = add_value_to_key(index.names, level_name, level),
+        verify_integrity = False,
+    )
+
+
 def add_value_to_key(
     key: Any|tuple[Any, ...],
     value: Any,
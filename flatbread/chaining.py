@@ -1,9 +1,15 @@
 import functools
-from typing import Callable
+import itertools
+from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
 
 
+# where the positions of the margins of each component are recorded in `df.attrs['flatbread']`
+RECORDS = {'totals': 'margins', 'percentages': 'percentages'}
+
+
 def get_data_mask(index, ignore_keys):
     """
     Create a mask used for separating data from results of flatbread operations. The keys in `ignore_keys` determine which rows/columns need to be ignored. This can be used when chaining multiple flatbread operations.
@@ -39,14 +45,279 @@ def get_data_mask(index, ignore_keys):
                     return False
         return True
 
+    # evaluate every unique label once and broadcast the result through the codes
     if isinstance(index, pd.MultiIndex):
-        result = [all(should_keep(el) for el in idx) for idx in index]
+        result = np.ones(len(index), dtype=bool)
+        for level, codes in zip(index.levels, index.codes):
+            result &= _broadcast_labels(level, codes, should_keep)
     else:
-        result = [should_keep(idx) for idx in index]
+        codes, uniques = pd.factorize(index)
+        result = _broadcast_labels(uniques, codes, should_keep)
 
     return pd.Series(result, index=index)
 
 
+def get_margin_levels(index, ignore_keys) -> np.ndarray:
+    """
+    Find the level at which each row/column is marked as a margin by `ignore_keys`, using the same matching rules as `get_data_mask`. A subtotal of the groups in level 0 is marked at level 1, a grand total at level 0.
+
+    Parameters
+    ----------
+    index (pd.Index):
+        The index used for determining the margin levels.
+    ignore_keys (list[str]):
+        List of index keys indicating that a row/column is *not* a data column.
+
+    Returns
+    -------
+    np.ndarray:
+        The first level containing an ignored key for each row/column, -1 for data.
+    """
+    result = np.full(len(index), -1, dtype=np.intp)
+    if ignore_keys is None:
+        return result
+
+    if isinstance(index, pd.MultiIndex):
+        # missing values (code -1) pick the appended False
+        levels = [
+            np.append(~get_data_mask(level, ignore_keys).to_numpy(), False)[codes]
+            for level, codes in zip(index.levels, index.codes)
+        ]
+    else:
+        levels = [~get_data_mask(index, ignore_keys).to_numpy()]
+
+    # walk from the deepest level up so the first margin level ends up on top
+    for i, is_margin in reversed(list(enumerate(levels))):
+        result[is_margin] = i
+    return result
+
+
+def get_margins(
+    data,
+    axis: int,
+    ignore_keys,
+    component: str = 'totals',
+) -> np.ndarray:
+    """
+    Get the margin level of each row/column of `data` along `axis`, like `get_margin_levels`. The margins are the ones recorded in `df.attrs` by flatbread operations. If the record no longer matches the axis (e.g. after sorting outside of flatbread) the rows/columns with the recorded keys are used, so labels are only matched in full. A table without a record has no margins. Only keys in `ignore_keys` (passed explicitly by the caller) are matched against the labels like `get_data_mask`, and only those that the record does not cover (i.e. that are not in the persisted keys of `component`).
+
+    Parameters
+    ----------
+    data (pd.DataFrame|pd.Series):
+        The table to find the margins of.
+    axis (int):
+        0 for the rows, 1 for the columns.
+    ignore_keys (list[str]):
+        List of index keys indicating that a row/column is *not* a data column.
+    component (str):
+        Flatbread component to get the margins of, "totals" (totals and subtotals) or "percentages". Default "totals".
+
+    Returns
+    -------
+    np.ndarray:
+        The margin level for each row/column, -1 for data.
+    """
+    index = data.columns if axis == 1 else data.index
+    levels = get_recorded_margins(data, axis, component)
+    if levels is None:
+        levels = find_recorded_keys(data, axis, component)
+
+    if ignore_keys is None:
+        return levels
+    if isinstance(ignore_keys, str):
+        ignore_keys = [ignore_keys]
+    stored = data.attrs.get('flatbread', {}).get(component, {})
+    covered = stored.get('ignore_keys', set())
+    extra = [key for key in ignore_keys if key not in covered]
+    if extra:
+        levels = np.where(levels >= 0, levels, get_margin_levels(index, extra))
+    return levels
+
+
+def get_record(data, axis: int, component: str = 'totals') -> dict|None:
+    """Get the record of the margins of `component` along `axis` from `df.attrs`, if any."""
+    name = 'columns' if axis == 1 else 'index'
+    flatbread = data.attrs.get('flatbread', {})
+    return flatbread.get(RECORDS[component], {}).get(name)
+
+
+def get_recorded_margins(data, axis: int, component: str = 'totals') -> np.ndarray|None:
+    """
+    Get the margin levels recorded in `df.attrs` for `axis`, or None if there is no record or it no longer matches the axis (e.g. after slicing or sorting outside of flatbread).
+    """
+    record = get_record(data, axis, component)
+    if record is None:
+        return None
+
+    index = data.columns if axis == 1 else data.index
+    positions = list(record['positions'])
+    if len(index) != record['length'] or tuple(index[positions]) != record['keys']:
+        return None
+
+    levels = np.full(len(index), -1, dtype=np.intp)
+    levels[positions] = record['levels']
+    return levels
+
+
+def find_recorded_keys(data, axis: int, component: str = 'totals') -> np.ndarray:
+    """
+    Find the rows/columns whose full key is one of the keys recorded for `axis`, with their recorded levels. Used when the record no longer matches the axis; all rows/columns are data if there is no (usable) record.
+    """
+    index = data.columns if axis == 1 else data.index
+    levels = np.full(len(index), -1, dtype=np.intp)
+    record = get_record(data, axis, component)
+    if record is None or not record['keys']:
+        return levels
+
+    keys = pd.Index(list(record['keys']), tupleize_cols=True)
+    if keys.nlevels != index.nlevels or not keys.is_unique:
+        return levels
+    found = keys.get_indexer(index)
+    recorded = np.asarray(record['levels'], dtype=np.intp)
+    return np.where(found >= 0, recorded[found], levels)
+
+
+def record_margins(
+    data,
+    axis: int,
+    levels: np.ndarray,
+    component: str = 'totals',
+) -> None:
+    """
+    Record the margin level of each row/column along `axis` in `df.attrs`. Only the positions of the margins are stored, together with their keys to check the record is still valid when it is read. Percentages are recorded separately from the totals and subtotals, at the level of the percentages key.
+
+    Parameters
+    ----------
+    data (pd.DataFrame|pd.Series):
+        The table to record the margins on, updated in place.
+    axis (int):
+        0 for the rows, 1 for the columns.
+    levels (np.ndarray):
+        The margin level for each row/column, -1 for data.
+    component (str):
+        Flatbread component the margins belong to, "totals" or "percentages". Default "totals".
+
+    Notes
+    -----
+    Example of how margins are stored in attrs:
+    ```python
+    {'flatbread': {
+        'margins': {'index': {
+            'length': 5,
+            'positions': (2, 4),
+            'levels': (1, 0),
+            'keys': (('a', 'Subtotals'), ('Totals', '')),
+        }},
+        'percentages': {'columns': {...}},
+    }}
+    ```
+    """
+    name = 'columns' if axis == 1 else 'index'
+    index = data.columns if axis == 1 else data.index
+    positions = np.flatnonzero(np.asarray(levels) >= 0)
+    record = {
+        'length': len(index),
+        'positions': tuple(positions.tolist()),
+        'levels': tuple(np.asarray(levels)[positions].tolist()),
+        'keys': tuple(index[positions]),
+    }
+
+    # rebuild the nested dicts so attrs shared with other frames stay intact
+    flatbread = dict(data.attrs.get('flatbread', {}))
+    margins = dict(flatbread.get(RECORDS[component], {}))
+    margins[name] = record
+    flatbread[RECORDS[component]] = margins
+    data.attrs['flatbread'] = flatbread
+
+
+def carry_margins(data, result) -> None:
+    """
+    Copy the margins recorded on `data` to `result` for every axis that `result` shares with `data` but has no valid record for.
+    """
+    axes = [0] if isinstance(data, pd.Series) else [0, 1]
+    for axis, component in itertools.product(axes, RECORDS):
+        if isinstance(result, pd.Series) and axis == 1:
+            continue
+        if get_recorded_margins(result, axis, component) is not None:
+            continue
+        levels = get_recorded_margins(data, axis, component)
+        index = data.columns if axis == 1 else data.index
+        other = result.columns if axis == 1 else result.index
+        if levels is not None and index.equals(other):
+            record_margins(result, axis, levels, component)
+
+
+def take(data, indices, axis: int = 0):
+    """
+    Select rows/columns by position, keeping the recorded margins in sync.
+
+    Parameters
+    ----------
+    data (pd.DataFrame|pd.Series):
+        The table to select from.
+    indices (array-like):
+        Positions of the rows/columns to keep, in order.
+    axis (int):
+        0 for the rows, 1 for the columns.
+
+    Returns
+    -------
+    pd.DataFrame|pd.Series:
+        The selected rows/columns.
+    """
+    if axis == 1:
+        return take_positions(data, columns=indices)
+    return take_positions(data, rows=indices)
+
+
+def take_positions(data, rows=None, columns=None):
+    """
+    Select rows and columns by position in a single take, keeping the recorded margins in sync. An axis without positions (None) is kept whole.
+
+    Parameters
+    ----------
+    data (pd.DataFrame|pd.Series):
+        The table to select from.
+    rows (array-like|None):
+        Positions of the rows to keep, in order.
+    columns (array-like|None):
+        Positions of the columns to keep, in order.
+
+    Returns
+    -------
+    pd.DataFrame|pd.Series:
+        The selected rows and columns.
+    """
+    selection = {
+        axis: slice(None) if indices is None else np.asarray(indices, dtype=np.intp)
+        for axis, indices in enumerate([rows, columns])
+    }
+    if isinstance(data, pd.Series):
+        del selection[1]
+        result = data.iloc[selection[0]]
+    else:
+        result = data.iloc[selection[0], selection[1]]
+
+    for (axis, indices), component in itertools.product(selection.items(), RECORDS):
+        levels = get_recorded_margins(data, axis, component)
+        if levels is not None:
+            record_margins(result, axis, levels[indices], component)
+    return result
+
+
+def _broadcast_labels(
+    labels: pd.Index,
+    codes: np.ndarray,
+    func: Callable[[Any], bool],
+) -> np.ndarray:
+    """
+    Apply `func` to each unique label and map the outcome onto the positions given by `codes`. Missing values (code -1) are always kept.
+    """
+    checked = np.fromiter((func(label) for label in labels), dtype=bool, count=len(labels))
+    checked = np.append(checked, True)
+    return checked[np.asarray(codes)]
+
+
 def persist_ignored(component: str, label: str) -> Callable:
     """
     Remember the labels that need to be ignored when chaining operations. The `ignore_keys` are stored in `df.attrs` in a set.
@@ -109,8 +380,10 @@ def persist_ignored(component: str, label: str) -> Callable:
             ignored = get_ignored_keys(ignore_keys, ignored_label)
             all_ignored = persisted_ignore_keys.union(ignored)
 
-            result = func(df, *args, ignore_keys=all_ignored, **kwargs)
+            # margins are recorded, only the keys given by the caller are matched
+            result = func(df, *args, ignore_keys=ignore_keys, **kwargs)
             set_nested_key(result.attrs, keys, all_ignored)
+            carry_margins(df, result)
             return result
         return wrapper
     return decorator
@@ -1,67 +1,246 @@
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
 from typing import Any
 from pathlib import Path
+import copy
 import json
+import threading
+
+
+USER_CONFIG_PATH = Path('~/.flatbread.json')
 
 
 class ConfigService:
+    """
+    Layered flatbread configuration.
+
+    The config is loaded lazily from the package defaults, the user config
+    and the project config, with runtime updates merged on top. Every load
+    or update produces a new immutable snapshot and bumps `version`, so
+    consumers can cache anything derived from the config per version.
+    """
     def __init__(self):
         self._config: dict[str, Any] | None = None
+        self._snapshot: Mapping[str, Any] | None = None
+        self._runtime: dict[str, Any] = {}
         self._sources: list[str] = []
+        self._mtimes: dict[str, int] = {}
+        self._sections: dict[str, ConfigSection] = {}
+        self._version = 0
+        self._watcher: threading.Thread | None = None
+        self._stop_watching: threading.Event | None = None
 
     def __getitem__(self, key):
-        return self.config[key]
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.config
+        return snapshot[key]
 
     def get(self, key, default=None):
         return self.config.get(key, default)
 
     @property
-    def config(self) -> dict[str, Any]:
+    def config(self) -> Mapping[str, Any]:
         self._ensure_loaded()
-        return self._config
+        return self._snapshot # type: ignore
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     @property
     def sources(self) -> list[str]:
         return self._sources.copy()
 
+    def section(self, name: str) -> "ConfigSection":
+        """
+        Get a live, read-only view of a section of the config.
+
+        The view always reflects the current snapshot, so it can be handed
+        out at import time (e.g. to `tooling.inject_defaults`) without
+        loading the config or freezing its values.
+
+        Parameters
+        ----------
+        name : str
+            Top-level key of the section
+
+        Returns
+        -------
+        ConfigSection
+            Mapping view of the section
+        """
+        if name not in self._sections:
+            self._sections[name] = ConfigSection(self, name)
+        return self._sections[name]
+
     def reload(self) -> None:
+        """
+        Reset the config, to be loaded again from the config files on next use.
+
+        Unlike `check_for_changes`, this also drops the runtime updates, so
+        it restores the config as set in the files.
+        """
         self._config = None
+        self._snapshot = None
+        self._runtime = {}
         self._sources = []
+        self._version += 1
 
     def update_runtime(self, updates: dict[str, Any]) -> None:
+        self._runtime = deep_merge(self._runtime, updates)
         self._ensure_loaded()
-        self._config = deep_merge(
+        self._set_config(deep_merge(
             self._config, # type: ignore
             updates,
+        ))
+
+    def check_for_changes(self) -> bool:
+        """
+        Reload the config if a user or project config file changed.
+
+        Runtime updates are kept and applied on top of the reloaded config.
+
+        Returns
+        -------
+        bool
+            True if the config was reloaded
+        """
+        if self._snapshot is None or get_mtimes() == self._mtimes:
+            return False
+        self._load_config()
+        return True
+
+    def watch(self, interval: float = 2.0) -> None:
+        """
+        Poll the user and project config files for changes in the background.
+
+        Parameters
+        ----------
+        interval : float, default 2.0
+            Seconds between checks
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(interval):
+                self.check_for_changes()
+
+        self._stop_watching = stop
+        self._watcher = threading.Thread(
+            target = poll,
+            name = 'flatbread-config-watcher',
+            daemon = True,
         )
+        self._watcher.start()
+
+    def unwatch(self) -> None:
+        """Stop polling the config files for changes."""
+        if self._stop_watching is not None:
+            self._stop_watching.set()
+        self._watcher = None
+        self._stop_watching = None
 
     def _load_config(self) -> None:
-        self._sources.clear()
+        sources = []
+        mtimes = get_mtimes()
 
         # Start with defaults
         defaults_path = Path(__file__).parent / "config.defaults.json"
         config = json.loads(defaults_path.read_text())
-        self._sources.append(str(defaults_path))
+        sources.append(str(defaults_path))
 
         # User config
-        user_path = Path('~/.flatbread.json').expanduser()
+        user_path = USER_CONFIG_PATH.expanduser()
         if user_path.exists():
             user_config = json.loads(user_path.read_text())
             config = deep_merge(config, user_config)
-            self._sources.append(str(user_path))
+            sources.append(str(user_path))
 
         # Project config
         if project_path := find_project_config():
             project_config = json.loads(project_path.read_text())
             config = deep_merge(config, project_config)
-            self._sources.append(str(project_path))
+            sources.append(str(project_path))
+
+        self._sources = sources
+        self._mtimes = mtimes
+        self._set_config(deep_merge(config, self._runtime))
 
+    def _set_config(self, config: dict[str, Any]) -> None:
         self._config = config
+        self._snapshot = freeze(config)
+        self._version += 1
 
     def _ensure_loaded(self) -> None:
-        if self._config is None:
+        if self._snapshot is None:
             self._load_config()
 
 
+class ConfigSection(Mapping):
+    """Live, read-only view of a top-level section of a `ConfigService`."""
+    def __init__(self, service: ConfigService, name: str):
+        self._service = service
+        self._name = name
+
+    @property
+    def version(self) -> int:
+        return self._service.version
+
+    def __getitem__(self, key):
+        return self._service[self._name][key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._service[self._name])
+
+    def __len__(self) -> int:
+        return len(self._service[self._name])
+
+    def __repr__(self) -> str:
+        return f"ConfigSection({self._name!r}, {dict(self)!r})"
+
+
+def freeze(config: Any) -> Any:
+    """
+    Create an immutable snapshot of (part of) a config dictionary.
+
+    Nested dictionaries become read-only mappings, lists become tuples and
+    other values are copied, so the snapshot cannot change without the
+    config being updated.
+    """
+    if isinstance(config, Mapping):
+        return MappingProxyType({key: freeze(value) for key, value in config.items()})
+    if isinstance(config, (list, tuple)):
+        return tuple(freeze(value) for value in config)
+    return copy.deepcopy(config)
+
+
+def thaw(config: Any) -> Any:
+    """
+    Create a plain, mutable copy of (part of) a frozen config.
+
+    Read-only mappings become dictionaries and tuples become lists, e.g.
+    before handing config values to code that serializes or mutates them.
+    """
+    if isinstance(config, Mapping):
+        return {key: thaw(value) for key, value in config.items()}
+    if isinstance(config, (list, tuple)):
+        return [thaw(value) for value in config]
+    return copy.deepcopy(config)
+
+
+def get_mtimes() -> dict[str, int]:
+    """Get the modification times of the user and project config files."""
+    paths = [USER_CONFIG_PATH.expanduser(), find_project_config()]
+    return {
+        str(path): path.stat().st_mtime_ns
+        for path in paths
+        if path is not None and path.exists()
+    }
+
+
 def deep_merge(base: dict[str, Any], update: dict[str, Any]) -> dict:
     """
     Deep merge two dictionaries, preserving structure from both.
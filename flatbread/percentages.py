@@ -1,11 +1,14 @@
+from copy import deepcopy
 from functools import singledispatch
-from typing import Any
+from typing import Any, Literal
 import warnings
 
+import numpy as np
 import pandas as pd
 
 from flatbread import DEFAULTS
 from flatbread.types import Axis, Level
+import flatbread.agg.aggregation as agg
 import flatbread.chaining as chaining
 import flatbread.tooling as tooling
 import flatbread.axes as axes
@@ -37,14 +40,14 @@ def as_percentages(
     label_pct: str = 'pct',
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     **kwargs,
 ) -> Any:
     raise NotImplementedError('No implementation for this type')
 
 
 @as_percentages.register
-@tooling.inject_defaults(DEFAULTS['percentages'])
+@tooling.inject_defaults(DEFAULTS.section('percentages'))
 def _(
     data: pd.Series,
     *,
@@ -52,10 +55,12 @@ def _(
     label_totals: str|None = None,
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     **kwargs,
 ) -> pd.Series:
     rounding = round_apportioned if apportioned_rounding else round
+    if apportioned_rounding == 'groups':
+        rounding = round_apportioned_groups
     total = data.iloc[-1] if label_totals is None else data.loc[label_totals]
     return (
         data
@@ -67,34 +72,39 @@ def _(
 
 
 @as_percentages.register
-@tooling.inject_defaults(DEFAULTS['percentages'])
+@tooling.inject_defaults(DEFAULTS.section('percentages'))
 @chaining.persist_ignored('percentages', 'label_pct')
 def _(
     df: pd.DataFrame,
     axis: Axis = 2,
     *,
     label_totals: str|None = None,
-    ignore_keys: str|list[str]|None = 'pct',
+    ignore_keys: str|list[str]|None = None,
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     **kwargs,
 ) -> pd.DataFrame:
-    # reverse axis for consistency
-    rounding = round_apportioned if apportioned_rounding else round
-
-    cols = chaining.get_data_mask(df.columns, ignore_keys)
-    data = df.loc[:, cols]
+    data = drop_recorded_percentages(df, ignore_keys)
 
     totals = get_totals(data, axis, label_totals)
-    axis = 0 if axis == 1 else 1 if axis == 0 else None
-    pcts = (
-        data
-        .div(totals, axis=axis)
-        .mul(base)
-        .pipe(rounding, ndigits=ndigits)
-    )
-    return pcts
+    axis = axes.resolve_axis(axis)
+    # row totals are a column aligned on the index and vice versa
+    div_axis = axis if axis < 2 else None
+    pcts = data.div(totals, axis=div_axis).mul(base)
+    chaining.carry_margins(data, pcts)
+
+    # percentages of row totals add up along the rows
+    rounding_axis = 1 if axis == 0 else 0
+    if apportioned_rounding == 'groups':
+        return round_apportioned_groups(
+            pcts,
+            ndigits = ndigits,
+            axis = rounding_axis,
+        )
+    if apportioned_rounding:
+        return round_apportioned(pcts, ndigits=ndigits, axis=rounding_axis)
+    return pcts.pipe(round, ndigits=ndigits)
 
 
 @singledispatch
@@ -104,14 +114,14 @@ def add_percentages(
     label_pct: str = 'pct',
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     **kwargs,
 ) -> Any:
     raise NotImplementedError('No implementation for this type')
 
 
 @add_percentages.register
-@tooling.inject_defaults(DEFAULTS['percentages'])
+@tooling.inject_defaults(DEFAULTS.section('percentages'))
 def _(
     data: pd.Series,
     *,
@@ -120,7 +130,7 @@ def _(
     label_totals: str|None = None,
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     **kwargs,
 ) -> pd.DataFrame:
     pcts = data.pipe(
@@ -132,11 +142,13 @@ def _(
         apportioned_rounding = apportioned_rounding,
     )
     output = pd.concat([data, pcts], keys=[label_n, label_pct], axis=1)
+    chaining.carry_margins(data, output)
+    chaining.record_margins(output, 1, np.array([-1, 0]), 'percentages')
     return output
 
 
 @add_percentages.register
-@tooling.inject_defaults(DEFAULTS['percentages'])
+@tooling.inject_defaults(DEFAULTS.section('percentages'))
 @chaining.persist_ignored('percentages', 'label_pct')
 def _(
     df: pd.DataFrame,
@@ -145,16 +157,15 @@ def _(
     label_n: str = 'n',
     label_pct: str = 'pct',
     label_totals: str|None = None,
-    ignore_keys: str|list[str]|None = 'pct',
+    ignore_keys: str|list[str]|None = None,
     ndigits: int = -1,
     base: int = 1,
-    apportioned_rounding: bool = True,
+    apportioned_rounding: bool|Literal['groups'] = True,
     interleaf: bool = False,
     **kwargs,
 ) -> pd.DataFrame:
 
-    cols = chaining.get_data_mask(df.columns, ignore_keys)
-    data = df.loc[:, cols]
+    data = drop_recorded_percentages(df, ignore_keys)
 
     # totals = get_totals(data, axis, label_totals)
     # axis = axis if axis < 2 else None
@@ -168,36 +179,152 @@ def _(
         as_percentages,
         axis = axis,
         label_totals = label_totals,
-        ignore_keys = ignore_keys,
         ndigits = ndigits,
         base = base,
         apportioned_rounding = apportioned_rounding,
     )
+    margins = chaining.get_margins(df, 1, None)
+    pct_margins = chaining.get_margins(df, 1, ignore_keys, 'percentages')
 
     # check if there are already percentages in the table
-    if cols.all():
+    if len(data.columns) == len(df.columns):
         # if not then add them, original table gets `label_n`
         # percentages get `label_pct` as key
         keys = [label_n, label_pct]
         output = pd.concat([df, pcts], keys=keys, axis=1)
+        # the new key level goes on top of the margins
+        margins = np.where(margins >= 0, margins + 1, margins)
+        margins = np.concatenate([margins, margins])
+        pct_margins = np.concatenate([pct_margins, np.zeros(len(pcts.columns), dtype=np.intp)])
     else:
         # if percentages are present then transform them first
         # keys are already present in the original df
         # so we do not add new keys
         pcts = pcts.rename(columns={label_n: label_pct})
         output = pd.concat([df, pcts], axis=1)
+        pct_level = get_key_level(pcts.columns, label_pct)
+        margins = np.concatenate([margins, margins[pct_margins < 0]])
+        pct_margins = np.concatenate([pct_margins, np.full(len(pcts.columns), pct_level)])
+
+    output.attrs = deepcopy(df.attrs)
+    chaining.record_margins(output, 1, margins)
+    chaining.record_margins(output, 1, pct_margins, 'percentages')
     if interleaf:
         # return output.stack(0).unstack(-1)
-        keys = [label_n, label_pct]
-        return output.swaplevel(axis=1).sort_index(axis=1, level=0)
+        return interleave(output)
+    return output
+
+
+def drop_recorded_percentages(
+    df: pd.DataFrame,
+    ignore_keys: str|list[str]|None,
+) -> pd.DataFrame:
+    """Select the columns of `df` that are not recorded as percentages or match `ignore_keys`."""
+    pct_margins = chaining.get_margins(df, 1, ignore_keys, 'percentages')
+    if (pct_margins < 0).all():
+        return df
+    return chaining.take(df, np.flatnonzero(pct_margins < 0), axis=1)
+
+
+def get_key_level(index: pd.Index, key: str) -> int:
+    """Get the first level of `index` that holds only `key`, 0 if there is none."""
+    for i in range(index.nlevels):
+        if (index.get_level_values(i) == key).all():
+            return i
+    return 0
+
+
+def interleave(df: pd.DataFrame) -> pd.DataFrame:
+    """Swap the last two column levels and sort on the first, keeping the recorded margins in sync."""
+    swapped = df.swaplevel(axis=1)
+    output = swapped.sort_index(axis=1, level=0)
+    order = swapped.columns.get_indexer(output.columns)
+    output.attrs = deepcopy(df.attrs)
+
+    # the first level holding a margin key moves with the swapped levels
+    nlevels = df.columns.nlevels
+    swap = {nlevels - 2: nlevels - 1, nlevels - 1: nlevels - 2}
+    for component in chaining.RECORDS:
+        levels = chaining.get_recorded_margins(df, 1, component)
+        if levels is not None:
+            levels = np.array([swap.get(level, level) for level in levels])
+            chaining.record_margins(output, 1, levels[order], component)
+    return output
+
+
+@tooling.inject_defaults(DEFAULTS.section('percentages'))
+def drop_percentages(
+    df: pd.DataFrame,
+    axis: Axis = 1,
+    *,
+    label_n: str = 'n',
+    label_pct: str = 'pct',
+    ignore_keys: str|list[str]|None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Drop the percentage columns (and/or rows) added by `add_percentages`.
+
+    The percentages are taken from the percentages recorded in `df.attrs` by `add_percentages`, columns (and/or rows) matching `ignore_keys` are dropped as well. The rest is selected in a single take. If this leaves a level holding only `label_n`, that level is dropped as well so the original table is returned.
+
+    Parameters
+    ----------
+    df (pd.DataFrame):
+        Table with percentages.
+    axis (int | Literal["index", "columns", "both"]):
+        Axis to drop the percentages from. Default 1.
+    label_n (str):
+        Key of the counts added by `add_percentages`.
+    label_pct (str):
+        Key of the percentages. Unused, the percentages are recorded in `df.attrs`.
+    ignore_keys (str|list[str]|None):
+        Keys of the percentages, matched against the labels. Default None (use the percentages recorded in `df.attrs`).
+
+    Returns
+    -------
+    pd.DataFrame:
+        Table without percentages.
+    """
+    axis = axes.resolve_axis(axis)
+    targets = [0, 1] if axis == 2 else [axis]
+    positions = {}
+    for target in targets:
+        mask = chaining.get_margins(df, target, ignore_keys, 'percentages') < 0
+        positions[target] = None if mask.all() else np.flatnonzero(mask)
+    output = chaining.take_positions(df, positions.get(0), positions.get(1))
+
+    for target in targets:
+        output = drop_counts_level(output, target, label_n)
+    output.attrs['flatbread'] = {
+        key: value
+        for key, value in output.attrs.get('flatbread', {}).items()
+        if key != 'percentages'
+    }
     return output
 
 
+def drop_counts_level(df: pd.DataFrame, axis: int, label_n: str) -> pd.DataFrame:
+    """Drop the level of a MultiIndex that only holds `label_n`, keeping the recorded margins."""
+    index = df.columns if axis == 1 else df.index
+    if not isinstance(index, pd.MultiIndex):
+        return df
+    for i in range(index.nlevels):
+        if (index.get_level_values(i) == label_n).all():
+            margins = chaining.get_recorded_margins(df, axis)
+            output = df.droplevel(i, axis=axis)
+            if margins is not None:
+                margins = np.where(margins > i, margins - 1, margins)
+                chaining.record_margins(output, axis, margins)
+            return output
+    return df
+
+
 def round_apportioned(
-    s: pd.Series,
+    s: pd.Series|pd.DataFrame,
     *,
-    ndigits: int = -1
-) -> pd.Series:
+    ndigits: int = -1,
+    axis: int = 0,
+) -> pd.Series|pd.DataFrame:
     """
     Round percentages in a way that they always add up to total.
     Taken from this SO answer:
@@ -206,20 +333,143 @@ def round_apportioned(
 
     Parameters
     ----------
-    s (pd.Series):
-        A series of unrounded percentages adding up to total.
+    s (pd.Series|pd.DataFrame):
+        A series (or frame) of unrounded percentages adding up to total.
     ndigits (int):
         Number of digits to round percentages to. Default is -1 (no rounding).
+    axis (int):
+        Axis along which the percentages add up to total when `s` is a DataFrame. Default is 0.
 
     Returns
     -------
-    pd.Series:
+    pd.Series|pd.DataFrame:
         Rounded percentages.
     """
     if ndigits < 0:
         return s
-    cumsum = s.fillna(0).cumsum().round(ndigits)
-    prev_baseline = cumsum.shift(1).fillna(0)
-    rounded = cumsum - prev_baseline
-    keep_na = rounded.mask(s.isna())
-    return keep_na
+    values = s.to_numpy(dtype=float, na_value=np.nan)
+    rounded = round_apportioned_array(values, ndigits=ndigits, axis=axis)
+    if isinstance(s, pd.DataFrame):
+        output = pd.DataFrame(rounded, index=s.index, columns=s.columns)
+    else:
+        output = pd.Series(rounded, index=s.index, name=s.name)
+    return output.__finalize__(s)
+
+
+def round_apportioned_array(
+    values: np.ndarray,
+    *,
+    ndigits: int = -1,
+    axis: int = 0,
+) -> np.ndarray:
+    """
+    Apportioned rounding of a whole block of percentages in one pass.
+
+    The cumulative sum along `axis` is rounded and the rounded values are recovered by differencing, so every run of values adds up to its rounded total. NaNs count as zero and are kept in place.
+
+    Parameters
+    ----------
+    values (np.ndarray):
+        A 1-D or 2-D array of unrounded percentages.
+    ndigits (int):
+        Number of digits to round percentages to. Default is -1 (no rounding).
+    axis (int):
+        Axis along which the percentages add up to total. Default is 0.
+
+    Returns
+    -------
+    np.ndarray:
+        Rounded percentages as floats.
+    """
+    values = np.asarray(values, dtype=float)
+    if ndigits < 0:
+        return values
+    isna = np.isnan(values)
+    cumsum = np.where(isna, 0, values).cumsum(axis=axis).round(ndigits)
+    rounded = np.diff(cumsum, axis=axis, prepend=0)
+    rounded[isna] = np.nan
+    return rounded
+
+
+def round_apportioned_groups(
+    data: pd.Series|pd.DataFrame,
+    ignore_keys: str|list[str]|None = None,
+    *,
+    ndigits: int = -1,
+    axis: int = 0,
+) -> pd.Series|pd.DataFrame:
+    """
+    Round percentages so that the rounded values within every subtotal group add up to the rounded subtotal and subtotals add up to the rounded total.
+
+    Rows holding data are rounded along one cumulative sum that skips the margins (totals and subtotals), ordered so that every group is contiguous. Each margin then gets the rounded cumulative sum at the end of its group minus the one at its start. Margins are taken from the margins recorded in `df.attrs` and the rows/columns matching `ignore_keys`; the level of the margin determines which group it covers.
+
+    Parameters
+    ----------
+    data (pd.Series|pd.DataFrame):
+        Unrounded percentages including margins.
+    ignore_keys (str|list[str]|None):
+        Keys marking the margins, matched against the labels. Default None (use the recorded margins only).
+    ndigits (int):
+        Number of digits to round percentages to. Default is -1 (no rounding).
+    axis (int):
+        Axis along which the percentages add up to total when `data` is a DataFrame. Default is 0.
+
+    Returns
+    -------
+    pd.Series|pd.DataFrame:
+        Rounded percentages.
+    """
+    if ndigits < 0:
+        return data
+
+    index = data.columns if axis == 1 else data.index
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    values = values.reshape(len(values), -1)
+    if axis == 1:
+        values = values.T
+
+    margin_levels = chaining.get_margins(data, axis, ignore_keys)
+    group_depths = sorted(set(margin_levels[margin_levels > 0]))
+    group_ids = {
+        depth: agg.get_group_ids(index, depth - 1)
+        for depth in group_depths
+    }
+
+    # order data rows so that the rows of every group are contiguous
+    positions = np.flatnonzero(margin_levels < 0)
+    sort_keys = [positions] + [group_ids[depth][0][positions] for depth in reversed(group_depths)]
+    positions = positions[np.lexsort(sort_keys)]
+
+    isna = np.isnan(values)
+    cumsum = np.where(isna, 0, values)[positions].cumsum(axis=0).round(ndigits)
+    cumsum = np.concatenate([np.zeros((1, values.shape[1])), cumsum])
+
+    rounded = np.round(values, ndigits)
+    rounded[positions] = np.diff(cumsum, axis=0)
+
+    # grand totals cover all data rows
+    rounded[margin_levels == 0] = cumsum[-1]
+
+    # subtotals cover the data rows in their group
+    ranks = np.arange(len(positions))
+    for depth in group_depths:
+        ids, ngroups = group_ids[depth]
+        in_group = ids[positions] >= 0
+        starts = np.full(ngroups, len(positions))
+        ends = np.full(ngroups, -1)
+        np.minimum.at(starts, ids[positions][in_group], ranks[in_group])
+        np.maximum.at(ends, ids[positions][in_group], ranks[in_group] + 1)
+
+        margins = np.flatnonzero((margin_levels == depth) & (ids >= 0))
+        margins = margins[ends[ids[margins]] >= 0]
+        group = ids[margins]
+        rounded[margins] = cumsum[ends[group]] - cumsum[starts[group]]
+
+    rounded[isna] = np.nan
+    if axis == 1:
+        rounded = rounded.T
+    if isinstance(data, pd.DataFrame):
+        output = pd.DataFrame(rounded, index=data.index, columns=data.columns)
+    else:
+        output = pd.Series(rounded[:, 0], index=data.index, name=data.name)
+    return output.__finalize__(data)
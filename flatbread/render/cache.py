@@ -0,0 +1,77 @@
+"""
+Bounded LRU cache of serialized table specs.
+
+Specs are keyed by a fingerprint of the data they were built from (see
+`TableSpecBuilder.fingerprint`), so re-displaying an unchanged frame is a
+lookup no matter how often its accessor is recreated. The cache is bounded
+by the total size of the cached specs in UTF-8 bytes, set with the
+`spec_cache_size` config option; 0 disables caching.
+"""
+from collections import OrderedDict
+
+from flatbread import DEFAULTS
+
+
+class SpecCache:
+    """LRU cache of strings bounded by their total size in bytes"""
+    def __init__(self, max_size: int = 0):
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._size = 0
+        self.max_size = max_size
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int) -> None:
+        self._max_size = max(int(max_size), 0)
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def get(self, key: str) -> str | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        if key in self._items:
+            del self._items[key]
+            self._size -= self._sizes.pop(key)
+        size = len(value.encode())
+        if size > self._max_size:
+            return
+        self._items[key] = value
+        self._sizes[key] = size
+        self._size += size
+        self._evict()
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._sizes.clear()
+        self._size = 0
+
+    def _evict(self) -> None:
+        while self._size > self._max_size:
+            key, _ = self._items.popitem(last=False)
+            self._size -= self._sizes.pop(key)
+
+
+_spec_cache = SpecCache()
+
+
+def get_spec_cache() -> SpecCache:
+    """Get the process-wide spec cache, sized according to the config"""
+    _spec_cache.max_size = DEFAULTS.get('spec_cache_size', 0)
+    return _spec_cache
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from collections.abc import Mapping
 from typing import Any
 
 @dataclass
@@ -24,46 +25,106 @@ class DisplayConfig:
     # Visual effects
     show_hover: bool = False
 
+    # Data transport
+    paging: bool = False
+    encoding: str = "json"
+
     @classmethod
     def from_defaults(
         cls,
-        defaults: dict[str, Any],
+        defaults: Mapping[str, Any],
         data_attrs: dict|None = None,
     ) -> "DisplayConfig":
         """Create config instance from defaults dict"""
         if not defaults:
             return cls()
 
-        margin_labels = []
-        if totals := defaults.get('totals', {}):
-            margin_labels.append(totals.get('label', 'Totals'))
-        if subtotals := defaults.get('subtotals', {}):
-            margin_labels.append(subtotals.get('label', 'Subtotals'))
-        if percentages := defaults.get('percentages', {}):
-            margin_labels.append(percentages.get('label_pct', 'pct'))
+        options = resolve_defaults(cls, defaults)
+        margin_labels = list(options['margin_labels'])
 
-        # Add ignored keys from attrs
+        # Add recorded margins and percentages or else ignored keys from attrs
         if data_attrs and (fb_attrs := data_attrs.get('flatbread')):
-            if totals_attrs := fb_attrs.get('totals'):
+            if margins := fb_attrs.get('margins'):
+                margin_labels.extend(get_margin_labels(margins))
+            elif totals_attrs := fb_attrs.get('totals'):
                 if ignore_keys := totals_attrs.get('ignore_keys'):
                     margin_labels.extend(ignore_keys)
             if percentages_attrs := fb_attrs.get('percentages'):
-                if ignore_keys := percentages_attrs.get('ignore_keys'):
+                records = {
+                    name: record
+                    for name, record in percentages_attrs.items()
+                    if name in ('index', 'columns')
+                }
+                if records:
+                    margin_labels.extend(get_margin_labels(records))
+                elif ignore_keys := percentages_attrs.get('ignore_keys'):
                     margin_labels.extend(ignore_keys)
 
-        # Extract values from defaults, using dataclass defaults if not present
-        return cls(
-            locale = defaults.get("locale", cls.locale),
-            na_rep = defaults.get("na_rep", cls.na_rep),
-            margin_labels = list(set(margin_labels)),
-            collapse_columns=defaults.get("collapse_columns", cls.collapse_columns),
-            max_rows=defaults.get("max_rows", cls.max_rows),
-            max_columns=defaults.get("max_columns", cls.max_columns),
-            trim_size=defaults.get("trim_size", cls.trim_size),
-            separator=defaults.get("separator", cls.separator),
-            hide_column_borders=defaults.get("hide_column_borders", cls.hide_column_borders),
-            hide_row_borders=defaults.get("hide_row_borders", cls.hide_row_borders),
-            hide_thead_border=defaults.get("hide_thead_border", cls.hide_thead_border),
-            hide_index_border=defaults.get("hide_index_border", cls.hide_index_border),
-            show_hover=defaults.get("show_hover", cls.show_hover)
-        )
+        return cls(**{**options, 'margin_labels': list(set(margin_labels))})
+
+
+def get_margin_labels(margins: Mapping[str, Any]) -> list:
+    """
+    Get the labels of the margins recorded in the attrs
+
+    Each margin is labeled by its key at its margin level, e.g. "Subtotals"
+    for a subtotal of the groups in level 0. This keeps data labels that
+    merely start with a margin label out of the margins.
+    """
+    labels = []
+    for record in margins.values():
+        for key, level in zip(record['keys'], record['levels']):
+            labels.append(key[level] if isinstance(key, tuple) else key)
+    return labels
+
+
+_resolved: dict[str, Any] = {'defaults': None, 'version': None, 'options': {}}
+
+
+def resolve_defaults(
+    cls: type[DisplayConfig],
+    defaults: Mapping[str, Any],
+) -> dict[str, Any]:
+    """
+    Extract the display options from the defaults.
+
+    When the defaults are versioned (i.e. the config service) the options
+    are cached until the version changes.
+    """
+    version = getattr(defaults, 'version', None)
+    if (
+        version is not None
+        and _resolved['defaults'] is defaults
+        and _resolved['version'] == version
+    ):
+        return _resolved['options']
+
+    margin_labels = []
+    if totals := defaults.get('totals', {}):
+        margin_labels.append(totals.get('label', 'Totals'))
+    if subtotals := defaults.get('subtotals', {}):
+        margin_labels.append(subtotals.get('label', 'Subtotals'))
+    if percentages := defaults.get('percentages', {}):
+        margin_labels.append(percentages.get('label_pct', 'pct'))
+
+    # Extract values from defaults, using dataclass defaults if not present
+    options = dict(
+        locale = defaults.get("locale", cls.locale),
+        na_rep = defaults.get("na_rep", cls.na_rep),
+        margin_labels = margin_labels,
+        collapse_columns=defaults.get("collapse_columns", cls.collapse_columns),
+        max_rows=defaults.get("max_rows", cls.max_rows),
+        max_columns=defaults.get("max_columns", cls.max_columns),
+        trim_size=defaults.get("trim_size", cls.trim_size),
+        separator=defaults.get("separator", cls.separator),
+        hide_column_borders=defaults.get("hide_column_borders", cls.hide_column_borders),
+        hide_row_borders=defaults.get("hide_row_borders", cls.hide_row_borders),
+        hide_thead_border=defaults.get("hide_thead_border", cls.hide_thead_border),
+        hide_index_border=defaults.get("hide_index_border", cls.hide_index_border),
+        show_hover=defaults.get("show_hover", cls.show_hover),
+        paging=defaults.get("paging", cls.paging),
+        encoding=defaults.get("encoding", cls.encoding),
+    )
+    if version is not None:
+        _resolved.update(defaults=defaults, version=version, options=options)
+    return options
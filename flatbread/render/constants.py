@@ -1,40 +1,16 @@
-"""Constants for data-viewer formatting"""
-from flatbread import DEFAULTS
-
+"""
+Constants for data-viewer formatting
 
-USER_PRESETS = DEFAULTS.get("format_presets", {})
-USER_PRESETS_BY_DTYPE = {
-    dtype: set()
-    for dtype in ["float", "int", "datetime", "str", "category"]
-}
+USER_PRESETS, USER_PRESETS_BY_DTYPE, SMART_FORMATS and DTYPE_TO_PRESETS
+depend on the config. They are built on first access, and rebuilt when the
+config changes, so importing this module does not load the config files.
+"""
+from typing import Any
 
-for preset_name, preset_config in USER_PRESETS.items():
-    preset_dtypes = preset_config.get("dtypes", ["float", "int"])  # Default to numeric
-    for dtype in preset_dtypes:
-        if dtype in USER_PRESETS_BY_DTYPE:
-            USER_PRESETS_BY_DTYPE[dtype].add(preset_name)
+from flatbread import DEFAULTS
+from flatbread.config.service import thaw
 
 
-SMART_FORMATS = {
-    'percentages': {
-        'labels': [DEFAULTS['percentages']['label_pct']],
-        'options': {
-            'style': 'percent',
-            'minimumFractionDigits': 0,
-            'maximumFractionDigits':
-                DEFAULTS['percentages']['ndigits'] if DEFAULTS['percentages']['ndigits'] >= 0 else 21,
-        },
-        'excel_format': '0.0%'
-    },
-    'difference': {
-        'labels': ['diff'],
-        'options': {
-            'signDisplay': 'always',
-        },
-        'excel_format': '+#,##0;-#,##0',
-    }
-}
-
 DEFAULT_DTYPES: dict[str, str] = {
     'object':         'str',
     'string':         'str',
@@ -57,8 +33,68 @@ DEFAULT_DTYPES: dict[str, str] = {
 NUMBER_PRESETS = {"default", "currency", "percentage", "compact", "diffs"}
 DATE_PRESETS = {"default", "date", "datetime"}
 
-DTYPE_TO_PRESETS = {
-    "float": NUMBER_PRESETS.union(USER_PRESETS_BY_DTYPE["float"]),
-    "int": NUMBER_PRESETS.union(USER_PRESETS_BY_DTYPE["int"]),
-    "datetime": DATE_PRESETS.union(USER_PRESETS_BY_DTYPE["datetime"]),
+_CONFIG_CONSTANTS = {
+    'USER_PRESETS',
+    'USER_PRESETS_BY_DTYPE',
+    'SMART_FORMATS',
+    'DTYPE_TO_PRESETS',
 }
+_cache: dict[str, Any] = {'version': None, 'constants': {}}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _CONFIG_CONSTANTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    version = DEFAULTS.version
+    if _cache['version'] != version:
+        _cache['constants'] = build_config_constants()
+        _cache['version'] = version
+    return _cache['constants'][name]
+
+
+def build_config_constants() -> dict[str, Any]:
+    """Build the constants that depend on the config"""
+    USER_PRESETS = thaw(DEFAULTS.get("format_presets", {}))
+    USER_PRESETS_BY_DTYPE = {
+        dtype: set()
+        for dtype in ["float", "int", "datetime", "str", "category"]
+    }
+
+    for preset_name, preset_config in USER_PRESETS.items():
+        preset_dtypes = preset_config.get("dtypes", ["float", "int"])  # Default to numeric
+        for dtype in preset_dtypes:
+            if dtype in USER_PRESETS_BY_DTYPE:
+                USER_PRESETS_BY_DTYPE[dtype].add(preset_name)
+
+    SMART_FORMATS = {
+        'percentages': {
+            'labels': [DEFAULTS['percentages']['label_pct']],
+            'options': {
+                'style': 'percent',
+                'minimumFractionDigits': 0,
+                'maximumFractionDigits':
+                    DEFAULTS['percentages']['ndigits'] if DEFAULTS['percentages']['ndigits'] >= 0 else 21,
+            },
+            'excel_format': '0.0%'
+        },
+        'difference': {
+            'labels': ['diff'],
+            'options': {
+                'signDisplay': 'always',
+            },
+            'excel_format': '+#,##0;-#,##0',
+        }
+    }
+
+    DTYPE_TO_PRESETS = {
+        "float": NUMBER_PRESETS.union(USER_PRESETS_BY_DTYPE["float"]),
+        "int": NUMBER_PRESETS.union(USER_PRESETS_BY_DTYPE["int"]),
+        "datetime": DATE_PRESETS.union(USER_PRESETS_BY_DTYPE["datetime"]),
+    }
+
+    return {
+        'USER_PRESETS': USER_PRESETS,
+        'USER_PRESETS_BY_DTYPE': USER_PRESETS_BY_DTYPE,
+        'SMART_FORMATS': SMART_FORMATS,
+        'DTYPE_TO_PRESETS': DTYPE_TO_PRESETS,
+    }
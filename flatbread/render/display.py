@@ -1,17 +1,20 @@
-from typing import Any, Callable
+import json
+from typing import TYPE_CHECKING, Any, Callable
 
 import pandas as pd
-from jinja2 import Environment, PackageLoader
 
 from flatbread import DEFAULTS
 from flatbread.render.config import DisplayConfig
-from flatbread.render.template import TemplateManager
-from flatbread.render.tablespec import TableSpecBuilder, FormatSpec
+
+# The render stack (jinja2, templates, spec encoding) is only imported when
+# something is displayed, so that `import flatbread` stays cheap.
+if TYPE_CHECKING:
+    from flatbread.render.template import TemplateManager
+    from flatbread.render.tablespec import TableSpecBuilder, FormatSpec, Encoding
 
 
 class PitaDisplayMixin:
     """Mixin for displaying pandas objects using data-viewer"""
-    _env = Environment(loader=PackageLoader('flatbread', 'render'))
     _template_name = 'template.jinja.html'
 
     @property
@@ -24,16 +27,18 @@ class PitaDisplayMixin:
         return self._display_config
 
     @property
-    def _table_spec_builder(self) -> TableSpecBuilder:
+    def _table_spec_builder(self) -> "TableSpecBuilder":
         """Lazy initialization of spec builder"""
         if not hasattr(self, '_spec_builder'):
+            from flatbread.render.tablespec import TableSpecBuilder
             self._spec_builder = TableSpecBuilder(self._obj)
         return self._spec_builder
 
     @property
-    def _template_manager(self) -> TemplateManager:
+    def _template_manager(self) -> "TemplateManager":
         """Lazy initialization of template manager"""
         if not hasattr(self, '_template_mgr'):
+            from flatbread.render.template import TemplateManager
             self._template_mgr = TemplateManager()
         return self._template_mgr
 
@@ -120,6 +125,32 @@ class PitaDisplayMixin:
         self._config.margin_labels = list(labels)
         return self
 
+    def set_encoding(self, encoding: "Encoding") -> "PitaDisplayMixin":
+        """Set how values are sent to the viewer
+
+        Parameters
+        ----------
+        encoding : {'json', 'base64', 'arrow'}
+            'json' sends rows of values, 'base64' sends numeric columns as
+            typed arrays and 'arrow' as Arrow IPC buffers (requires pyarrow)
+
+        Returns
+        -------
+        PitaDisplayMixin
+            Self for method chaining
+        """
+        self._config.encoding = encoding
+        return self
+
+    def enable_paging(self, enable: bool = True) -> "PitaDisplayMixin":
+        """Let the viewer request windows of the data over a Jupyter comm
+
+        Only the visible rows and columns are embedded in the output; the
+        rest is served on demand while the kernel is running.
+        """
+        self._config.paging = enable
+        return self
+
     def format(
         self,
         column: str,
@@ -142,7 +173,7 @@ class PitaDisplayMixin:
         self._table_spec_builder.set_format(column, format_spec)
         return self
 
-    def format_columns(self, formats: FormatSpec) -> "PitaDisplayMixin":
+    def format_columns(self, formats: "FormatSpec") -> "PitaDisplayMixin":
         """Set multiple column formats at once"""
         self._table_spec_builder.set_formats(formats)
         return self
@@ -195,13 +226,30 @@ class PitaDisplayMixin:
 
     def _repr_html_(self) -> str:
         """Generate HTML representation for Jupyter display"""
-        spec = self._table_spec_builder.get_spec_as_json()
+        spec = self._table_spec_builder.get_spec_as_json(
+            max_rows=self._config.max_rows,
+            max_columns=self._config.max_columns,
+            trim_size=self._config.trim_size,
+            encoding=self._config.encoding,
+        )
+        if self._config.paging:
+            from flatbread.render import paging
+            table_id = paging.serve(self._table_spec_builder)
+            return self._template_manager.render(
+                spec,
+                self._config,
+                paging={"target": paging.TARGET_NAME, "table": table_id},
+            )
         return self._template_manager.render(spec, self._config)
 
     def get_table_spec(self) -> dict:
         """
         Get the raw table specification as a dictionary.
 
+        The dictionary is decoded from the same cached JSON spec as
+        `get_table_spec_json`, so labels of a MultiIndex are lists and
+        timestamps are strings.
+
         Returns
         -------
         dict
@@ -213,8 +261,10 @@ class PitaDisplayMixin:
             - indexNames: Names for index levels
             - dtypes: Data types per column
             - formatOptions: Format configuration per column
+            - shape: Number of rows and columns in the data
+            - truncation: Head and tail sizes per axis, if truncated
         """
-        return self._table_spec_builder.build_spec()
+        return json.loads(self._table_spec_builder.get_spec_as_json())
 
     def get_table_spec_json(self) -> str:
         """
@@ -0,0 +1,176 @@
+"""
+Serve windows of a table to the data viewer over Jupyter comms.
+
+The viewer opens a comm on `TARGET_NAME` with `{"table": <table id>}` and
+then requests windows with messages of the form::
+
+    {"type": "window", "id": 1, "rows": [0, 100], "columns": [0, 20]}
+
+Each request is answered with the positions that were served and the spec
+of only that slice, serialized as JSON::
+
+    {"type": "window", "id": 1, "rows": [0, 100], "columns": [0, 20],
+     "spec": "{...}"}
+
+Requests that cannot be handled are answered with an `error` message.
+
+Served tables are kept in a registry of at most `MAX_TABLES` tables, the
+least recently served table is dropped first. Serving the same frame again
+(e.g. re-running a cell) replaces its entry and keeps its id. Outputs of the
+same frame share that id, so a table is released when the last comm opened
+on it closes.
+"""
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any
+
+from flatbread.render.tablespec import TableSpecBuilder
+
+
+TARGET_NAME = 'flatbread.data-viewer'
+MAX_WINDOW_SIZE = 1_000_000
+MAX_TABLES = 16
+
+_tables: OrderedDict[str, TableSpecBuilder] = OrderedDict()
+_open_comms: Counter[str] = Counter()
+
+
+class PagingHandler:
+    """Answers window requests for a single table"""
+    def __init__(self, builder: TableSpecBuilder):
+        self._builder = builder
+
+    def handle(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Handle a message from the viewer and return the reply"""
+        request_id = message.get('id')
+        try:
+            if message.get('type') != 'window':
+                raise ValueError(f"Unknown message type: {message.get('type')}")
+            return {
+                "type": "window",
+                "id": request_id,
+                **self.get_window(message.get('rows'), message.get('columns')),
+            }
+        except (TypeError, ValueError) as e:
+            return {"type": "error", "id": request_id, "message": str(e)}
+
+    def get_window(
+        self,
+        rows: list[int] | None = None,
+        columns: list[int] | None = None,
+    ) -> dict[str, Any]:
+        """Serialize the spec for a window of rows and columns
+
+        Parameters
+        ----------
+        rows : list[int], optional
+            Start and stop position of the rows, all rows if None
+        columns : list[int], optional
+            Start and stop position of the columns, all columns if None
+
+        Returns
+        -------
+        dict
+            The clipped row and column positions and the spec as JSON
+        """
+        n_rows, n_columns = self._builder._shape
+        row_start, row_stop = clip_window(rows, n_rows)
+        col_start, col_stop = clip_window(columns, n_columns)
+        n_cells = (row_stop - row_start) * (col_stop - col_start)
+        if n_cells > MAX_WINDOW_SIZE:
+            raise ValueError(
+                f"Window of {n_cells} cells exceeds maximum of {MAX_WINDOW_SIZE}"
+            )
+        builder = self._builder.window(
+            slice(row_start, row_stop),
+            slice(col_start, col_stop),
+        )
+        # windows are not cached, every window would take a slot in the spec cache
+        return {
+            "rows": [row_start, row_stop],
+            "columns": [col_start, col_stop],
+            "spec": ''.join(builder.iter_spec_json()),
+        }
+
+
+def clip_window(window: list[int] | None, n: int) -> tuple[int, int]:
+    """Clip a start and stop position to the bounds of an axis"""
+    if window is None:
+        return 0, n
+    start, stop = (int(i) for i in window)
+    start = min(max(start, 0), n)
+    return start, min(max(stop, start), n)
+
+
+def serve(builder: TableSpecBuilder, comm_manager: Any = None) -> str:
+    """Make a table available to the viewer and return its id
+
+    Parameters
+    ----------
+    builder : TableSpecBuilder
+        Builder for the full table
+    comm_manager : optional
+        Comm manager to register the target with, defaults to the manager of
+        the running kernel
+
+    Returns
+    -------
+    str
+        Id the viewer uses to open a comm for the table, the same id every
+        time the same frame is served
+    """
+    if comm_manager is None:
+        comm_manager = get_comm_manager()
+    comm_manager.register_target(TARGET_NAME, open_comm)
+    table_id = find_table(builder)
+    if table_id is None:
+        table_id = f"id-{uuid.uuid4()}"
+    _tables[table_id] = builder
+    _tables.move_to_end(table_id)
+    while len(_tables) > MAX_TABLES:
+        _tables.popitem(last=False)
+    return table_id
+
+
+def find_table(builder: TableSpecBuilder) -> str | None:
+    """Get the id under which the frame of a builder is served, if any"""
+    for table_id, served in _tables.items():
+        if served._obj is builder._obj:
+            return table_id
+    return None
+
+
+def open_comm(comm: Any, open_msg: dict) -> None:
+    """Connect a comm opened by the viewer to the handler of its table"""
+    table_id = open_msg['content']['data'].get('table')
+    builder = _tables.get(table_id)
+    if builder is None:
+        comm.send({"type": "error", "message": f"Unknown table: {table_id}"})
+        comm.close()
+        return
+    handler = PagingHandler(builder)
+    _open_comms[table_id] += 1
+
+    def on_msg(msg: dict) -> None:
+        comm.send(handler.handle(msg['content']['data']))
+
+    def on_close(msg: dict) -> None:
+        _open_comms[table_id] -= 1
+        if _open_comms[table_id] <= 0:
+            del _open_comms[table_id]
+            _tables.pop(table_id, None)
+
+    comm.on_msg(on_msg)
+    comm.on_close(on_close)
+
+
+def get_comm_manager() -> Any:
+    """Get the comm manager of the running kernel"""
+    try:
+        from comm import get_comm_manager
+    except ImportError as e:
+        raise ImportError(
+            "Paging requires the `comm` package, "
+            "which is installed together with ipykernel"
+        ) from e
+    return get_comm_manager()
@@ -1,12 +1,20 @@
+import base64
+import hashlib
 import json
 import decimal
-from typing import Any, Callable
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Iterator, Literal
 
+import numpy as np
 import pandas as pd
 
-from flatbread.render.constants import DEFAULT_DTYPES, DTYPE_TO_PRESETS, SMART_FORMATS
+from flatbread import DEFAULTS
+from flatbread.config.service import thaw
+from flatbread.render import constants
+from flatbread.render.cache import get_spec_cache
 
 
+Encoding = Literal['json', 'base64', 'arrow']
 ColumnFormat = str | dict[str, Any]
 ColumnFormats = dict[str, ColumnFormat] | list[ColumnFormat]
 FormatSpec = ColumnFormats | Callable[[pd.DataFrame], ColumnFormats]
@@ -15,32 +23,224 @@ FormatSpec = ColumnFormats | Callable[[pd.DataFrame], ColumnFormats]
 class TableSpecBuilder:
     """Converts pandas objects to data-viewer specifications"""
     def __init__(self, data: pd.DataFrame | pd.Series):
+        self._obj = data
         self._data = data.to_frame() if isinstance(data, pd.Series) else data
         self._format_options: dict[str, str | dict[str, Any]] = {}
+        self._shape = self._data.shape
+        self._truncation: dict[str, dict[str, int] | None] = {
+            "rows": None,
+            "columns": None,
+        }
 
     def build_spec(self) -> dict:
         return {
             "values": self._prepare_values(),
+            **self._prepare_labels(),
+        }
+
+    def get_spec_as_json(
+        self,
+        max_rows: int | None = None,
+        max_columns: int | None = None,
+        trim_size: int = 5,
+        encoding: Encoding = 'json',
+    ) -> str:
+        builder = self.truncate(max_rows, max_columns, trim_size)
+        cache = get_spec_cache()
+        key = builder.fingerprint(encoding) if cache.max_size else None
+        if key is not None and (spec := cache.get(key)) is not None:
+            return spec
+        spec = ''.join(builder.iter_spec_json(encoding=encoding))
+        if key is not None:
+            cache.put(key, spec)
+        return spec
+
+    def fingerprint(self, *params: Any) -> str | None:
+        """Fingerprint the data and options the spec is built from
+
+        Hashes the values with `pd.util.hash_pandas_object`, together with the
+        labels, dtypes, attrs, format options, shape, truncation and the
+        config version, as the smart formats and presets depend on the
+        config. Call it on a truncated builder to only hash what is displayed.
+
+        Parameters
+        ----------
+        *params : Any
+            Extra parameters that affect the spec, e.g. the encoding
+
+        Returns
+        -------
+        str | None
+            Hex digest, None if the data cannot be hashed
+        """
+        data = self._data
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+            digest.update(pd.util.hash_pandas_object(data.columns).to_numpy().tobytes())
+            digest.update(pd.util.hash_pandas_object(data.index).to_numpy().tobytes())
+        except TypeError:
+            return None
+        digest.update(repr((
+            list(data.dtypes.astype(str)),
+            list(data.columns.names),
+            list(data.index.names),
+            data.attrs,
+            self._format_options,
+            self._shape,
+            self._truncation,
+            DEFAULTS.version,
+            params,
+        )).encode())
+        return digest.hexdigest()
+
+    def iter_spec_json(
+        self,
+        chunk_size: int = 10_000,
+        encoding: Encoding = 'json',
+    ) -> Iterator[str]:
+        """Yield the JSON specification in chunks
+
+        With the 'json' encoding, values are encoded column by column
+        straight from the underlying arrays and written out `chunk_size` rows
+        at a time, so the full nested list of cell values is never
+        materialized.
+
+        With the 'base64' and 'arrow' encodings, values are sent column-major
+        instead: numeric columns as base64 typed arrays or Arrow IPC buffers,
+        categoricals as categories and codes and anything else as JSON. The
+        spec then carries an `encoding` key for the decoder in the template.
+        """
+        if encoding == 'json':
+            yield '{"values":'
+            yield from self._iter_values_json(chunk_size)
+        else:
+            encoders = {
+                'base64': encode_column_base64,
+                'arrow': encode_column_arrow,
+            }
+            if encoding not in encoders:
+                valid = ", ".join(['json', *encoders])
+                raise ValueError(
+                    f"Invalid encoding '{encoding}'. Valid options are: {valid}"
+                )
+            encode = encoders[encoding]
+            yield f'{{"encoding":"{encoding}","values":['
+            for i in range(self._data.shape[1]):
+                column = encode(self._data.iloc[:, i])
+                yield column if i == 0 else ',' + column
+            yield ']'
+        yield ',' + self._serialize_to_json(self._prepare_labels())[1:]
+
+    def truncate(
+        self,
+        max_rows: int | None = None,
+        max_columns: int | None = None,
+        trim_size: int = 5,
+    ) -> "TableSpecBuilder":
+        """Return a builder for only the rows and columns that are displayed
+
+        When the data exceeds `max_rows` or `max_columns`, keep just enough
+        of the head and tail for the viewer to still truncate with its
+        separator: the last `trim_size` items and as many leading items as
+        make up `max + 1`. The true shape and the sizes of the kept head and
+        tail are recorded in the spec.
+
+        Parameters
+        ----------
+        max_rows : int, optional
+            Maximum rows before truncating, None to keep all rows
+        max_columns : int, optional
+            Maximum columns before truncating, None to keep all columns
+        trim_size : int
+            Number of items to show on either side when truncated
+
+        Returns
+        -------
+        TableSpecBuilder
+            Self if nothing is truncated, else a builder for the visible data
+        """
+        n_rows, n_columns = self._data.shape
+        rows = get_truncation(n_rows, max_rows, trim_size)
+        columns = get_truncation(n_columns, max_columns, trim_size)
+        if rows is None and columns is None:
+            return self
+
+        data = self._data
+        if rows is not None:
+            data = data.iloc[get_visible_positions(n_rows, **rows)]
+        if columns is not None:
+            data = data.iloc[:, get_visible_positions(n_columns, **columns)]
+
+        builder = TableSpecBuilder(data)
+        builder._format_options = self._format_options
+        builder._shape = self._shape
+        builder._truncation = {"rows": rows, "columns": columns}
+        return builder
+
+    def window(
+        self,
+        rows: slice = slice(None),
+        columns: slice = slice(None),
+    ) -> "TableSpecBuilder":
+        """Return a builder for a positional slice of rows and columns
+
+        The spec of the window keeps the shape of the full data so that the
+        viewer knows how much more there is to request.
+
+        Parameters
+        ----------
+        rows : slice
+            Positional slice of the rows
+        columns : slice
+            Positional slice of the columns
+
+        Returns
+        -------
+        TableSpecBuilder
+            Builder for the data within the window
+        """
+        builder = TableSpecBuilder(self._data.iloc[rows, columns])
+        builder._format_options = self._format_options
+        builder._shape = self._shape
+        return builder
+
+    def _prepare_labels(self) -> dict:
+        """Prepare everything in the spec but the values"""
+        return {
             "columns": self._prepare_columns(),
             "index": self._prepare_index(),
             "columnNames": self._data.columns.names,
             "indexNames": self._data.index.names,
             "dtypes": self._prepare_dtypes(),
-            "formatOptions": self._prepare_format_options()
+            "formatOptions": self._prepare_format_options(),
+            "shape": list(self._shape),
+            "truncation": self._truncation,
         }
 
-    def get_spec_as_json(self) -> str:
-        spec = self.build_spec()
-        as_json = self._serialize_to_json(spec)
-        return as_json
+    def _iter_values_json(self, chunk_size: int) -> Iterator[str]:
+        """Yield the values as a JSON array of rows in chunks"""
+        n_rows, n_columns = self._data.shape
+        columns = [
+            encode_column(self._data.iloc[:, i])
+            for i in range(n_columns)
+        ]
+        yield '['
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            if columns:
+                rows = zip(*(column[start:stop] for column in columns))
+                chunk = ','.join(['[' + ','.join(row) + ']' for row in rows])
+            else:
+                chunk = ','.join(['[]'] * (stop - start))
+            yield chunk if start == 0 else ',' + chunk
+        yield ']'
 
     def _prepare_values(self) -> list[list]:
         """Convert DataFrame values to nested list format"""
-        values = [
-            [None if pd.isna(i) else i for i in row]
-            for row in self._data.values.tolist()
-        ]
-        return values
+        values = self._data.to_numpy(dtype=object, copy=True)
+        values[pd.isna(values)] = None
+        return values.tolist()
 
     def _prepare_columns(self) -> list:
         """Prepare column labels"""
@@ -52,7 +252,7 @@ class TableSpecBuilder:
 
     def _prepare_dtypes(self) -> list[str]:
         """Convert pandas dtypes to simplified type names"""
-        return [DEFAULT_DTYPES.get(str(dtype), 'str') for dtype in self._data.dtypes]
+        return [constants.DEFAULT_DTYPES.get(str(dtype), 'str') for dtype in self._data.dtypes]
 
     def _prepare_format_options(self) -> list[str | dict[str, Any] | None]:
         """Get format options for each column"""
@@ -87,7 +287,7 @@ class TableSpecBuilder:
         value = value.lower()
 
         # Iterate through format types
-        for format_type in SMART_FORMATS.values():
+        for format_type in constants.SMART_FORMATS.values():
             # Check if value matches any of the labels for this format
             for label in format_type['labels']:
                 if label in value:
@@ -117,7 +317,7 @@ class TableSpecBuilder:
                 allowed_dtypes = preset_config.get("dtypes", ["float", "int"])
 
                 if simple_dtype in allowed_dtypes:
-                    self._format_options[column] = preset_config.get("options", {})
+                    self._format_options[column] = thaw(preset_config.get("options", {}))
                     return
                 else:
                     raise ValueError(
@@ -139,7 +339,7 @@ class TableSpecBuilder:
                 )
 
         # If we reached here, either format_spec is a dict or a valid built-in preset
-        self._format_options[column] = format_spec
+        self._format_options[column] = thaw(format_spec)
 
     def set_formats(self, formats: FormatSpec) -> None:
         """Set multiple column formats at once.
@@ -241,3 +441,198 @@ class TableSpecBuilder:
         if hasattr(obj, 'dtype'):
             return obj.item()
         return str(obj)
+
+
+# MARK: Truncation
+def get_truncation(
+    n: int,
+    max_items: int | None,
+    trim_size: int,
+) -> dict[str, int] | None:
+    """Get the number of head and tail items to keep, None if all fit"""
+    if max_items is None or n <= max_items:
+        return None
+    tail = max(min(trim_size, max_items), 0)
+    return {"head": max_items + 1 - tail, "tail": tail}
+
+
+def get_visible_positions(n: int, head: int, tail: int) -> np.ndarray:
+    """Get the positions of the head and tail items"""
+    return np.r_[0:head, n - tail:n]
+
+
+# MARK: Encoding
+def encode_column(column: pd.Series) -> np.ndarray:
+    """Encode every value in a column as a JSON string
+
+    Missing values become `null`. Float, int, bool, datetime and categorical
+    columns are encoded vectorized; other columns fall back to `json.dumps`
+    per value.
+
+    Parameters
+    ----------
+    column : pd.Series
+        Column to encode
+
+    Returns
+    -------
+    np.ndarray
+        Object array with the JSON representation of each value
+    """
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = encode_column(pd.Series(dtype.categories))
+        lookup = np.append(categories, 'null')
+        return lookup[column.cat.codes.to_numpy()]
+
+    mask = column.isna().to_numpy()
+    kind = getattr(dtype, 'kind', 'O')
+    if kind in 'fiub':
+        numpy_dtype = getattr(dtype, 'numpy_dtype', dtype)
+        fill = False if kind == 'b' else 0
+        values = column.to_numpy(dtype=numpy_dtype, na_value=fill)
+        if kind == 'b':
+            encoded = np.where(values, 'true', 'false').astype(object)
+        else:
+            # numbers never contain commas, so one C-level dump can be split
+            encoded = np.array(
+                json.dumps(values.tolist(), separators=(',', ':'))[1:-1].split(','),
+                dtype=object,
+            ) if len(values) else np.array([], dtype=object)
+    elif kind == 'M' and isinstance(dtype, np.dtype):
+        encoded = _encode_datetimes(column, mask)
+    else:
+        values = column.to_numpy(dtype=object)
+        if pd.api.types.infer_dtype(values, skipna=True) == 'string':
+            encoded = np.array(
+                [encode_basestring_ascii(i) for i in values[~mask]],
+                dtype=object,
+            )
+        else:
+            encoded = np.array(
+                [
+                    json.dumps(i, default=TableSpecBuilder._json_serialize)
+                    for i in values[~mask]
+                ],
+                dtype=object,
+            )
+        result = np.full(len(values), 'null', dtype=object)
+        result[~mask] = encoded
+        return result
+
+    encoded[mask] = 'null'
+    return encoded
+
+
+def _encode_datetimes(column: pd.Series, mask: np.ndarray) -> np.ndarray:
+    """Encode naive datetimes as ISO strings, dropping midnight times"""
+    values = column.to_numpy()
+    days = values.astype('datetime64[D]')
+    seconds = values.astype('datetime64[s]')
+    encoded = np.where(
+        days == values,
+        np.datetime_as_string(days, unit='D'),
+        np.datetime_as_string(seconds, unit='s'),
+    ).astype(object)
+    encoded = '"' + encoded + '"'
+
+    # sub-second precision is rare; let the timestamps format themselves
+    fractional = np.flatnonzero((seconds != values) & ~mask)
+    for i in fractional:
+        encoded[i] = json.dumps(
+            TableSpecBuilder._json_serialize(column.iloc[i])
+        )
+    return encoded
+
+
+def encode_column_base64(column: pd.Series) -> str:
+    """Encode a column as a JSON object holding a base64 typed array
+
+    Float, int and bool columns are sent as the little-endian bytes of the
+    matching JS typed array, with NaN as missing value for floats and a
+    `valid` byte mask for nullable ints and bools. Categoricals are sent as
+    their categories and the typed array of their codes. Other columns fall
+    back to a JSON array.
+
+    Parameters
+    ----------
+    column : pd.Series
+        Column to encode
+
+    Returns
+    -------
+    str
+        JSON object with the `type` of the column and its `data`
+    """
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = encode_column(pd.Series(dtype.categories))
+        codes = encode_column_base64(pd.Series(column.cat.codes.to_numpy()))
+        return (
+            f'{{"type":"category","categories":[{",".join(categories)}],'
+            f'"codes":{codes}}}'
+        )
+
+    kind = getattr(dtype, 'kind', 'O')
+    if kind not in 'fiub':
+        return f'{{"type":"json","data":[{",".join(encode_column(column))}]}}'
+
+    mask = column.isna().to_numpy()
+    numpy_dtype = np.dtype(getattr(dtype, 'numpy_dtype', dtype))
+    if kind == 'f':
+        numpy_dtype = np.promote_types(numpy_dtype, np.float32)
+        values = column.to_numpy(dtype=numpy_dtype, na_value=np.nan)
+    else:
+        fill = False if kind == 'b' else 0
+        values = column.to_numpy(dtype=numpy_dtype, na_value=fill)
+
+    if kind == 'b':
+        array_type = 'bool'
+        values = values.view(np.uint8)
+    else:
+        array_type = numpy_dtype.name
+        values = values.astype(numpy_dtype.newbyteorder('<'), copy=False)
+
+    payload = {"type": array_type, "data": to_base64(values)}
+    if kind != 'f' and mask.any():
+        payload["valid"] = to_base64((~mask).view(np.uint8))
+    return json.dumps(payload, separators=(',', ':'))
+
+
+def encode_column_arrow(column: pd.Series) -> str:
+    """Encode a column as a JSON object holding an Arrow IPC stream
+
+    Float, int and bool columns are written as a single column Arrow table,
+    with NaN and NA as nulls. Other columns are encoded as in
+    `encode_column_base64`. Requires pyarrow.
+
+    Parameters
+    ----------
+    column : pd.Series
+        Column to encode
+
+    Returns
+    -------
+    str
+        JSON object with the `type` of the column and its `data`
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("The 'arrow' encoding requires pyarrow") from e
+
+    kind = getattr(column.dtype, 'kind', 'O')
+    if isinstance(column.dtype, pd.CategoricalDtype) or kind not in 'fiub':
+        return encode_column_base64(column)
+
+    table = pa.table({"values": pa.array(column, from_pandas=True)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+    return f'{{"type":"arrow","data":"{data}"}}'
+
+
+def to_base64(values: np.ndarray) -> str:
+    """Encode the buffer of an array as base64"""
+    return base64.b64encode(np.ascontiguousarray(values).data).decode('ascii')
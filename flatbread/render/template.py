@@ -1,24 +1,89 @@
-import decimal
-import json
 import uuid
+from collections.abc import Iterable
+from functools import cache
+from pathlib import Path
 
-import pandas as pd
-from jinja2 import Environment, PackageLoader
+from jinja2 import Environment, ModuleLoader, PackageLoader, Template
 
 from flatbread.render.config import DisplayConfig
 
 
+TEMPLATE_NAME = "template.jinja.html"
+COMPILED_PATH = Path(__file__).parent / "compiled"
+SPEC_MARKER = "/*flatbread:spec*/"
+
+
 # MARK: Template
 class TemplateManager:
     """Manages rendering templates"""
-    def __init__(self):
-        self._env = Environment(loader=PackageLoader("flatbread", "render"))
+    def render(
+        self,
+        spec: str | Iterable[str],
+        config: DisplayConfig,
+        paging: dict[str, str] | None = None,
+    ) -> str:
+        """Render the template around a serialized spec
+
+        The template is rendered with a marker in place of the spec, which is
+        spliced in afterwards so that Jinja never handles the (potentially
+        large) spec itself.
 
-    def render(self, spec: str, config: DisplayConfig) -> str:
-        template = self._env.get_template("template.jinja.html")
-        html = template.render(
-            data=spec,
+        Parameters
+        ----------
+        spec : str | Iterable[str]
+            Spec serialized as JSON, either whole or in chunks
+        config : DisplayConfig
+            Display options
+        paging : dict, optional
+            Comm target and table id if the viewer pages its data
+
+        Returns
+        -------
+        str
+            HTML for the viewer
+        """
+        html = get_template().render(
+            data=SPEC_MARKER,
             config=config,
+            paging=paging,
             id=f"id-{uuid.uuid4()}"
         )
-        return html
+        head, tail = html.split(SPEC_MARKER, 1)
+        chunks = [spec] if isinstance(spec, str) else spec
+        return ''.join([head, *chunks, tail])
+
+
+@cache
+def get_template() -> Template:
+    """Get the template, compiled once per process
+
+    Uses the precompiled template if `precompile` was run, e.g. as a build
+    step, and otherwise compiles it from the package source.
+    """
+    if COMPILED_PATH.is_dir():
+        loader = ModuleLoader(str(COMPILED_PATH))
+    else:
+        loader = PackageLoader("flatbread", "render")
+    return Environment(loader=loader).get_template(TEMPLATE_NAME)
+
+
+def precompile(target: str | Path = COMPILED_PATH) -> None:
+    """Compile the template to Python modules ahead of time
+
+    Parameters
+    ----------
+    target : str | Path
+        Directory to write the compiled template to. Only the default
+        location is picked up by `get_template`.
+    """
+    env = Environment(loader=PackageLoader("flatbread", "render"))
+    env.compile_templates(
+        str(target),
+        filter_func = lambda name: name == TEMPLATE_NAME,
+        zip = None,
+    )
+    get_template.cache_clear()
+
+
+if __name__ == "__main__":
+    precompile()
@@ -0,0 +1,71 @@
+from typing import Any, Callable
+
+
+class LocalComm:
+    """
+    In-process stand-in for a Jupyter comm.
+
+    The kernel side uses the same `send`, `on_msg`, `on_close` and `close`
+    methods as on a real comm. The frontend side is played by `request`,
+    which delivers a message to the kernel and returns the reply.
+    """
+    def __init__(self, target_name: str, data: dict | None = None):
+        self.target_name = target_name
+        self.data = data or {}
+        self.sent: list[Any] = []
+        self.closed = False
+        self._msg_callback: Callable[[dict], None] | None = None
+        self._close_callback: Callable[[dict], None] | None = None
+
+    # kernel side
+    def send(self, data: Any = None, **kwargs) -> None:
+        self.sent.append(data)
+
+    def on_msg(self, callback: Callable[[dict], None]) -> None:
+        self._msg_callback = callback
+
+    def on_close(self, callback: Callable[[dict], None]) -> None:
+        self._close_callback = callback
+
+    def close(self, data: Any = None, **kwargs) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._close_callback is not None:
+            self._close_callback({'content': {'data': data}})
+
+    # frontend side
+    def request(self, data: dict) -> Any:
+        """Send a message from the frontend and return the kernel's reply"""
+        if self.closed or self._msg_callback is None:
+            raise RuntimeError("Comm is not open")
+        n_sent = len(self.sent)
+        self._msg_callback({'content': {'data': data}})
+        replies = self.sent[n_sent:]
+        return replies[-1] if replies else None
+
+
+class LocalCommManager:
+    """
+    In-process stand-in for the kernel's comm manager.
+
+    Register targets like on the real manager, then `open` comms on them as
+    the frontend would.
+    """
+    def __init__(self):
+        self.targets: dict[str, Callable[[Any, dict], None]] = {}
+
+    def register_target(
+        self,
+        target_name: str,
+        callback: Callable[[Any, dict], None],
+    ) -> None:
+        self.targets[target_name] = callback
+
+    def open(self, target_name: str, data: dict | None = None) -> LocalComm:
+        """Open a comm from the frontend on a registered target"""
+        if target_name not in self.targets:
+            raise KeyError(f"No target registered as {target_name!r}")
+        comm = LocalComm(target_name, data)
+        self.targets[target_name](comm, {'content': {'data': comm.data}})
+        return comm
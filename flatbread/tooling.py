@@ -1,3 +1,4 @@
+from collections.abc import Iterable, Mapping
 from functools import wraps
 from typing import Any, Callable, TypeVar
 
@@ -28,29 +29,14 @@ def handle_series_as_dataframe(func: Callable[..., pd.DataFrame]) -> Callable[..
     return wrapper
 
 
-def handle_axis_rotation(func) -> Callable:
-    """
-    Decorator that handles axis=1 by transposing before and after the operation.
-    """
-    @wraps(func)
-    def wrapper(df, *args, **kwargs):
-        axis = kwargs.pop('axis', 0)
-        if axis in [1, 'columns']:
-            df = df.T
-            result = func(df, *args, **kwargs)
-            return result.T
-        return func(df, *args, **kwargs)
-    return wrapper
-
-
-def inject_defaults(defaults: dict) -> Callable:
+def inject_defaults(defaults: Mapping) -> Callable:
     """
     Load defaults if keywords are None or undefined when calling a function.
 
     Arguments
     ---------
-    defaults (dict):
-        Dictionary of keywords and default values.
+    defaults (Mapping):
+        Mapping of keywords and default values. If the mapping has a `version` (i.e. a section of the config service) the defaults are read when the function is called and cached until the version changes.
 
     Return
     ------
@@ -61,10 +47,21 @@ def inject_defaults(defaults: dict) -> Callable:
     -----
     This decorator will override any default values set in the function definition.
     """
+    cache: dict[str, Any] = {'version': None, 'items': ()}
+
+    def get_defaults() -> Iterable[tuple[str, Any]]:
+        version = getattr(defaults, 'version', None)
+        if version is None:
+            return defaults.items()
+        if cache['version'] != version:
+            cache['items'] = tuple(defaults.items())
+            cache['version'] = version
+        return cache['items']
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            for key, val in defaults.items():
+            for key, val in get_defaults():
                 if kwargs.get(key) is None:
                     kwargs[key] = val
             return func(*args, **kwargs)
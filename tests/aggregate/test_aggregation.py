@@ -0,0 +1,236 @@
+import unittest
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import flatbread.agg.aggregation as agg
+import flatbread.agg.totals as totals
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestAggAdd_MultipleStats(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=6,
+            ncols=3,
+            data_gen_f=lambda r, c: float(r * c + 1),
+        )
+        self.stats = ['sum', 'mean', 'min', 'max', 'count']
+
+    def test_matches_chained_aggs(self):
+        result = agg.add_agg(self.df, self.stats)
+        expected = self.df
+        for stat in self.stats:
+            expected = agg.add_agg(expected, stat, ignore_keys=self.stats)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_matches_chained_aggs_on_columns(self):
+        result = agg.add_agg(self.df, self.stats, axis=1)
+        expected = self.df
+        for stat in self.stats:
+            expected = agg.add_agg(expected, stat, axis=1, ignore_keys=self.stats)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_dict_labels(self):
+        result = agg.add_agg(self.df, {'Total': 'sum', 'Range': np.ptp})
+        self.assertEqual(list(result.index[-2:]), ['Total', 'Range'])
+        pd.testing.assert_series_equal(
+            result.loc['Range'],
+            self.df.max() - self.df.min(),
+            check_names=False,
+        )
+
+    def test_list_labels(self):
+        result = agg.add_agg(self.df, ['sum', 'mean'], label=['S', 'M'])
+        self.assertEqual(list(result.index[-2:]), ['S', 'M'])
+
+    def test_multiindex_keys(self):
+        df = make_test_df(nrows=6, ncols=2, idx_levels=2, data_gen_f=lambda r, c: r)
+        result = agg.add_agg(df, ['sum', 'mean'], _fill='-')
+        self.assertEqual(list(result.index[-2:]), [('sum', '-'), ('mean', '-')])
+
+    def test_label_count_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            agg.add_agg(self.df, ['sum', 'mean'], label=['S'])
+
+    def test_existing_key_raises(self):
+        df = agg.add_agg(self.df, 'sum')
+        with self.assertRaises(ValueError):
+            agg.add_agg(df, ['mean', 'sum'], ignore_keys='sum')
+
+
+class TestSubaggAdd_MultipleStats(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=12,
+            ncols=3,
+            idx_dupes=[4, 1],
+            data_gen_f=lambda r, c: float(r * c + 1),
+        )
+        self.stats = ['sum', 'mean', 'max']
+
+    def test_matches_single_stats(self):
+        result = agg.add_subagg(self.df, self.stats)
+        for stat in self.stats:
+            expected = agg.add_subagg(self.df, stat)
+            pd.testing.assert_frame_equal(
+                result.xs(stat, level=1, drop_level=False),
+                expected.xs(stat, level=1, drop_level=False),
+            )
+
+    def test_stats_follow_each_group_in_order(self):
+        result = agg.add_subagg(self.df, {'S': 'sum', 'M': 'mean'})
+        for key in self.df.index.get_level_values(0).unique():
+            group = result.loc[key].index
+            self.assertEqual(list(group[-2:]), ['S', 'M'])
+        self.assertEqual(len(result), len(self.df) + 2 * self.df.index.levshape[0])
+
+    def test_matches_single_stats_on_columns(self):
+        df = self.df.T
+        result = agg.add_subagg(df, self.stats, axis=1)
+        for stat in self.stats:
+            expected = agg.add_subagg(df, stat, axis=1)
+            pd.testing.assert_frame_equal(
+                result.xs(stat, level=1, axis=1, drop_level=False),
+                expected.xs(stat, level=1, axis=1, drop_level=False),
+                check_dtype=False,
+            )
+
+    def test_include_level_name(self):
+        result = agg.add_subagg(
+            self.df,
+            ['sum', 'mean'],
+            label=['S', 'M'],
+            include_level_name=True,
+        )
+        key = self.df.index[0][0]
+        self.assertEqual(list(result.loc[key].index[-2:]), [f"S {key}", f"M {key}"])
+
+
+class TestSubaggAdd_Parallel(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=60,
+            ncols=4,
+            idx_dupes=[10, 5, 1],
+            data_gen_f=lambda r, c: float(r * c + 1),
+        )
+
+    def test_n_jobs_match_serial(self):
+        for aggfunc in ['sum', ['sum', 'median'], np.ptp]:
+            with self.subTest(aggfunc=aggfunc):
+                result = agg.add_subagg(self.df, aggfunc, level=[0, 1], n_jobs=3)
+                expected = agg.add_subagg(self.df, aggfunc, level=[0, 1])
+                pd.testing.assert_frame_equal(result, expected)
+
+    def test_n_jobs_match_serial_on_columns(self):
+        df = self.df.T
+        result = agg.add_subagg(df, ['sum', 'median'], axis=1, n_jobs=4)
+        expected = agg.add_subagg(df, ['sum', 'median'], axis=1)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(2) as executor:
+            result = agg.add_subagg(self.df, 'median', level=1, executor=executor)
+        expected = agg.add_subagg(self.df, 'median', level=1)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_n_jobs_uses_process_pool(self):
+        with mock.patch.object(agg, 'ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            agg.add_subagg(self.df, 'sum', level=1, n_jobs=2)
+        pool.assert_called_once_with(2)
+
+    def test_n_jobs_with_lambda(self):
+        aggfunc = lambda s: s.max() - s.min()
+        with mock.patch.object(agg, 'ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool:
+            result = agg.add_subagg(self.df, aggfunc, level=[0, 1], n_jobs=2)
+        pool.assert_called_with(2)
+        expected = agg.add_subagg(self.df, aggfunc, level=[0, 1])
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(2) as executor:
+            result = agg.add_subagg(self.df, 'median', level=[0, 1], executor=executor)
+        expected = agg.add_subagg(self.df, 'median', level=[0, 1])
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_subtotals(self):
+        result = totals.add_subtotals(self.df, axis=0, level=[0, 1], n_jobs=2)
+        expected = totals.add_subtotals(self.df, axis=0, level=[0, 1])
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestAggAdd_FastPath(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        floats = pd.DataFrame(rng.random((200, 5)))
+        floats.iloc[::7, 1] = np.nan
+        floats[3] = np.nan
+        self.frames = {
+            'float': floats,
+            'int': pd.DataFrame(rng.integers(-50, 50, (200, 5))),
+            'subtotaled': totals.add_subtotals(
+                make_test_df(
+                    nrows=40,
+                    ncols=4,
+                    idx_dupes=[4, 2],
+                    data_gen_f=lambda r, c: (r * c) / 7,
+                ),
+                axis=0,
+            ),
+        }
+
+    def generic(self, df, aggfunc, axis):
+        with mock.patch.object(agg, 'reduce_block', return_value=None):
+            return agg.add_agg(df, aggfunc, axis=axis)
+
+    def test_matches_generic_path(self):
+        for name, df in self.frames.items():
+            for aggfunc in agg.FAST_AGGFUNCS:
+                for axis in [0, 1]:
+                    with self.subTest(frame=name, aggfunc=aggfunc, axis=axis):
+                        mask = agg.chaining.get_margins(df, axis, None) < 0
+                        self.assertIsNotNone(agg.reduce_block(df, aggfunc, axis, mask))
+                        pd.testing.assert_frame_equal(
+                            agg.add_agg(df, aggfunc, axis=axis),
+                            self.generic(df, aggfunc, axis),
+                            check_exact=True,
+                        )
+
+    def test_falls_back(self):
+        df = self.frames['int']
+        mask = np.ones(len(df), dtype=bool)
+        self.assertIsNone(agg.reduce_block(df, 'median', 0, mask))
+        self.assertIsNone(agg.reduce_block(df, np.sum, 0, mask))
+        self.assertIsNone(agg.reduce_block(df.astype('int32'), 'sum', 0, mask))
+        self.assertIsNone(agg.reduce_block(df.assign(x='a'), 'sum', 0, mask))
+        self.assertIsNone(agg.reduce_block(df, 'sum', 0, ~mask))
+
+    def test_mixed_dtypes_on_columns(self):
+        ints = self.frames['int'].set_axis(list('abcde'), axis=1)
+        frames = {
+            'str': (ints.assign(note='x'), 'note'),
+            'nan': (ints.assign(extra=np.nan), 'extra'),
+        }
+        for name, (df, ignore_keys) in frames.items():
+            with self.subTest(frame=name):
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    result = agg.add_agg(df, 'sum', axis=1, ignore_keys=ignore_keys)
+                mask = agg.chaining.get_margins(df, 1, ignore_keys) < 0
+                self.assertIsNotNone(agg.reduce_block(df, 'sum', 1, mask))
+                with mock.patch.object(agg, 'reduce_block', return_value=None):
+                    expected = agg.add_agg(df, 'sum', axis=1, ignore_keys=ignore_keys)
+                pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_totals(self):
+        df = self.frames['subtotaled']
+        for axis in [0, 1]:
+            with self.subTest(axis=axis):
+                result = totals.add_totals(df, axis=axis)
+                with mock.patch.object(agg, 'reduce_block', return_value=None):
+                    expected = totals.add_totals(df, axis=axis)
+                pd.testing.assert_frame_equal(result, expected, check_exact=True)
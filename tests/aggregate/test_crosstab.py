@@ -0,0 +1,131 @@
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import flatbread.agg.totals as totals
+import flatbread.percentages as pct
+from flatbread.agg.crosstab import CellAccumulator, crosstab, crosstab_chunks
+
+
+def make_records(nrows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'region': rng.choice(['north', 'east', 'south'], nrows),
+        'store': rng.choice(['a', 'b'], nrows),
+        'year': rng.choice([2023, 2024], nrows),
+        'channel': rng.choice(['web', 'shop'], nrows),
+        'amount': rng.integers(0, 100, nrows),
+    })
+
+
+class TestCrosstab_Margins(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(500)
+        self.index = ['region', 'store']
+        self.columns = ['year', 'channel']
+
+    def pivot(self, values=None, aggfunc='size'):
+        grouped = self.records.groupby([*self.index, *self.columns])
+        cells = grouped.size() if aggfunc == 'size' else grouped[values].agg(aggfunc)
+        return cells.unstack(self.columns, fill_value=0)
+
+    def test_matches_chained_operations(self):
+        result = crosstab(self.records, self.index, self.columns, subtotals=True)
+        expected = (
+            self.pivot()
+            .pipe(totals.add_subtotals, axis=0)
+            .pipe(totals.add_subtotals, axis=1)
+            .pipe(totals.add_totals)
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_sum(self):
+        result = crosstab(
+            self.records,
+            self.index,
+            self.columns,
+            values='amount',
+            aggfunc='sum',
+        )
+        expected = totals.add_totals(self.pivot('amount', 'sum'))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_percentages(self):
+        result = crosstab(self.records, 'region', 'year', percentages=True)
+        expected = (
+            self.records
+            .groupby(['region', 'year'])
+            .size()
+            .unstack('year', fill_value=0)
+            .pipe(totals.add_totals)
+            .pipe(pct.add_percentages)
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_without_columns(self):
+        result = crosstab(self.records, 'region')
+        self.assertEqual(list(result.columns), ['size'])
+        self.assertEqual(result.loc['Totals', 'size'], len(self.records))
+
+    def test_accessor(self):
+        result = self.records.pita.crosstab('region', 'year')
+        self.assertEqual(result.iloc[-1, -1], len(self.records))
+
+    def test_non_additive_aggfunc_raises(self):
+        with self.assertRaises(ValueError):
+            crosstab(self.records, 'region', values='amount', aggfunc='mean')
+
+
+
+class TestCrosstab_Chunks(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(1000)
+        self.chunks = [self.records.iloc[i:i + 128] for i in range(0, 1000, 128)]
+
+    def test_matches_in_memory(self):
+        options = dict(subtotals=True, percentages=True, ndigits=3)
+        result = crosstab_chunks(
+            self.chunks,
+            ['region', 'store'],
+            'year',
+            values='amount',
+            aggfunc='sum',
+            **options,
+        )
+        expected = crosstab(
+            self.records,
+            ['region', 'store'],
+            'year',
+            values='amount',
+            aggfunc='sum',
+            **options,
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_csv_reader(self):
+        buffer = io.StringIO(self.records.to_csv(index=False))
+        result = crosstab_chunks(pd.read_csv(buffer, chunksize=100), 'region', 'channel')
+        expected = crosstab(self.records, 'region', 'channel')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_memory_depends_on_groups(self):
+        accumulator = CellAccumulator(['region', 'store'], 'channel')
+        for chunk in self.chunks:
+            accumulator.update(chunk)
+        self.assertEqual(len(accumulator.cells), 3 * 2 * 2)
+
+    def test_merge(self):
+        left = CellAccumulator('region', 'year').update(self.records.iloc[:400])
+        right = CellAccumulator('region', 'year').update(self.records.iloc[400:])
+        result = left.merge(right).to_table()
+        pd.testing.assert_frame_equal(result, crosstab(self.records, 'region', 'year'))
+
+    def test_no_records_raises(self):
+        with self.assertRaises(ValueError):
+            crosstab_chunks([], 'region')
+
+
+if __name__ == "__main__":
+    unittest.main()
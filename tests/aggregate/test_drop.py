@@ -0,0 +1,102 @@
+import unittest
+
+import pandas as pd
+
+import flatbread.agg.totals as totals
+import flatbread.chaining as chaining
+import flatbread.percentages as pct
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestTotalsDrop_Axes(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=8,
+            ncols=4,
+            idx_dupes=[4, 1],
+            col_dupes=[2, 1],
+            data_gen_f=lambda r, c: r * c + 1,
+        )
+        self.totaled = (
+            self.df
+            .pipe(totals.add_subtotals, axis=2)
+            .pipe(totals.add_totals, axis=2)
+        )
+
+    def test_drop_rows(self):
+        result = totals.drop_totals(self.totaled)
+        self.assertEqual(len(result), len(self.df))
+        self.assertEqual(len(result.columns), len(self.totaled.columns))
+
+    def test_drop_columns(self):
+        result = totals.drop_totals(self.totaled, axis=1)
+        self.assertTrue(result.columns.equals(self.df.columns))
+        self.assertEqual(len(result), len(self.totaled))
+
+    def test_drop_both(self):
+        result = totals.drop_totals(self.totaled, axis='both')
+        pd.testing.assert_frame_equal(result, self.df)
+
+    def test_keeps_margins_of_other_axis(self):
+        result = totals.drop_totals(self.totaled, axis=1)
+        levels = chaining.get_recorded_margins(result, 0)
+        expected = chaining.get_recorded_margins(self.totaled, 0)
+        self.assertEqual(levels.tolist(), expected.tolist())
+
+    def test_without_totals(self):
+        df = totals.add_totals(self.df, axis=0)
+        result = totals.drop_totals(df, axis=1)
+        pd.testing.assert_frame_equal(result, df)
+
+    def test_after_percentages(self):
+        with_pcts = pct.add_percentages(self.totaled, axis=0)
+        result = totals.drop_totals(with_pcts, axis='both')
+        self.assertTrue(result.index.equals(self.df.index))
+        self.assertEqual(
+            result.columns.droplevel(0).unique().tolist(),
+            self.df.columns.tolist(),
+        )
+
+    def test_keys_as_second_argument(self):
+        result = totals.drop_totals(self.totaled, ['Totals', 'Subtotals'])
+        self.assertEqual(len(result), len(self.df))
+
+    def test_without_record(self):
+        unrecorded = self.totaled.copy()
+        unrecorded.attrs = {}
+        result = totals.drop_totals(unrecorded, axis='both')
+        pd.testing.assert_frame_equal(result, self.df)
+
+    def test_series(self):
+        s = totals.add_totals(self.df.iloc[:, 0])
+        pd.testing.assert_series_equal(totals.drop_totals(s), self.df.iloc[:, 0])
+
+
+class TestPercentagesDrop_Columns(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=4,
+            ncols=2,
+            data_gen_f=lambda r, c: r + c + 1,
+        )
+        self.totaled = totals.add_totals(self.df)
+
+    def test_restores_table(self):
+        result = pct.drop_percentages(pct.add_percentages(self.totaled, axis=0))
+        pd.testing.assert_frame_equal(result, self.totaled)
+
+    def test_clears_percentages_attrs(self):
+        result = pct.drop_percentages(pct.add_percentages(self.totaled, axis=0))
+        self.assertNotIn('percentages', result.attrs['flatbread'])
+
+    def test_then_drop_totals(self):
+        result = (
+            pct.add_percentages(self.totaled, axis=0)
+            .pipe(pct.drop_percentages)
+            .pipe(totals.drop_totals)
+        )
+        self.assertEqual(len(result), len(self.df))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import flatbread.agg.totals as totals
+from flatbread.agg.crosstab import crosstab
+from flatbread.agg.partials import (
+    finalize_partials,
+    merge_partials,
+    reduce_partials,
+)
+
+
+def make_records(nrows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'region': rng.choice(['north', 'east', 'south'], nrows),
+        'store': rng.choice(['a', 'b'], nrows),
+        'channel': rng.choice(['web', 'shop'], nrows),
+        'amount': rng.integers(0, 100, nrows),
+    })
+
+
+class TestPartials_Merge(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(600)
+        self.index = ['region', 'store']
+        self.shards = [self.records.iloc[i::4] for i in range(4)]
+        self.parts = [
+            reduce_partials(shard, self.index, 'channel', 'amount')
+            for shard in self.shards
+        ]
+
+    def test_merge_matches_single_reduction(self):
+        result = merge_partials(self.parts)
+        expected = reduce_partials(self.records, self.index, 'channel', 'amount')
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_merge_is_associative(self):
+        left = merge_partials([merge_partials(self.parts[:2]), *self.parts[2:]])
+        right = merge_partials([self.parts[0], merge_partials(self.parts[1:])])
+        pd.testing.assert_frame_equal(left, right)
+
+    def test_merge_without_partials_raises(self):
+        with self.assertRaises(ValueError):
+            merge_partials([])
+
+
+class TestPartials_Finalize(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(600)
+        self.index = ['region', 'store']
+        shards = [self.records.iloc[i::3] for i in range(3)]
+        self.partials = merge_partials(
+            reduce_partials(shard, self.index, 'channel', 'amount')
+            for shard in shards
+        )
+
+    def test_sum_matches_crosstab(self):
+        result = finalize_partials(self.partials, 'sum', subtotals=True)
+        expected = crosstab(
+            self.records,
+            self.index,
+            'channel',
+            values = 'amount',
+            aggfunc = 'sum',
+            subtotals = True,
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_count_with_percentages_matches_crosstab(self):
+        result = finalize_partials(self.partials, 'count', percentages=True)
+        expected = crosstab(
+            self.records,
+            self.index,
+            'channel',
+            percentages = True,
+        )
+        pd.testing.assert_frame_equal(result, expected, check_names=False)
+
+    def test_margins_hold_statistic_over_records(self):
+        amounts = self.records['amount']
+        by_region = self.records.groupby('region')['amount']
+        by_channel = self.records.groupby('channel')['amount']
+        for stat in ['mean', 'var', 'std', 'min', 'max']:
+            with self.subTest(stat=stat):
+                result = finalize_partials(self.partials, stat, subtotals=True)
+                self.assertAlmostEqual(
+                    result.loc[('Totals', ''), 'Totals'],
+                    amounts.agg(stat),
+                )
+                subtotals = result.xs('Subtotals', level=1)['Totals']
+                pd.testing.assert_series_equal(
+                    subtotals,
+                    by_region.agg(stat),
+                    check_names = False,
+                )
+                pd.testing.assert_series_equal(
+                    result.loc[('Totals', ''), ['shop', 'web']],
+                    by_channel.agg(stat),
+                    check_names = False,
+                )
+
+    def test_cells_match_grouped_statistic(self):
+        result = finalize_partials(self.partials, 'mean', totals=False)
+        expected = (
+            self.records
+            .groupby([*self.index, 'channel'])['amount']
+            .mean()
+            .unstack('channel')
+        )
+        pd.testing.assert_frame_equal(result, expected, check_names=False)
+
+    def test_totals_can_be_dropped(self):
+        result = finalize_partials(self.partials, 'mean', subtotals=True)
+        expected = finalize_partials(self.partials, 'mean', totals=False)
+        pd.testing.assert_frame_equal(
+            totals.drop_totals(totals.drop_totals(result, axis=0), axis=1),
+            expected,
+            check_names = False,
+        )
+
+    def test_unknown_statistic_raises(self):
+        with self.assertRaises(ValueError):
+            finalize_partials(self.partials, 'median')
+
+
+class TestPartials_Precision(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(3000, seed=2)
+        rng = np.random.default_rng(2)
+        self.records['amount'] = 1e9 + rng.normal(0, 1, len(self.records))
+        shards = [self.records.iloc[i::5] for i in range(5)]
+        self.partials = merge_partials(
+            reduce_partials(shard, 'region', 'channel', 'amount')
+            for shard in shards
+        )
+
+    def test_variance_with_large_offset(self):
+        result = finalize_partials(self.partials, 'var')
+        expected = (
+            self.records
+            .groupby(['region', 'channel'])['amount']
+            .var()
+            .unstack('channel')
+        )
+        pd.testing.assert_frame_equal(
+            result.drop(index='Totals', columns='Totals'),
+            expected,
+            check_names = False,
+            rtol = 1e-6,
+        )
+        self.assertAlmostEqual(
+            result.loc['Totals', 'Totals'],
+            self.records['amount'].var(),
+            places = 6,
+        )
+        pd.testing.assert_series_equal(
+            result['Totals'].drop('Totals'),
+            self.records.groupby('region')['amount'].var(),
+            check_names = False,
+            rtol = 1e-6,
+        )
+
+    def test_statistic_without_column_keys(self):
+        partials = reduce_partials(self.records, 'region', values='amount')
+        result = finalize_partials(partials, 'std')
+        expected = self.records.groupby('region')['amount'].std()
+        pd.testing.assert_series_equal(
+            result['std'].drop('Totals'),
+            expected,
+            check_names = False,
+            rtol = 1e-6,
+        )
+        self.assertAlmostEqual(
+            result.loc['Totals', 'std'],
+            self.records['amount'].std(),
+            places = 6,
+        )
+
+
+class TestPartials_ProcessPool(unittest.TestCase):
+    def test_shards_reduced_in_processes(self):
+        records = make_records(900, seed=1)
+        shards = [records.iloc[i::3] for i in range(3)]
+        reduce = partial(
+            reduce_partials,
+            index = 'region',
+            columns = 'channel',
+            values = 'amount',
+        )
+        with ProcessPoolExecutor(2) as executor:
+            parts = list(executor.map(reduce, shards))
+
+        result = finalize_partials(merge_partials(parts), 'mean')
+        expected = (
+            records
+            .pivot_table(
+                index = 'region',
+                columns = 'channel',
+                values = 'amount',
+                aggfunc = 'mean',
+                margins = True,
+                margins_name = 'Totals',
+            )
+        )
+        pd.testing.assert_frame_equal(
+            result,
+            expected,
+            check_names = False,
+            check_like = True,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
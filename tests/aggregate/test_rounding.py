@@ -0,0 +1,105 @@
+import unittest
+from random import randint
+
+import numpy as np
+import pandas as pd
+
+import flatbread.agg.totals as totals
+import flatbread.percentages as pct
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestRoundApportioned_Array(unittest.TestCase):
+    def setUp(self):
+        self.values = np.array([
+            [0.333, 0.25],
+            [0.333, np.nan],
+            [0.334, 0.75],
+        ])
+
+    def test_matches_series_implementation(self):
+        for i in range(self.values.shape[1]):
+            s = pd.Series(self.values[:, i])
+            cumsum = s.fillna(0).cumsum().round(1)
+            expected = (cumsum - cumsum.shift(1).fillna(0)).mask(s.isna())
+            result = pct.round_apportioned_array(self.values, ndigits=1)[:, i]
+            np.testing.assert_array_equal(result, expected.to_numpy())
+
+    def test_keep_nan(self):
+        result = pct.round_apportioned_array(self.values, ndigits=1)
+        self.assertTrue(np.isnan(result[1, 1]))
+
+    def test_along_rows(self):
+        result = pct.round_apportioned_array(self.values.T, ndigits=1, axis=1)
+        expected = pct.round_apportioned_array(self.values, ndigits=1, axis=0)
+        np.testing.assert_array_equal(result, expected.T)
+
+    def test_no_rounding(self):
+        result = pct.round_apportioned_array(self.values, ndigits=-1)
+        np.testing.assert_array_equal(result, self.values)
+
+
+class TestRoundApportioned_Percentages(unittest.TestCase):
+    def setUp(self):
+        df = make_test_df(
+            nrows=7,
+            ncols=5,
+            data_gen_f=lambda r, c: randint(1, 100),
+        )
+        self.df = totals.add_totals(df)
+
+    def test_rows_add_up_to_base(self):
+        result = pct.as_percentages(self.df, axis=0, ndigits=0, base=100)
+        summed = result.iloc[:, :-1].sum(axis=1)
+        self.assertTrue(summed.eq(100).all())
+
+    def test_columns_add_up_to_base(self):
+        result = pct.as_percentages(self.df, axis=1, ndigits=0, base=100)
+        summed = result.iloc[:-1].sum()
+        self.assertTrue(summed.eq(100).all())
+
+
+class TestRoundApportioned_Groups(unittest.TestCase):
+    def setUp(self):
+        df = make_test_df(
+            nrows=12,
+            ncols=3,
+            data_gen_f=lambda r, c: randint(1, 100),
+            idx_levels=3,
+            idx_dupes=[6, 3, 1],
+        )
+        self.table = (
+            df
+            .pipe(totals.add_subtotals, level=[0, 1])
+            .pipe(totals.add_totals)
+        )
+        self.result = pct.as_percentages(
+            self.table,
+            axis = 1,
+            ndigits = 0,
+            base = 100,
+            apportioned_rounding = 'groups',
+        )
+
+    def test_groups_add_up_to_subtotals(self):
+        subtotals = self.result.xs('Subtotals', level=2)
+        for (level0, level1), row in subtotals.iterrows():
+            group = self.result.loc[(level0, level1)].drop('Subtotals')
+            self.assertTrue(group.sum().eq(row).all())
+
+    def test_subtotals_add_up_to_totals(self):
+        subtotals = self.result.xs('Subtotals', level=1)
+        totals_row = self.result.loc['Totals'].iloc[0]
+        self.assertTrue(subtotals.sum().eq(totals_row).all())
+        self.assertTrue(totals_row.eq(100).all())
+
+    def test_same_as_apportioned_without_margins(self):
+        table = self.table.iloc[:3]
+        table.attrs = {}
+        result = pct.round_apportioned_groups(table, ndigits=0)
+        expected = pct.round_apportioned(table, ndigits=0)
+        self.assertTrue(result.equals(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -41,6 +41,16 @@ class TestTotalsAdd_DataFrameSimple(unittest.TestCase):
         self.assertEqual(self.df.index.names, r1.index.names)
         self.assertEqual(self.df.index.names, r2.index.names)
 
+    def test_add_row_total_keeps_dtypes(self):
+        df = self.df.astype({self.df.columns[0]: float})
+        result = totals.add_totals(df, axis=1)
+        self.assertTrue(result.dtypes.iloc[:-1].equals(df.dtypes))
+
+    def test_add_both_keeps_dtypes(self):
+        df = self.df.astype({self.df.columns[0]: float})
+        result = totals.add_totals(df, axis=2)
+        self.assertTrue(result.dtypes.iloc[:-1].equals(df.dtypes))
+
     def test_custom_totals_label(self):
         custom_label = "Totes"
         result = totals.add_totals(self.df, label=custom_label)
@@ -60,6 +70,18 @@ class TestTotalsAdd_DataFrameSimple(unittest.TestCase):
         actual_total = result.loc[self.totals_label].iloc[0]
         self.assertEqual(actual_total, expected_total)
 
+    def test_add_both_matches_each_axis(self):
+        df = make_test_df(
+            nrows=40,
+            ncols=4,
+            idx_dupes=[4, 2],
+            data_gen_f=lambda r, c: float("nan") if r % 7 == c else r / (c + 1),
+        )
+        df = totals.add_subtotals(df, axis=0)
+        result = totals.add_totals(df, axis=2)
+        expected = totals.add_totals(totals.add_totals(df, axis=0), axis=1)
+        pd.testing.assert_frame_equal(result, expected)
+
 
 # region categorical
 class TestTotalsAdd_DataFrameCategorical(unittest.TestCase):
@@ -200,5 +222,122 @@ class TestTotalsAdd_DataFrameMultiIndex(unittest.TestCase):
         key = ('R_L0_G0', label_with_level, self.fill)
         self.assertTrue(key in result.index)
 
+
+# region grouping
+class TestSubtotalsAdd_Grouping(unittest.TestCase):
+    def setUp(self):
+        self.subtotals_label = DEFAULTS['subtotals']['label']
+        index = pd.MultiIndex.from_tuples([
+            ('A', 'x'),
+            ('B', 'x'),
+            ('A', 'y'),
+            ('B', 'y'),
+            ('C', 'x'),
+        ])
+        self.df = pd.DataFrame({'v': [1, 2, 3, 4, 5]}, index=index)
+
+    def test_groups_in_order_of_appearance(self):
+        result = totals.add_subtotals(self.df, level=0)
+        expected = [
+            ('A', 'x'),
+            ('A', 'y'),
+            ('A', self.subtotals_label),
+            ('B', 'x'),
+            ('B', 'y'),
+            ('B', self.subtotals_label),
+            ('C', 'x'),
+        ]
+        self.assertEqual(list(result.index), expected)
+
+    def test_subtotal_values(self):
+        result = totals.add_subtotals(self.df, level=0)
+        values = result.xs(self.subtotals_label, level=1)['v']
+        self.assertEqual(values.to_dict(), {'A': 4, 'B': 6})
+
+    def test_existing_key_raises(self):
+        df = totals.add_subtotals(self.df, level=0)
+        df.attrs = {}
+        with self.assertRaises(ValueError):
+            totals.add_subtotals(df, level=0, ignore_keys=[])
+
+
+# region append
+class TestTotalsAppend_Rows(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=24,
+            ncols=4,
+            idx_dupes=[8, 4, 1],
+            col_dupes=[2, 1],
+            data_gen_f=lambda r, c: r * c + 1,
+        )
+        self.new = [3, 6, 7, 21, 0]
+
+    def build(self, df):
+        return (
+            df
+            .pipe(totals.add_subtotals, axis=0, level=[0, 1])
+            .pipe(totals.add_subtotals, axis=1)
+            .pipe(totals.add_totals)
+        )
+
+    def test_matches_rebuild(self):
+        base = self.df.drop(self.df.index[self.new])
+        rows = self.df.iloc[self.new]
+        result = totals.append_rows(self.build(base), rows)
+        expected = self.build(pd.concat([base, rows]))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_matches_rebuild_with_outer_subtotals(self):
+        build = lambda df: totals.add_totals(totals.add_subtotals(df, axis=0))
+        base = self.df.drop(self.df.index[self.new])
+        result = base.pipe(build)
+        for i in self.new:
+            result = totals.append_rows(result, self.df.iloc[[i]])
+        expected = build(pd.concat([base, self.df.iloc[self.new]]))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_keeps_attrs(self):
+        base = self.build(self.df.iloc[1:])
+        result = totals.append_rows(base, self.df.iloc[:1])
+        self.assertEqual(
+            result.attrs['flatbread']['totals'],
+            base.attrs['flatbread']['totals'],
+        )
+
+    def test_new_group_without_subtotals(self):
+        base = self.df.iloc[:16]
+        rows = self.df.iloc[16:]
+        result = totals.append_rows(totals.add_totals(base), rows)
+        expected = totals.add_totals(self.df)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_new_group_with_subtotals_raises(self):
+        base = self.build(self.df.iloc[:16])
+        with self.assertRaises(ValueError):
+            totals.append_rows(base, self.df.iloc[16:])
+
+    def test_new_single_row_groups(self):
+        base = self.df.iloc[:15]
+        for rows in [self.df.iloc[[15]], self.df.iloc[[16]], self.df.iloc[[15, 16]]]:
+            with self.subTest(rows=list(rows.index)):
+                result = totals.append_rows(self.build(base), rows)
+                expected = self.build(pd.concat([base, rows]))
+                pd.testing.assert_frame_equal(result, expected)
+
+    def test_new_single_row_group_without_skip_raises(self):
+        with self.assertRaises(ValueError):
+            totals.append_rows(
+                self.build(self.df.iloc[:16]),
+                self.df.iloc[[16]],
+                skip_single_rows = False,
+            )
+
+    def test_flat_index(self):
+        df = make_test_df(nrows=6, ncols=3, data_gen_f=lambda r, c: r + c)
+        result = totals.append_rows(totals.add_totals(df.iloc[:4]), df.iloc[4:])
+        pd.testing.assert_frame_equal(result, totals.add_totals(df))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+import json
+import unittest
+from unittest import mock
+
+from flatbread import DEFAULTS
+from flatbread.render.cache import SpecCache, get_spec_cache
+from flatbread.render.tablespec import TableSpecBuilder
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestSpecCache_Bounds(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = SpecCache(max_size=10)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'xxxx')
+        cache.get('a')
+        cache.put('c', 'xxxx')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.size, 8)
+
+    def test_skips_values_larger_than_cache(self):
+        cache = SpecCache(max_size=3)
+        cache.put('a', 'xxxx')
+        self.assertEqual(len(cache), 0)
+
+    def test_size_in_bytes(self):
+        cache = SpecCache(max_size=10)
+        cache.put('a', 'ëëëë')
+        self.assertEqual(cache.size, 8)
+        cache.put('b', 'ëëëë')
+        self.assertEqual(list(cache._items), ['b'])
+        self.assertEqual(cache.size, 8)
+
+    def test_shrinking_evicts(self):
+        cache = SpecCache(max_size=10)
+        cache.put('a', 'xxxx')
+        cache.put('b', 'xxxx')
+        cache.max_size = 5
+        self.assertEqual(list(cache._items), ['b'])
+
+
+class TestSpecCache_TableSpec(unittest.TestCase):
+    def setUp(self):
+        get_spec_cache().clear()
+        self.df = make_test_df(nrows=10, ncols=3, data_gen_f=lambda r, c: r * c)
+
+    def tearDown(self):
+        DEFAULTS.reload()
+        get_spec_cache().clear()
+
+    def count_builds(self, *dfs, **kwargs):
+        with mock.patch.object(
+            TableSpecBuilder,
+            'iter_spec_json',
+            autospec=True,
+            side_effect=TableSpecBuilder.iter_spec_json,
+        ) as iter_spec_json:
+            specs = [TableSpecBuilder(df).get_spec_as_json(**kwargs) for df in dfs]
+        return iter_spec_json.call_count, specs
+
+    def test_same_frame_is_built_once(self):
+        n_builds, specs = self.count_builds(self.df, self.df.copy())
+        self.assertEqual(n_builds, 1)
+        self.assertEqual(specs[0], specs[1])
+
+    def test_table_spec_is_cached(self):
+        with mock.patch.object(
+            TableSpecBuilder,
+            '_prepare_labels',
+            autospec=True,
+            side_effect=TableSpecBuilder._prepare_labels,
+        ) as prepare_labels:
+            spec = self.df.pita.get_table_spec()
+            self.assertEqual(self.df.pita.get_table_spec(), spec)
+            self.df.pita.get_table_spec_json()
+        self.assertEqual(prepare_labels.call_count, 1)
+        self.assertEqual(spec['shape'], [10, 3])
+
+    def test_changed_values_are_rebuilt(self):
+        changed = self.df.copy()
+        changed.iloc[5, 1] = -1
+        n_builds, specs = self.count_builds(self.df, changed)
+        self.assertEqual(n_builds, 2)
+        self.assertNotEqual(specs[0], specs[1])
+
+    def test_changed_options_are_rebuilt(self):
+        n_builds, _ = self.count_builds(self.df, self.df, max_rows=5)
+        self.assertEqual(n_builds, 1)
+        n_builds, _ = self.count_builds(self.df, self.df, max_rows=4)
+        self.assertEqual(n_builds, 1)
+        get_spec_cache().clear()
+        with_attrs = self.df.copy()
+        with_attrs.attrs['flatbread'] = {'totals': {'ignore_keys': ['Totals']}}
+        n_builds, _ = self.count_builds(self.df, with_attrs)
+        self.assertEqual(n_builds, 2)
+
+    def test_changed_config_is_rebuilt(self):
+        df = self.df.rename(columns={self.df.columns[0]: DEFAULTS['percentages']['label_pct']})
+        specs = [json.loads(TableSpecBuilder(df).get_spec_as_json())]
+        DEFAULTS.update_runtime({'percentages': {'ndigits': 1}})
+        specs.append(json.loads(TableSpecBuilder(df).get_spec_as_json()))
+        digits = [spec['formatOptions'][0]['maximumFractionDigits'] for spec in specs]
+        self.assertEqual(digits, [21, 1])
+
+    def test_size_zero_disables_cache(self):
+        DEFAULTS.update_runtime({'spec_cache_size': 0})
+        n_builds, _ = self.count_builds(self.df, self.df)
+        self.assertEqual(n_builds, 2)
@@ -0,0 +1,100 @@
+import json
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from flatbread.render import paging
+from flatbread.render.cache import get_spec_cache
+from flatbread.render.tablespec import TableSpecBuilder
+from flatbread.testing.comm import LocalCommManager
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestPaging_Protocol(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(nrows=100, ncols=10, data_gen_f=lambda r, c: r * c)
+        self.manager = LocalCommManager()
+        self.builder = TableSpecBuilder(self.df)
+        self.table_id = paging.serve(self.builder, self.manager)
+        self.comm = self.manager.open(paging.TARGET_NAME, {'table': self.table_id})
+
+    def tearDown(self):
+        self.comm.close()
+        paging._tables.pop(self.table_id, None)
+
+    def request(self, **kwargs):
+        return self.comm.request({'type': 'window', 'id': 1, **kwargs})
+
+    def test_window(self):
+        reply = self.request(rows=[10, 20], columns=[2, 4])
+        spec = json.loads(reply['spec'])
+        self.assertEqual(reply['id'], 1)
+        self.assertEqual(reply['rows'], [10, 20])
+        self.assertEqual(spec['shape'], [100, 10])
+        self.assertEqual(spec['index'], list(self.df.index[10:20]))
+        self.assertEqual(spec['columns'], list(self.df.columns[2:4]))
+        self.assertEqual(spec['values'][0], [20, 30])
+
+    def test_window_is_clipped(self):
+        reply = self.request(rows=[95, 200])
+        self.assertEqual(reply['rows'], [95, 100])
+        self.assertEqual(reply['columns'], [0, 10])
+        self.assertEqual(len(json.loads(reply['spec'])['values']), 5)
+
+    def test_unknown_message(self):
+        reply = self.comm.request({'type': 'unknown', 'id': 2})
+        self.assertEqual(reply['type'], 'error')
+        self.assertEqual(reply['id'], 2)
+
+    def test_unknown_table(self):
+        comm = self.manager.open(paging.TARGET_NAME, {'table': 'missing'})
+        self.assertEqual(comm.sent[-1]['type'], 'error')
+        self.assertTrue(comm.closed)
+
+    def test_close_releases_table(self):
+        n_tables = len(paging._tables)
+        self.comm.close()
+        self.assertEqual(len(paging._tables), n_tables - 1)
+
+    def test_close_keeps_table_of_other_output(self):
+        table_id = paging.serve(TableSpecBuilder(self.df), self.manager)
+        comm = self.manager.open(paging.TARGET_NAME, {'table': table_id})
+        comm.close()
+        self.assertIn(self.table_id, paging._tables)
+        self.assertEqual(self.request(rows=[0, 1])['type'], 'window')
+        self.comm.close()
+        self.assertNotIn(self.table_id, paging._tables)
+
+    def test_serving_frame_again_reuses_table(self):
+        n_tables = len(paging._tables)
+        table_id = paging.serve(TableSpecBuilder(self.df), self.manager)
+        self.assertEqual(table_id, self.table_id)
+        self.assertEqual(len(paging._tables), n_tables)
+
+    def test_serving_series_again_reuses_table(self):
+        s = pd.Series(range(10), name='n')
+        table_id = paging.serve(TableSpecBuilder(s), self.manager)
+        self.addCleanup(paging._tables.pop, table_id, None)
+        self.assertEqual(paging.serve(TableSpecBuilder(s), self.manager), table_id)
+
+    def test_registry_is_bounded(self):
+        with mock.patch.object(paging, 'MAX_TABLES', 2):
+            table_ids = [
+                paging.serve(TableSpecBuilder(self.df.copy()), self.manager)
+                for _ in range(3)
+            ]
+            self.assertEqual(list(paging._tables)[-2:], table_ids[1:])
+            self.assertEqual(len(paging._tables), 2)
+            self.assertNotIn(self.table_id, paging._tables)
+        # the open comm keeps serving its table
+        self.assertEqual(self.request(rows=[0, 1])['type'], 'window')
+        for table_id in table_ids:
+            paging._tables.pop(table_id, None)
+
+    def test_windows_are_not_cached(self):
+        cache = get_spec_cache()
+        cache.clear()
+        self.request(rows=[0, 10])
+        self.request(rows=[10, 20])
+        self.assertEqual(len(cache), 0)
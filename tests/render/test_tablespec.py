@@ -0,0 +1,171 @@
+import base64
+import importlib.util
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from flatbread.render.tablespec import TableSpecBuilder, encode_column
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestTableSpec_Json(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'floats': [1.5, np.nan, np.inf, -0.0],
+            'ints': [1, 2, 3, -4],
+            'nullable': pd.array([1, None, 3, 4], dtype='Int64'),
+            'bools': [True, False, True, False],
+            'dates': pd.to_datetime(
+                ['2024-01-01', '2024-01-01 12:30', None, '2024-01-02 00:00:00.5'],
+                format='ISO8601',
+            ),
+            'categories': pd.Categorical(['x', None, 'y', 'x']),
+            'strings': ['a"', None, 'é', 'z'],
+            'objects': [pd.Interval(0, 1), 2, None, 'q'],
+        })
+
+    def expected(self, df):
+        builder = TableSpecBuilder(df)
+        return json.loads(json.dumps(
+            builder.build_spec(),
+            default=TableSpecBuilder._json_serialize,
+        ))
+
+    def test_matches_spec(self):
+        result = json.loads(TableSpecBuilder(self.df).get_spec_as_json())
+        self.assertEqual(result, self.expected(self.df))
+
+    def test_matches_spec_test_df(self):
+        df = make_test_df(nrows=50, ncols=4, data_gen_f=lambda r, c: r * c / 3)
+        result = json.loads(TableSpecBuilder(df).get_spec_as_json())
+        self.assertEqual(result, self.expected(df))
+
+    def test_chunks_join_to_same_json(self):
+        builder = TableSpecBuilder(self.df)
+        chunked = ''.join(builder.iter_spec_json(chunk_size=3))
+        self.assertEqual(chunked, builder.get_spec_as_json())
+
+    def test_empty_frame(self):
+        df = pd.DataFrame(index=range(2))
+        result = json.loads(TableSpecBuilder(df).get_spec_as_json())
+        self.assertEqual(result['values'], [[], []])
+
+    def test_preset_round_trips(self):
+        builder = TableSpecBuilder(self.df[['floats', 'ints']])
+        builder.set_format('ints', 'currency_eur')
+        builder.set_format('floats', {'style': 'percent'})
+        expected = {'style': 'currency', 'currency': 'EUR'}
+        result = json.loads(builder.get_spec_as_json())
+        self.assertEqual(result['formatOptions'][1], expected)
+        self.assertEqual(result['formatOptions'][0], {'style': 'percent'})
+        self.assertEqual(json.loads(json.dumps(builder.build_spec())), result)
+
+
+class TestTableSpec_EncodeColumn(unittest.TestCase):
+    def test_null_float(self):
+        result = encode_column(pd.Series([np.nan, 1.0, -np.inf]))
+        self.assertEqual(result.tolist(), ['null', '1.0', '-Infinity'])
+
+    def test_null_category(self):
+        result = encode_column(pd.Series(pd.Categorical([None, 'a'])))
+        self.assertEqual(result.tolist(), ['null', '"a"'])
+
+    def test_midnight_dates(self):
+        s = pd.Series(pd.to_datetime(['2024-01-01', '2024-01-01 01:00'], format='ISO8601'))
+        result = encode_column(s)
+        self.assertEqual(result.tolist(), ['"2024-01-01"', '"2024-01-01T01:00:00"'])
+
+
+class TestTableSpec_Truncate(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(nrows=100, ncols=40, data_gen_f=lambda r, c: r * c)
+
+    def spec(self, **kwargs):
+        return json.loads(TableSpecBuilder(self.df).get_spec_as_json(**kwargs))
+
+    def test_no_truncation_when_data_fits(self):
+        spec = self.spec(max_rows=100, max_columns=40)
+        self.assertEqual(len(spec['values']), 100)
+        self.assertEqual(spec['truncation'], {'rows': None, 'columns': None})
+
+    def test_ships_head_and_tail(self):
+        spec = self.spec(max_rows=30, max_columns=30, trim_size=5)
+        self.assertEqual(spec['shape'], [100, 40])
+        self.assertEqual(spec['truncation']['rows'], {'head': 26, 'tail': 5})
+        self.assertEqual(len(spec['values']), 31)
+        self.assertEqual(len(spec['values'][0]), 31)
+        self.assertEqual(spec['index'][-5:], list(self.df.index[-5:]))
+        self.assertEqual(spec['columns'][:26], list(self.df.columns[:26]))
+        self.assertEqual(spec['values'][-1][-1], 99 * 39)
+
+    def test_keeps_format_options(self):
+        builder = TableSpecBuilder(self.df)
+        builder.set_format(self.df.columns[-1], {'style': 'percent'})
+        spec = json.loads(builder.get_spec_as_json(max_columns=10))
+        self.assertEqual(spec['formatOptions'][-1], {'style': 'percent'})
+
+
+class TestTableSpec_Encoding(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'floats': [1.5, np.nan, -2.0],
+            'ints': np.array([1, 2, -3], dtype='int16'),
+            'nullable': pd.array([1, None, 3], dtype='Int64'),
+            'bools': [True, False, True],
+            'categories': pd.Categorical(['x', None, 'y']),
+            'strings': ['a', None, 'c'],
+        })
+
+    def decode(self, column):
+        if column['type'] == 'json':
+            return column['data']
+        if column['type'] == 'category':
+            codes = self.decode(column['codes'])
+            return [None if i < 0 else column['categories'][i] for i in codes]
+        dtype = np.uint8 if column['type'] == 'bool' else np.dtype(column['type'])
+        values = np.frombuffer(base64.b64decode(column['data']), dtype=dtype)
+        values = values.astype(bool) if column['type'] == 'bool' else values
+        valid = (
+            np.frombuffer(base64.b64decode(column['valid']), dtype=bool)
+            if 'valid' in column else ~pd.isna(values)
+        )
+        return [i.item() if is_valid else None for i, is_valid in zip(values, valid)]
+
+    def test_base64_decodes_to_values(self):
+        builder = TableSpecBuilder(self.df)
+        spec = json.loads(builder.get_spec_as_json(encoding='base64'))
+        expected = json.loads(builder.get_spec_as_json())
+        self.assertEqual(spec.pop('encoding'), 'base64')
+        columns = [self.decode(column) for column in spec['values']]
+        spec['values'] = [list(row) for row in zip(*columns)]
+        self.assertEqual(spec, expected)
+
+    def test_base64_numeric_types(self):
+        spec = json.loads(TableSpecBuilder(self.df).get_spec_as_json(encoding='base64'))
+        types = [column['type'] for column in spec['values']]
+        self.assertEqual(
+            types,
+            ['float64', 'int16', 'int64', 'bool', 'category', 'json'],
+        )
+
+    def test_invalid_encoding(self):
+        with self.assertRaises(ValueError):
+            TableSpecBuilder(self.df).get_spec_as_json(encoding='xml')
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "requires pyarrow")
+    def test_arrow_decodes_to_values(self):
+        import pyarrow as pa
+
+        builder = TableSpecBuilder(self.df)
+        spec = json.loads(builder.get_spec_as_json(encoding='arrow'))
+        expected = json.loads(builder.get_spec_as_json())
+        columns = []
+        for column in spec['values']:
+            if column['type'] == 'arrow':
+                reader = pa.ipc.open_stream(base64.b64decode(column['data']))
+                columns.append(reader.read_all().column(0).to_pylist())
+            else:
+                columns.append(self.decode(column))
+        self.assertEqual([list(row) for row in zip(*columns)], expected['values'])
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import flatbread.render.template as template
+from flatbread.render.config import DisplayConfig
+
+
+class TestTemplate_Render(unittest.TestCase):
+    def setUp(self):
+        self.manager = template.TemplateManager()
+        self.config = DisplayConfig()
+
+    def test_spec_is_inserted_verbatim(self):
+        spec = '{"values":[["{{ not jinja }}"]]}'
+        html = self.manager.render(spec, self.config)
+        self.assertIn(f"const data = await decodeValues({spec})", html)
+        self.assertNotIn(template.SPEC_MARKER, html)
+
+    def test_spec_chunks(self):
+        chunks = ['{"values":', '[[1]', ',[2]]}']
+        html = self.manager.render(iter(chunks), self.config)
+        self.assertIn(''.join(chunks), html)
+
+    def test_template_is_compiled_once(self):
+        self.assertIs(template.get_template(), template.get_template())
+
+
+class TestTemplate_Precompile(unittest.TestCase):
+    def tearDown(self):
+        template.get_template.cache_clear()
+
+    def test_precompiled_template_is_used(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = Path(tmpdir) / 'compiled'
+            with mock.patch.object(template, 'COMPILED_PATH', target):
+                template.precompile(target)
+                self.assertTrue(any(target.iterdir()))
+                result = template.get_template()
+                self.assertEqual(result.environment.loader.__class__.__name__, 'ModuleLoader')
+                html = template.TemplateManager().render('{}', DisplayConfig())
+                self.assertIn('decodeValues({})', html)
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import flatbread.axes as axes
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestAddLevel_DataFrame(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(nrows=6, ncols=4, idx_levels=2, col_levels=2)
+
+    def test_matches_keys(self):
+        for level in [0, 1, 2, -1, -2]:
+            result = axes.add_level(self.df, 'X', level=level, level_name='new')
+            expected = [
+                axes.add_value_to_key(key, 'X', level)
+                for key in self.df.index
+            ]
+            self.assertEqual(list(result.index), expected)
+            self.assertEqual(
+                list(result.index.names),
+                list(axes.add_value_to_key(self.df.index.names, 'new', level)),
+            )
+
+    def test_list_values_on_columns(self):
+        values = ['b', 'a', 'b', None]
+        result = axes.add_level(self.df, values, level=-1, axis=1)
+        self.assertEqual(
+            list(result.columns.get_level_values(-1)),
+            ['b', 'a', 'b', np.nan],
+        )
+        self.assertEqual(result.columns.nlevels, 3)
+
+    def test_single_index(self):
+        df = pd.DataFrame({'a': [1, 2]}, index=pd.Index(['x', 'y'], name='key'))
+        result = axes.add_level(df, 'X', level_name='new')
+        self.assertEqual(list(result.index), [('X', 'x'), ('X', 'y')])
+        self.assertEqual(list(result.index.names), ['new', 'key'])
+
+    def test_list_length_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            axes.add_level(self.df, ['a', 'b'])
+
+    def test_does_not_modify_original(self):
+        index = self.df.index
+        result = axes.add_level(self.df, 'X')
+        result.iloc[0, 0] = 'changed'
+        self.assertIs(self.df.index, index)
+        self.assertNotEqual(self.df.iloc[0, 0], 'changed')
+
+
+class TestAddLevel_Series(unittest.TestCase):
+    def test_matches_keys(self):
+        s = make_test_df(nrows=6, ncols=1, idx_levels=2).iloc[:, 0]
+        result = axes.add_level(s, list(range(6)), level=1)
+        expected = [
+            axes.add_value_to_key(key, i, 1)
+            for i, key in enumerate(s.index)
+        ]
+        self.assertEqual(list(result.index), expected)
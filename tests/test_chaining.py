@@ -0,0 +1,164 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from flatbread import DEFAULTS
+import flatbread.agg.aggregation as agg
+import flatbread.agg.totals as totals
+import flatbread.chaining as chaining
+import flatbread.percentages as pct
+from flatbread.render.config import DisplayConfig
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestGetDataMask_Index(unittest.TestCase):
+    def setUp(self):
+        self.index = pd.Index(['a', 'Totals', 'Totals x', 'b', None])
+
+    def test_no_ignore_keys(self):
+        result = chaining.get_data_mask(self.index, None)
+        self.assertTrue(result.all())
+
+    def test_exact_and_prefix_match(self):
+        result = chaining.get_data_mask(self.index, 'Totals')
+        expected = [True, False, False, True, True]
+        self.assertEqual(result.tolist(), expected)
+
+    def test_non_string_keys(self):
+        index = pd.Index([1, 2, 3])
+        result = chaining.get_data_mask(index, [2])
+        self.assertEqual(result.tolist(), [True, False, True])
+
+    def test_result_is_aligned(self):
+        result = chaining.get_data_mask(self.index, 'Totals')
+        self.assertTrue(result.index.equals(self.index))
+
+
+class TestGetDataMask_MultiIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = pd.MultiIndex.from_tuples([
+            ('a', 'x'),
+            ('a', 'Subtotals'),
+            ('b', 'x'),
+            (np.nan, 'y'),
+            ('Totals', ''),
+        ])
+
+    def test_any_level_ignored(self):
+        result = chaining.get_data_mask(self.index, ['Totals', 'Subtotals'])
+        expected = [True, False, True, True, False]
+        self.assertEqual(result.tolist(), expected)
+
+    def test_categorical_level(self):
+        index = pd.MultiIndex.from_arrays([
+            pd.Categorical(['a', 'b', 'Totals']),
+            [1, 2, 3],
+        ])
+        result = chaining.get_data_mask(index, 'Totals')
+        self.assertEqual(result.tolist(), [True, True, False])
+
+
+
+class TestMargins_Recorded(unittest.TestCase):
+    def setUp(self):
+        self.df = make_test_df(
+            nrows=8,
+            ncols=2,
+            idx_dupes=[4, 1],
+            data_gen_f=lambda r, c: r + c,
+        )
+        self.totaled = totals.add_totals(
+            totals.add_subtotals(self.df, axis=0),
+            axis=0,
+        )
+
+    def test_records_margin_levels(self):
+        levels = chaining.get_recorded_margins(self.totaled, 0)
+        expected = [-1] * 4 + [1] + [-1] * 4 + [1, 0]
+        self.assertEqual(levels.tolist(), expected)
+
+    def test_data_label_with_margin_prefix(self):
+        renamed = self.totaled.rename(index={'r0': 'Totals r0'}, level=1)
+        result = agg.add_agg(renamed, 'sum', label='Check', ignore_keys='Totals')
+        self.assertEqual(result.loc['Check'].squeeze().tolist(), self.df.sum().tolist())
+
+    def test_invalid_after_reordering(self):
+        shuffled = self.totaled.iloc[::-1]
+        self.assertIsNone(chaining.get_recorded_margins(shuffled, 0))
+        levels = chaining.get_margins(shuffled, 0, ['Totals', 'Subtotals'])
+        self.assertEqual((levels >= 0).sum(), 3)
+
+    def test_take_keeps_margins(self):
+        result = chaining.take(self.totaled, [10, 0, 4, 1])
+        levels = chaining.get_recorded_margins(result, 0)
+        self.assertEqual(levels.tolist(), [0, -1, 1, -1])
+
+    def test_drop_totals(self):
+        result = totals.drop_totals(self.totaled)
+        pd.testing.assert_frame_equal(result, self.df)
+        self.assertEqual(chaining.get_recorded_margins(result, 0).max(), -1)
+
+    def test_outer_subaggs_skip_inner(self):
+        df = make_test_df(
+            nrows=8,
+            ncols=1,
+            idx_dupes=[4, 2, 1],
+            data_gen_f=lambda r, c: 1,
+        )
+        result = agg.add_subagg(df, 'sum', level=[0, 1], label='S')
+        self.assertEqual(result.xs('S', level=1).squeeze().tolist(), [4, 4])
+
+
+    def test_display_margin_labels(self):
+        result = totals.add_subtotals(
+            self.df,
+            axis=0,
+            label='Sub',
+            include_level_name=True,
+        )
+        config = DisplayConfig.from_defaults(DEFAULTS, result.attrs)
+        groups = self.df.index.get_level_values(0).unique()
+        for group in groups:
+            self.assertIn(f"Sub {group}", config.margin_labels)
+        self.assertNotIn('Sub', config.margin_labels)
+
+    def test_accessor_take(self):
+        result = self.totaled.pita.take([10, 0])
+        self.assertEqual(chaining.get_recorded_margins(result, 0).tolist(), [0, -1])
+
+
+class TestMargins_Unrecorded(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {'n': [1, 2, 3], 'pct_change': [0.1, 0.2, 0.3]},
+            index = ['a', 'b', 'Totals EU'],
+        )
+
+    def test_fresh_frame_has_no_margins(self):
+        result = totals.add_totals(self.df, axis=0)
+        self.assertEqual(result.loc['Totals', 'n'], 6)
+        self.assertEqual(chaining.get_recorded_margins(result, 0).tolist(), [-1, -1, -1, 0])
+        config = DisplayConfig.from_defaults(DEFAULTS, result.attrs)
+        self.assertNotIn('Totals EU', config.margin_labels)
+
+    def test_explicit_keys_match_labels(self):
+        result = totals.add_totals(self.df, axis=0, ignore_keys='Totals')
+        self.assertEqual(result.loc['Totals', 'n'], 3)
+
+    def test_stale_record_matches_full_keys(self):
+        totaled = totals.add_totals(self.df, axis=0)
+        shuffled = totaled.iloc[::-1]
+        self.assertIsNone(chaining.get_recorded_margins(shuffled, 0))
+        levels = chaining.get_margins(shuffled, 0, None)
+        self.assertEqual(levels.tolist(), [0, -1, -1, -1])
+
+    def test_percentages_are_recorded(self):
+        result = pct.add_percentages(self.df, axis=0)
+        levels = chaining.get_recorded_margins(result, 1, 'percentages')
+        self.assertEqual(levels.tolist(), [-1, -1, 0, 0])
+        pd.testing.assert_frame_equal(pct.drop_percentages(result), self.df)
+
+
+if __name__ == "__main__":
+    unittest.main()
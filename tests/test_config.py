@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from flatbread import DEFAULTS
+import flatbread.agg.totals as totals
+from flatbread.config.service import ConfigService, thaw
+from flatbread.render.config import DisplayConfig
+from flatbread.testing.dataframe import make_test_df
+
+
+class TestConfigService_Runtime(unittest.TestCase):
+    def tearDown(self):
+        DEFAULTS.reload()
+
+    def test_update_runtime_bumps_version(self):
+        DEFAULTS.config
+        version = DEFAULTS.version
+        DEFAULTS.update_runtime({'totals': {'label': 'All'}})
+        self.assertGreater(DEFAULTS.version, version)
+        self.assertEqual(DEFAULTS.section('totals')['label'], 'All')
+
+    def test_snapshot_is_immutable(self):
+        with self.assertRaises(TypeError):
+            DEFAULTS['totals']['label'] = 'All' # type: ignore
+
+    def test_snapshot_lists_are_immutable(self):
+        DEFAULTS.update_runtime({'format_presets': {'p': {'dtypes': ['int']}}})
+        dtypes = DEFAULTS['format_presets']['p']['dtypes']
+        with self.assertRaises(AttributeError):
+            dtypes.append('float') # type: ignore
+        self.assertEqual(thaw(DEFAULTS['format_presets'])['p']['dtypes'], ['int'])
+
+    def test_reload_drops_runtime_updates(self):
+        DEFAULTS.update_runtime({'totals': {'label': 'All'}})
+        DEFAULTS.reload()
+        self.assertEqual(DEFAULTS['totals']['label'], 'Totals')
+
+    def test_decorated_functions_follow_updates(self):
+        df = make_test_df(nrows=3, ncols=2, data_gen_f=lambda r, c: r)
+        self.assertIn('Totals', totals.add_totals(df).index)
+        DEFAULTS.update_runtime({'totals': {'label': 'All'}})
+        self.assertIn('All', totals.add_totals(df).index)
+        DEFAULTS.reload()
+        self.assertIn('Totals', totals.add_totals(df).index)
+
+    def test_display_config_follows_updates(self):
+        DEFAULTS.update_runtime({'max_rows': 7})
+        self.assertEqual(DisplayConfig.from_defaults(DEFAULTS).max_rows, 7)
+        DEFAULTS.update_runtime({'max_rows': 9})
+        self.assertEqual(DisplayConfig.from_defaults(DEFAULTS).max_rows, 9)
+
+
+class TestConfigService_Watch(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.path = Path(self.tmpdir.name) / '.flatbread.json'
+        self.service = ConfigService()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def write(self, config, mtime):
+        self.path.write_text(json.dumps(config))
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reloads_changed_project_config(self):
+        self.write({'totals': {'label': 'A'}}, mtime=1_000_000)
+        self.assertEqual(self.service['totals']['label'], 'A')
+        self.assertFalse(self.service.check_for_changes())
+        self.write({'totals': {'label': 'B'}}, mtime=2_000_000)
+        self.assertTrue(self.service.check_for_changes())
+        self.assertEqual(self.service['totals']['label'], 'B')
+
+    def test_keeps_runtime_updates(self):
+        self.write({'totals': {'label': 'A'}}, mtime=1_000_000)
+        self.service.update_runtime({'subtotals': {'label': 'Sub'}})
+        self.write({'totals': {'label': 'B'}}, mtime=2_000_000)
+        self.service.check_for_changes()
+        self.assertEqual(self.service['subtotals']['label'], 'Sub')
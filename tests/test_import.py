@@ -0,0 +1,52 @@
+import json
+import subprocess
+import sys
+import unittest
+
+
+# Time `import flatbread` on top of pandas in a fresh interpreter and report
+# which deferred modules were imported along the way.
+SCRIPT = """
+import json, sys, time
+import pandas
+start = time.perf_counter()
+import flatbread
+elapsed = time.perf_counter() - start
+deferred = [
+    'jinja2',
+    'flatbread.render.template',
+    'flatbread.render.tablespec',
+    'flatbread.render.paging',
+    'flatbread.io.excel',
+]
+print(json.dumps({
+    'elapsed': elapsed,
+    'imported': [name for name in deferred if name in sys.modules],
+    'config_loaded': flatbread.DEFAULTS._snapshot is not None,
+}))
+"""
+
+# Generous enough for slow CI machines; importing flatbread itself takes a
+# few tens of milliseconds once pandas is loaded.
+STARTUP_BUDGET = 0.25
+
+
+class TestImport_Startup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        output = subprocess.run(
+            [sys.executable, '-c', SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        cls.result = json.loads(output.stdout)
+
+    def test_render_stack_is_deferred(self):
+        self.assertEqual(self.result['imported'], [])
+
+    def test_config_is_not_loaded(self):
+        self.assertFalse(self.result['config_loaded'])
+
+    def test_startup_budget(self):
+        self.assertLess(self.result['elapsed'], STARTUP_BUDGET)